@@ -0,0 +1,157 @@
+"""
+Confere o entanglement swapping vetorizado (kernels.swap_chain e NetworkLayer.entanglement_swapping) com uma
+implementação de referência, que percorre a rota swapping a swapping, como o laço sequencial anterior: um
+timeslot antes de cada passo, um sorteio por swapping e um par virtual intermediário a cada passo.
+
+São feitas duas verificações, com sementes fixas:
+    kernel : survival e fidelity de swap_chain, com e sem decoerência, contra a recorrência passo a passo;
+    rede   : taxa de sucesso e fidelidade média do par final de entanglement_swapping(0, 8) em uma grade 3x3
+             (fator de decoerência 0.9), contra a referência sequencial aplicada a redes idênticas.
+
+Uso:
+    python benchmarks/check_swapping.py [número de repetições]
+"""
+import contextlib
+import io
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+from quantumnet.components import Network, kernels
+
+
+def reference_chain(hops: list, decay: float) -> tuple:
+    """
+    Recorrência do swapping sequencial para uma rota, passo a passo.
+
+    Args:
+        hops (list): Fidelidades dos pares de cada salto, lidas antes do primeiro swapping.
+        decay (float): Fator de decoerência de cada timeslot.
+
+    Returns:
+        tuple : (survival, fidelity), listas com o estado depois de j swappings na posição j.
+    """
+    survival = [1.0]
+    fidelity = [hops[0]]
+    for j in range(1, len(hops)):
+        a = fidelity[-1] * decay
+        b = hops[j] * decay ** j
+        survival.append(survival[-1] * kernels.swap_success_probability(a, b))
+        fidelity.append(kernels.swap_fidelity(a, b))
+    return survival, fidelity
+
+
+def check_kernel(seed: int = 7) -> float:
+    """
+    Compara swap_chain com reference_chain em um lote de rotas de tamanhos variados.
+
+    Returns:
+        float : Maior diferença absoluta encontrada.
+    """
+    rng = np.random.default_rng(seed)
+    routes = [rng.uniform(0.5, 1.0, size=int(n)).tolist() for n in rng.integers(1, 40, size=64)]
+    error = 0.0
+    for decay in (1.0, 0.95, 0.9, 0.5):
+        survival, fidelity = kernels.swap_chain(routes, decay)
+        for row, hops in enumerate(routes):
+            expected_survival, expected_fidelity = reference_chain(hops, decay)
+            n = len(hops)
+            error = max(error, np.abs(survival[row, :n] - expected_survival).max(), np.abs(fidelity[row, :n] - expected_fidelity).max())
+            # As colunas além do último salto repetem os valores finais
+            error = max(error, np.abs(survival[row, n:] - expected_survival[-1]).max(initial=0.0),
+                        np.abs(fidelity[row, n:] - expected_fidelity[-1]).max(initial=0.0))
+    return error
+
+
+def reference_swapping(network: Network, Alice: int, Bob: int) -> bool:
+    """
+    Entanglement swapping sequencial: a cada passo, avança um timeslot, lê as fidelidades atuais do par
+    virtual (ou do primeiro salto) e do par do salto seguinte, sorteia o sucesso e cria um par virtual.
+    """
+    route = network.networklayer.short_route_valid(Alice, Bob)
+    if route is None or len(route) < 2:
+        return False
+    route = list(route)
+    virtual_links = network.virtual_links
+    virtual = False
+    while len(route) > 1:
+        network.timeslot()
+        node1, node2 = route[0], route[1]
+        node3 = route[2] if len(route) > 2 else None
+        pool1 = virtual_links.pool(node1, node2) if virtual else network.get_eprs_from_edge(node1, node2)
+        if not pool1:
+            return False
+        if node3 is not None:
+            pool2 = network.get_eprs_from_edge(node2, node3)
+            if not pool2:
+                return False
+            epr1, epr2 = pool1[0], pool2[0]
+            f1 = epr1.get_current_fidelity()
+            f2 = epr2.get_current_fidelity()
+            if network.rng.uniform() > kernels.swap_success_probability(f1, f2):
+                return False
+            epr_virtual = network.physical.create_epr_pair(kernels.swap_fidelity(f1, f2), increment_timeslot=False, increment_eprs=False)
+            virtual_links.add(epr_virtual, node1, node3)
+            pool1.remove(epr1)
+            pool2.remove(epr2)
+            virtual = True
+        route.pop(1)
+    return True
+
+
+def final_fidelity(network: Network, Alice: int, Bob: int) -> float:
+    """
+    Fidelidade atual do par virtual mais recente entre dois hosts.
+    """
+    pool = network.virtual_links.pool(Alice, Bob)
+    return pool[-1].get_current_fidelity()
+
+
+def check_network(trials: int, side: int = 3, factor: float = 0.9) -> dict:
+    """
+    Executa o swapping entre os cantos de uma grade com as duas implementações, em redes com as mesmas
+    sementes.
+
+    Returns:
+        dict : Taxa de sucesso e fidelidade média do par final de cada implementação.
+    """
+    Alice, Bob = 0, side * side - 1
+    results = {}
+    for name in ('referência', 'vetorizado'):
+        successes = 0
+        fidelities = []
+        for trial in range(trials):
+            network = Network(seed=trial, decoherence_factor=factor)
+            with contextlib.redirect_stdout(io.StringIO()):
+                network.set_ready_topology('Grade', side, side)
+            if name == 'referência':
+                success = reference_swapping(network, Alice, Bob)
+            else:
+                success = network.networklayer.entanglement_swapping(Alice, Bob)
+            if success:
+                successes += 1
+                fidelities.append(final_fidelity(network, Alice, Bob))
+        results[name] = (successes / trials, float(np.mean(fidelities)) if fidelities else math.nan)
+    return results
+
+
+def main(trials: int = 2000) -> bool:
+    error = check_kernel()
+    print(f'kernel: maior diferença {error:.2e}')
+    ok = error < 1e-9
+    results = check_network(trials)
+    (rate_ref, fidelity_ref), (rate, fidelity) = results['referência'], results['vetorizado']
+    # Tolerância de 4 desvios padrão para a diferença entre as duas taxas de sucesso
+    tolerance = 4 * math.sqrt(2 * rate_ref * (1 - rate_ref) / trials)
+    print(f'rede: sucesso {rate_ref:.3f} (referência) x {rate:.3f} (vetorizado), tolerância {tolerance:.3f}')
+    print(f'rede: fidelidade final {fidelity_ref:.4f} (referência) x {fidelity:.4f} (vetorizado)')
+    ok = ok and abs(rate - rate_ref) <= tolerance and abs(fidelity - fidelity_ref) < 0.01
+    print('ok' if ok else 'FALHOU')
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000) else 1)
@@ -0,0 +1,72 @@
+"""
+Mede a memória ocupada por qubit e por par EPR.
+
+Compara as classes atuais (com __slots__) com o layout anterior, em que cada instância tinha um
+__dict__ próprio. O layout anterior é reproduzido aqui apenas para a comparação.
+
+Uso:
+    python benchmarks/memory_footprint.py [número de instâncias]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from quantumnet.objects import Qubit, Epr
+
+
+class LegacyQubit():
+    def __init__(self, qubit_id: int, initial_fidelity: float) -> None:
+        self.qubit_id = qubit_id
+        self._qubit_state = 0
+        self._initial_fidelity = initial_fidelity
+        self._current_fidelity = initial_fidelity
+        self._store = None
+        self._slot = None
+
+
+class LegacyEpr():
+    def __init__(self, epr_id: int, initial_fidelity: float) -> None:
+        self._epr_id = epr_id
+        self._initial_fidelity = initial_fidelity
+        self._current_fidelity = initial_fidelity
+        self._store = None
+        self._slot = None
+        self._handle = None
+
+
+def bytes_per_instance(cls, n: int) -> float:
+    """
+    Cria n instâncias de uma classe e retorna a memória média alocada por instância.
+
+    Args:
+        cls (type): Classe a ser medida. Recebe (id, fidelidade) no construtor.
+        n (int): Número de instâncias.
+
+    Returns:
+        float : Bytes por instância.
+    """
+    # A fidelidade é fixa para não medir a alocação de floats diferentes a cada instância
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(i, 0.5) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Desconta a lista que guarda as instâncias
+    return (after - before - sys.getsizeof(instances)) / n
+
+
+def main(n: int = 100000):
+    results = {
+        'Qubit': (bytes_per_instance(LegacyQubit, n), bytes_per_instance(Qubit, n)),
+        'Epr': (bytes_per_instance(LegacyEpr, n), bytes_per_instance(Epr, n)),
+    }
+    print(f'{"Objeto":<8}{"antes (B)":>12}{"depois (B)":>12}{"redução":>10}')
+    for name, (before, after) in results.items():
+        print(f'{name:<8}{before:>12.1f}{after:>12.1f}{1 - after / before:>10.1%}')
+    return results
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,336 @@
+"""
+Suíte de benchmarks dos principais pontos de entrada da rede.
+
+Casos medidos:
+    topology  : Network.set_ready_topology para 'Grade', 'Linha' e 'Anel', de 9 a 10^4 nós;
+    timeslot  : custo da decoerência de Network.timeslot() em cada modo de decoerência;
+    swapping  : NetworkLayer.entanglement_swapping ao longo de linhas longas;
+    transport : TransportLayer.run_transport_layer;
+    e91       : ApplicationLayer.qkd_e91_protocol de ponta a ponta;
+    snapshot  : Network.save_snapshot e Network.load_snapshot;
+    fork      : Network.fork, sozinho e seguido de um passo (echp_on_demand) na rede bifurcada;
+    kernels   : fórmulas de kernels (purificação tipos 1 a 3, swapping e teletransporte) sobre grades de fidelidades.
+
+Para cada caso e tamanho são registrados o tempo de parede (mínimo e mediana das repetições), a vazão
+(nós/s, timeslots/s, swaps/s, qubits/s, bits de chave/s, nós/s, bifurcações/s, pontos/s) e o pico de memória alocada (tracemalloc, em
+uma execução separada para não distorcer o tempo). Os resultados são gravados em JSON e podem ser
+comparados com os de uma execução anterior.
+
+Uso:
+    python benchmarks/suite.py [--quick] [--only topology,e91] [--repeats 3] [--output resultados.json]
+                               [--compare anterior.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+from quantumnet.components import Network, kernels
+
+SEED = 42
+
+
+def build_network(topology: tuple, **kwargs) -> Network:
+    """
+    Cria uma rede com uma topologia pronta, sem as mensagens de inicialização.
+
+    Args:
+        topology (tuple): Nome da topologia e seus argumentos, como em set_ready_topology.
+        **kwargs: Argumentos de Network.
+
+    Returns:
+        Network : Rede criada.
+    """
+    network = Network(seed=SEED, **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        network.set_ready_topology(*topology)
+    return network
+
+
+def measure(setup, run, repeats: int) -> dict:
+    """
+    Mede um caso. `setup()` prepara o estado (fora da medição) e `run(state)` executa o trabalho medido,
+    retornando a quantidade de trabalho realizado (usada para a vazão).
+
+    Args:
+        setup (callable): Prepara o estado de cada repetição.
+        run (callable): Executa o caso e retorna a quantidade de trabalho.
+        repeats (int): Número de repetições cronometradas.
+
+    Returns:
+        dict : Tempos (s), trabalho da última repetição, vazão e pico de memória (bytes).
+    """
+    times = []
+    work = 0
+    for _ in range(repeats):
+        state = setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            work = run(state)
+            times.append(time.perf_counter() - start)
+
+    # Pico de memória em uma execução separada, pois o tracemalloc deixa a execução mais lenta
+    state = setup()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'wall_time_min_s': best,
+        'wall_time_median_s': statistics.median(times),
+        'repeats': repeats,
+        'work': work,
+        'throughput': work / best if best > 0 else None,
+        'peak_memory_bytes': peak,
+    }
+
+
+def bench_topology(quick: bool, repeats: int) -> list:
+    sizes = [9, 100] if quick else [9, 100, 1024, 10000]
+    results = []
+    for size in sizes:
+        side = int(round(size ** 0.5))
+        for topology in (('Grade', side, side), ('Linha', size), ('Anel', size)):
+            nodes = side * side if topology[0] == 'Grade' else size
+
+            def run(network, topology=topology):
+                network.set_ready_topology(*topology)
+                return len(network.hosts)
+            result = measure(lambda: Network(seed=SEED), run, repeats)
+            results.append({'benchmark': 'topology', 'params': {'topology': topology[0], 'nodes': nodes},
+                            'throughput_unit': 'nós/s', **result})
+    return results
+
+
+def bench_timeslot(quick: bool, repeats: int) -> list:
+    sizes = [(3, 3), (10, 10)] if quick else [(3, 3), (10, 10), (32, 32), (100, 100)]
+    steps = 100
+    results = []
+    for rows, cols in sizes:
+        for mode in Network.DECOHERENCE_MODES:
+            def run(network):
+                for _ in range(steps):
+                    network.timeslot()
+                return steps
+            result = measure(lambda: build_network(('Grade', rows, cols), decoherence_mode=mode), run, repeats)
+            results.append({'benchmark': 'timeslot', 'params': {'nodes': rows * cols, 'decoherence_mode': mode, 'steps': steps},
+                            'throughput_unit': 'timeslots/s', **result})
+    return results
+
+
+def bench_swapping(quick: bool, repeats: int, mode: str) -> list:
+    lengths = [10, 100] if quick else [10, 100, 1000]
+    results = []
+    for length in lengths:
+        def setup():
+            # Fidelidades 1 e sem decoerência: todos os swaps da linha são bem-sucedidos
+            network = build_network(('Linha', length), decoherence_mode=mode, decoherence_factor=1.0)
+            for edge in network.edges:
+                for epr in network.get_eprs_from_edge(*edge):
+                    epr.set_fidelity(1.0)
+            return network
+
+        def run(network):
+            before = network.networklayer.used_eprs
+            network.networklayer.entanglement_swapping(0, length - 1)
+            return network.networklayer.used_eprs - before
+        result = measure(setup, run, repeats)
+        results.append({'benchmark': 'swapping', 'params': {'nodes': length, 'decoherence_mode': mode},
+                        'throughput_unit': 'swaps/s', **result})
+    return results
+
+
+def bench_transport(quick: bool, repeats: int, mode: str) -> list:
+    sides = [3, 5] if quick else [3, 5, 10, 32]
+    num_qubits = 10  # Quantidade de qubits com que set_ready_topology inicializa cada host
+    results = []
+    for side in sides:
+        def run(network):
+            success = network.transportlayer.run_transport_layer(0, side * side - 1, num_qubits)
+            return num_qubits if success else 0
+        result = measure(lambda: build_network(('Grade', side, side), decoherence_mode=mode), run, repeats)
+        results.append({'benchmark': 'transport', 'params': {'nodes': side * side, 'num_qubits': num_qubits, 'decoherence_mode': mode},
+                        'throughput_unit': 'qubits/s', **result})
+    return results
+
+
+def bench_e91(quick: bool, repeats: int, mode: str) -> list:
+    sides = [3, 5] if quick else [3, 5, 10, 32]
+    num_bits = 5
+    results = []
+    for side in sides:
+        def run(network):
+            key = network.application_layer.qkd_e91_protocol(0, side * side - 1, num_bits)
+            return len(key) if key is not None else 0
+        result = measure(lambda: build_network(('Grade', side, side), decoherence_mode=mode), run, repeats)
+        results.append({'benchmark': 'e91', 'params': {'nodes': side * side, 'num_bits': num_bits, 'decoherence_mode': mode},
+                        'throughput_unit': 'bits de chave/s', **result})
+    return results
+
+
+def bench_snapshot(quick: bool, repeats: int, mode: str) -> list:
+    sides = [3, 10] if quick else [3, 10, 32, 100]
+    path = os.path.join(tempfile.gettempdir(), 'quantumnet_benchmark_snapshot.bin')
+    results = []
+    for side in sides:
+        def run_save(network):
+            network.save_snapshot(path)
+            return len(network.hosts)
+
+        def run_load(network):
+            return len(Network.load_snapshot(path).hosts)
+        setup = lambda: build_network(('Grade', side, side), decoherence_mode=mode)
+        for operation, run in (('save', run_save), ('load', run_load)):
+            result = measure(setup, run, repeats)
+            results.append({'benchmark': 'snapshot', 'params': {'operation': operation, 'nodes': side * side, 'decoherence_mode': mode},
+                            'throughput_unit': 'nós/s', **result})
+    os.remove(path)
+    return results
+
+
+def bench_fork(quick: bool, repeats: int, mode: str) -> list:
+    sides = [3, 10] if quick else [3, 10, 32, 100]
+    results = []
+    for side in sides:
+        forks = 200 if side <= 32 else 20
+
+        def run_fork(network):
+            for _ in range(forks):
+                network.fork()
+            return forks
+
+        def run_step(network):
+            for _ in range(forks):
+                network.fork().physical.echp_on_demand(0, 1)
+            return forks
+        setup = lambda: build_network(('Grade', side, side), decoherence_mode=mode)
+        for operation, run in (('fork', run_fork), ('fork+step', run_step)):
+            result = measure(setup, run, repeats)
+            results.append({'benchmark': 'fork', 'params': {'operation': operation, 'nodes': side * side, 'decoherence_mode': mode},
+                            'throughput_unit': 'bifurcações/s', **result})
+    return results
+
+
+def metadata() -> dict:
+    """
+    Informações do ambiente em que os benchmarks foram executados.
+    """
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'seed': SEED,
+    }
+
+
+def compare(results: list, previous_path: str):
+    """
+    Imprime a razão entre os tempos atuais e os de uma execução anterior (valores < 1 indicam melhora).
+
+    Args:
+        results (list): Resultados atuais.
+        previous_path (str): Arquivo JSON de uma execução anterior.
+    """
+    with open(previous_path) as file:
+        previous = json.load(file)['results']
+    index = {(r['benchmark'], json.dumps(r['params'], sort_keys=True)): r for r in previous}
+    print(f'\nComparação com {previous_path}:')
+    for result in results:
+        old = index.get((result['benchmark'], json.dumps(result['params'], sort_keys=True)))
+        if old is None or not old['wall_time_min_s']:
+            continue
+        ratio = result['wall_time_min_s'] / old['wall_time_min_s']
+        print(f'{result["benchmark"]:<10}{json.dumps(result["params"]):<70}{ratio:>8.2f}x')
+
+
+def bench_kernels(quick: bool, repeats: int) -> list:
+    sides = [100, 1000] if quick else [100, 1000, 3000]
+    results = []
+    for side in sides:
+        def setup():
+            # Grade side x side de pares de fidelidades, como nas varreduras de limiares
+            grid = np.linspace(0.5, 1.0, side)
+            return np.meshgrid(grid, grid, sparse=True)
+
+        formulas = {
+            'purification_1': lambda f1, f2: kernels.purification(f1, f2, 1),
+            'purification_2': lambda f1, f2: kernels.purification(f1, f2, 2),
+            'purification_3': lambda f1, f2: kernels.purification(f1, f2, 3),
+            'swap_fidelity': kernels.swap_fidelity,
+            'teleport_fidelity': lambda f1, f2: kernels.teleport_fidelity(f1, f2, 0.9),
+        }
+        for name, formula in formulas.items():
+            def run(grids, formula=formula):
+                return formula(*grids).size
+            result = measure(setup, run, repeats)
+            results.append({'benchmark': 'kernels', 'params': {'formula': name, 'points': side * side},
+                            'throughput_unit': 'pontos/s', **result})
+    return results
+
+
+BENCHMARKS = ('topology', 'timeslot', 'swapping', 'transport', 'e91', 'snapshot', 'fork', 'kernels')
+
+
+def main(argv=None) -> list:
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks do QuantumNet.')
+    parser.add_argument('--quick', action='store_true', help='Somente os tamanhos pequenos.')
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help='Casos a executar, separados por vírgula.')
+    parser.add_argument('--repeats', type=int, default=3, help='Repetições cronometradas de cada caso.')
+    parser.add_argument('--mode', default='eager', choices=Network.DECOHERENCE_MODES,
+                        help='Modo de decoerência dos casos swapping, transport, e91, snapshot e fork.')
+    parser.add_argument('--output', default='benchmark_results.json', help='Arquivo JSON de saída.')
+    parser.add_argument('--compare', help='Arquivo JSON de uma execução anterior para comparação.')
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'Casos desconhecidos: {sorted(unknown)}. Escolha entre {BENCHMARKS}.')
+
+    runners = {
+        'topology': lambda: bench_topology(args.quick, args.repeats),
+        'timeslot': lambda: bench_timeslot(args.quick, args.repeats),
+        'swapping': lambda: bench_swapping(args.quick, args.repeats, args.mode),
+        'transport': lambda: bench_transport(args.quick, args.repeats, args.mode),
+        'e91': lambda: bench_e91(args.quick, args.repeats, args.mode),
+        'snapshot': lambda: bench_snapshot(args.quick, args.repeats, args.mode),
+        'fork': lambda: bench_fork(args.quick, args.repeats, args.mode),
+        'kernels': lambda: bench_kernels(args.quick, args.repeats),
+    }
+    results = []
+    print(f'{"caso":<10}{"parâmetros":<70}{"tempo (s)":>12}{"vazão":>14}  {"pico (MiB)":>10}')
+    for name in BENCHMARKS:
+        if name not in selected:
+            continue
+        for result in runners[name]():
+            throughput = result['throughput']
+            throughput = f'{throughput:.1f}' if throughput is not None else '-'
+            print(f'{name:<10}{json.dumps(result["params"]):<70}{result["wall_time_min_s"]:>12.4f}'
+                  f'{throughput:>14}  {result["peak_memory_bytes"] / 2 ** 20:>10.2f}  {result["throughput_unit"]}')
+            results.append(result)
+
+    with open(args.output, 'w') as file:
+        json.dump({'metadata': metadata(), 'results': results}, file, indent=2)
+    print(f'\nResultados gravados em {args.output}')
+    if args.compare:
+        compare(results, args.compare)
+    return results
+
+
+if __name__ == '__main__':
+    main()
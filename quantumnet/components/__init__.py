@@ -1,3 +1,6 @@
 from .host import Host
+from .simulation import Simulator, Event
 from .network import Network
-from .controller import Controller
\ No newline at end of file
+from .routing import RoutingMatrix, RoutingTable
+from .controller import Controller
+from .replicas import ReplicaRunner, run_replica, aggregate_metrics, controller_scenario
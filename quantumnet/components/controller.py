@@ -1,50 +1,56 @@
 import networkx as nx
 from ..components import Network, Host
+from .routing import RoutingMatrix
 
 class Controller():
     def __init__(self, network):
         self.network = network
         self.hosts = None
         self.links = None
+        self.routing_matrix = None
+        self._routing_matrix_version = None
 
-    def create_routing_table(self, host_id: int) -> dict:
+    def build_routing_matrix(self) -> RoutingMatrix:
+        """
+        Build (or reuse, if the topology has not changed) the next-hop routing matrix of the network.
+        Returns:
+            RoutingMatrix: Next-hop and distance matrices for all pairs of nodes.
+        """
+        version = self.network.graph_version
+        if self.routing_matrix is None or self._routing_matrix_version != version:
+            self.routing_matrix = RoutingMatrix(self.network.graph)
+            self._routing_matrix_version = version
+        return self.routing_matrix
+
+    def create_routing_table(self, host_id: int):
         """
         Create a routing table for a node in a graph.
         Args:
             host_id (int): The node ID to create the routing table for.
         Returns:
-            dict: A routing table for the node.
+            RoutingTable: A routing table for the node, mapping each destination to its shortest path.
         """
-        shortest_paths = nx.shortest_path(self.network.graph, source=host_id)  # Get shortest paths from the node to all other nodes
-        routing_table = {}
-
-        for destination, path in shortest_paths.items():
-            if len(path) > 1:  # Ensure there's a valid path
-                routing_table[destination] = path  # Store the next hop on the shortest path
-            else:
-                routing_table[destination] = [host_id]  # Self-routing
-
-        return routing_table
+        return self.build_routing_matrix().routing_table(host_id)
 
     def register_routing_tables(self):
         """
         Register routing tables for all hosts in the network.
         """
         self.hosts = self.network.hosts
+        routing_matrix = self.build_routing_matrix()
 
         for host_id in self.hosts:
-            routing_table = self.create_routing_table(host_id)
-            self.hosts[host_id].set_routing_table(routing_table)
+            self.hosts[host_id].set_routing_table(routing_matrix.routing_table(host_id))
 
     def check_route(self, route):
         """
-        Check if a route is valid.
+        Check if a route is valid, i.e. every hop has at least one EPR pair. O(route length).
         Args:
             route (list): A list of nodes in the route.
         Returns:
             bool: True if the route is valid, False otherwise.
         """       
-        return True
+        return self.network.is_route_live(route)
 
     def announce_to_route_nodes(self, route):
         """
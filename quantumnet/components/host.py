@@ -1,14 +1,23 @@
 
-from ..objects import Logger, Qubit
+import copy
+from ..objects import Logger, Qubit, FidelityStore, QuantumMemory
 
 class Host():
-    def __init__(self, host_id: int, probability_on_demand_qubit_create: float = 0.5, probability_replay_qubit_create: float = 0.5, max_qubits_create: int = 10, memory_size: int = 10) -> None:
+    def __init__(self, host_id: int, probability_on_demand_qubit_create: float = 0.5, probability_replay_qubit_create: float = 0.5, max_qubits_create: int = 10, memory_size: int = None) -> None:
+        """
+        Args:
+            host_id (int): ID do host.
+            probability_on_demand_qubit_create (float): Probabilidade de criação de qubits sob demanda.
+            probability_replay_qubit_create (float): Probabilidade de criação de qubits por replay.
+            max_qubits_create (int): Número máximo de qubits criados.
+            memory_size (int): Capacidade da memória quântica. Se None (padrão), a memória não tem limite.
+        """
         # Sobre a rede
         self._host_id = host_id
         self._connections = []
         # Sobre o host
-        self._memory = []
         self._memory_size = memory_size
+        self._memory = QuantumMemory(capacity=memory_size)
         self._max_qubits_create = max_qubits_create
         self._probability_on_demand_qubit_create = probability_on_demand_qubit_create
         self._probability_replay_qubit_create = probability_replay_qubit_create
@@ -46,9 +55,19 @@ class Host():
         Memória do host.
 
         Returns:
-            list : Lista de qubits.
+            QuantumMemory : Memória quântica com os qubits do host.
         """
         return self._memory
+
+    @property
+    def memory_size(self):
+        """
+        Capacidade da memória do host.
+
+        Returns:
+            int : Número máximo de qubits, ou None se a memória não tem limite.
+        """
+        return self._memory_size
     
     @property
     def routing_table(self):
@@ -68,9 +87,7 @@ class Host():
             Qubit : Último qubit da memória.
         """
         try:
-            q = self.memory[-1]
-            self.memory.remove(q)
-            return q
+            return self.memory.pop()
         except IndexError:
             raise Exception('Não há mais qubits na memória.')
     
@@ -94,18 +111,63 @@ class Host():
 
         Args:
             qubit (Qubit): O qubit a ser adicionado.
+
+        Returns:
+            bool : True se o qubit foi armazenado, False se a memória estava cheia.
         """
         
-        self.memory.append(qubit)
-        Logger.get_instance().debug(f'Qubit {qubit.qubit_id} adicionado à memória do Host {self.host_id}.')
+        if not self.memory.append(qubit):
+            Logger.get_instance().debug('Memória do Host %s cheia. Qubit %s descartado.', self.host_id, qubit.qubit_id)
+            return False
+        Logger.get_instance().debug('Qubit %s adicionado à memória do Host %s.', qubit.qubit_id, self.host_id)
+        return True
+
+    def add_qubits(self, qubits: list) -> int:
+        """
+        Adiciona vários qubits à memória do host de uma só vez.
+
+        Args:
+            qubits (list): Qubits a serem adicionados.
+
+        Returns:
+            int : Número de qubits armazenados (os que não couberem na memória são descartados).
+        """
+        stored = self.memory.extend(qubits)
+        Logger.get_instance().debug('%s qubits adicionados à memória do Host %s.', stored, self.host_id)
+        return stored
+
 
 
+    def bind_fidelity_store(self, store: FidelityStore):
+        """
+        Passa a manter as fidelidades dos qubits da memória em um armazenamento contíguo.
+
+        Args:
+            store (FidelityStore): Armazenamento de fidelidades da memória.
+        """
+        self._memory.bind_store(store)
+
+    def clone(self, store: FidelityStore = None) -> 'Host':
+        """
+        Cria uma cópia do host, com cópias da memória e das conexões. A tabela de roteamento é
+        compartilhada (é substituída, e não alterada, por set_routing_table).
+
+        Args:
+            store (FidelityStore): Armazenamento de fidelidades da memória da cópia (ver QuantumMemory.clone).
+
+        Returns:
+            Host : Cópia do host.
+        """
+        host = copy.copy(self)
+        host._connections = list(self._connections)
+        host._memory = self._memory.clone(store)
+        return host
 
     def set_routing_table(self, routing_table: dict):
         """
         Define a tabela de roteamento do host.
         Args:
-            routing_table (dict): Tabela de roteamento.
+            routing_table (dict | RoutingTable): Tabela de roteamento (destino -> caminho).
         """
 
         self._routing_table = routing_table
@@ -0,0 +1,169 @@
+"""
+Fórmulas de purificação, entanglement swapping e teletransporte, usadas pelas camadas da rede.
+
+As funções aceitam tanto escalares quanto arrays NumPy (com broadcasting), não fazem log e não alteram a
+rede, de forma que a simulação e as varreduras de parâmetros (por exemplo, grades com milhões de pares de
+fidelidades para escolher limiares) usam exatamente as mesmas contas. Com escalares, o resultado é um
+escalar; com listas ou arrays, um array.
+"""
+import numpy as np
+
+PURIFICATION_TYPES = (1, 2, 3)
+
+
+def _values(x):
+    """
+    Mantém escalares e arrays como estão e converte sequências em arrays.
+    """
+    if isinstance(x, (float, int, np.generic, np.ndarray)):
+        return x
+    return np.asarray(x, dtype=np.float64)
+
+
+def purification_success_probability(f1, f2):
+    """
+    Probabilidade de sucesso da purificação de dois pares EPR.
+
+    Args:
+        f1 (float | np.ndarray): Fidelidade do primeiro par.
+        f2 (float | np.ndarray): Fidelidade do segundo par.
+
+    Returns:
+        float | np.ndarray : f1 * f2 + (1 - f1) * (1 - f2).
+    """
+    f1 = _values(f1)
+    f2 = _values(f2)
+    return (f1 * f2) + ((1 - f1) * (1 - f2))
+
+
+def purification(f1, f2, purification_type: int = 1):
+    """
+    Fidelidade do par resultante da purificação de dois pares EPR.
+
+    Args:
+        f1 (float | np.ndarray): Fidelidade do primeiro par.
+        f2 (float | np.ndarray): Fidelidade do segundo par.
+        purification_type (int): Fórmula (1 - Default, 2 - BBPSSW Protocol, 3 - DEJMPS Protocol). Outros
+            valores usam a fórmula 1.
+
+    Returns:
+        float | np.ndarray : Fidelidade após a purificação.
+    """
+    f1 = _values(f1)
+    f2 = _values(f2)
+    f1f2 = f1 * f2
+    if purification_type == 2:
+        return (f1f2 + ((1 - f1) / 3) * ((1 - f2) / 3)) / (f1f2 + f1 * ((1 - f2) / 3) + f2 * ((1 - f1) / 3) + 5 * ((1 - f1) / 3) * ((1 - f2) / 3))
+    if purification_type == 3:
+        return (2 * f1f2 + 1 - f1 - f2) / ((1 / 4) * (f1 + f2 - f1f2) + 3 / 4)
+    return f1f2 / ((f1f2) + ((1 - f1) * (1 - f2)))
+
+
+def swap_success_probability(f1, f2):
+    """
+    Probabilidade de sucesso do entanglement swapping de dois pares EPR.
+
+    Args:
+        f1 (float | np.ndarray): Fidelidade do primeiro par.
+        f2 (float | np.ndarray): Fidelidade do segundo par.
+
+    Returns:
+        float | np.ndarray : f1 * f2 + (1 - f1) * (1 - f2).
+    """
+    f1 = _values(f1)
+    f2 = _values(f2)
+    return f1 * f2 + (1 - f1) * (1 - f2)
+
+
+def swap_fidelity(f1, f2):
+    """
+    Fidelidade do par virtual criado pelo entanglement swapping de dois pares EPR.
+
+    Args:
+        f1 (float | np.ndarray): Fidelidade do primeiro par.
+        f2 (float | np.ndarray): Fidelidade do segundo par.
+
+    Returns:
+        float | np.ndarray : f1 * f2 / (f1 * f2 + (1 - f1) * (1 - f2)).
+    """
+    f1 = _values(f1)
+    f2 = _values(f2)
+    return (f1 * f2) / ((f1 * f2) + (1 - f1) * (1 - f2))
+
+
+def swap_chain(hop_fidelities, decay: float = 1.0) -> tuple:
+    """
+    Encadeia swap_success_probability e swap_fidelity ao longo de rotas inteiras. O swapping j combina o par
+    virtual do passo anterior (o par do primeiro salto, no passo 1) com o par do salto j + 1, e cada passo
+    ocupa um timeslot, como no swapping sequencial:
+        a = F_(j - 1) * decay (o par virtual envelhece um timeslot antes do swapping)
+        b = f_(j + 1) * decay ** j (o par do salto envelhece até o swapping que o consome)
+        P_j = P_(j - 1) * (a * b + (1 - a) * (1 - b)) e F_j = swap_fidelity(a, b)
+    A recorrência é percorrida salto a salto, com operações vetorizadas sobre todas as rotas (O(saltos)
+    operações NumPy). Sem decoerência (decay=1), P_j = prod(f_i) + prod(1 - f_i) e F_j = prod(f_i) / P_j, em
+    forma fechada, com os produtos acumulados em escala logarítmica (para rotas com centenas de saltos).
+
+    Args:
+        hop_fidelities (list | np.ndarray): Fidelidades dos pares de cada salto, lidas antes do primeiro
+            swapping, uma sequência por rota (ou um array (rotas, saltos)).
+        decay (float): Fator de decoerência aplicado a cada timeslot.
+
+    Returns:
+        tuple : (survival, fidelity), arrays (rotas, maior número de saltos). A coluna j corresponde ao estado
+            depois de j swappings (a fidelidade é a do par virtual no momento em que é criado); as colunas além
+            do último salto de uma rota repetem os valores finais.
+    """
+    if isinstance(hop_fidelities, np.ndarray) and hop_fidelities.ndim == 2:
+        mask = np.ones(hop_fidelities.shape, dtype=bool)
+        flat = hop_fidelities.astype(np.float64).reshape(-1)
+    else:
+        lengths = np.array([len(route) for route in hop_fidelities], dtype=np.int64)
+        width = int(lengths.max()) if len(lengths) else 0
+        mask = np.arange(width) < lengths[:, None]
+        flat = np.concatenate([np.asarray(route, dtype=np.float64) for route in hop_fidelities]) if len(lengths) else np.zeros(0)
+    if decay == 1:
+        log_good = np.zeros(mask.shape)
+        log_bad = np.zeros(mask.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_good[mask] = np.log(flat)
+            log_bad[mask] = np.log1p(-flat)
+            log_good = np.cumsum(log_good, axis=1)
+            log_bad = np.cumsum(log_bad, axis=1)
+            log_survival = np.logaddexp(log_good, log_bad)
+            fidelity = np.exp(log_good - log_survival)
+        return np.exp(log_survival), fidelity
+    hops = np.zeros(mask.shape)
+    hops[mask] = flat
+    # Fidelidade de cada par no momento em que é consumido: o salto j + 1 envelhece j timeslots
+    hops *= decay ** np.arange(mask.shape[1], dtype=np.float64)
+    survival = np.ones(mask.shape)
+    fidelity = np.empty(mask.shape)
+    if mask.shape[1]:
+        fidelity[:, 0] = hops[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j in range(1, mask.shape[1]):
+            a = fidelity[:, j - 1] * decay
+            b = hops[:, j]
+            p = a * b + (1 - a) * (1 - b)
+            valid = mask[:, j]
+            survival[:, j] = np.where(valid, survival[:, j - 1] * p, survival[:, j - 1])
+            fidelity[:, j] = np.where(valid, a * b / p, fidelity[:, j - 1])
+    return survival, fidelity
+
+
+def teleport_fidelity(f_alice, f_bob, f_route):
+    """
+    Fidelidade final do qubit teletransportado.
+
+    Args:
+        f_alice (float | np.ndarray): Fidelidade do qubit de Alice.
+        f_bob (float | np.ndarray): Fidelidade do qubit de Bob.
+        f_route (float | np.ndarray): Fidelidade da rota.
+
+    Returns:
+        float | np.ndarray : f_alice * f_bob * f_route + (1 - f_alice) * (1 - f_bob) * (1 - f_route).
+    """
+    f_alice = _values(f_alice)
+    f_bob = _values(f_bob)
+    f_route = _values(f_route)
+    return f_alice * f_bob * f_route + (1 - f_alice) * (1 - f_bob) * (1 - f_route)
@@ -1,7 +1,9 @@
+import copy
 import networkx as nx
+import numpy as np
 from quantumnet.components import Host
-from quantumnet.objects import Logger, Epr
-from random import uniform
+from quantumnet.objects import Logger, Epr, EprLedger, StreamingStats
+from .. import kernels
 
 class LinkLayer:
     def __init__(self, network, physical_layer):
@@ -20,6 +22,27 @@ class LinkLayer:
         self.used_eprs = 0  # Inicializa o contador de EPRs utilizados
         self.used_qubits = 0  # Inicializa o contador de Qubits utilizados
         self.created_eprs = []  # Armazenar os EPRs criados pela camada física
+        self.fidelity_stats = StreamingStats()  # Fidelidades dos EPRs criados, no momento em que chegam à camada
+
+    def fork(self, network, physical_layer):
+        """
+        Cria uma cópia da camada de enlace para uma bifurcação da rede (ver Network.fork).
+
+        Args:
+            network : Network : Rede bifurcada.
+            physical_layer : PhysicalLayer : Camada física da rede bifurcada.
+
+        Returns:
+            LinkLayer : Cópia da camada.
+        """
+        layer = copy.copy(self)
+        layer._network = network
+        layer._physical_layer = physical_layer
+        layer._requests = list(self._requests)
+        layer._failed_requests = list(self._failed_requests)
+        layer.created_eprs = list(self.created_eprs)
+        layer.fidelity_stats = self.fidelity_stats.copy()
+        return layer
 
     @property
     def requests(self):
@@ -38,11 +61,11 @@ class LinkLayer:
         return 'Link Layer'
     
     def get_used_eprs(self):
-        self.logger.debug(f"Eprs usados na camada {self.__class__.__name__}: {self.used_eprs}")
+        self.logger.debug('Eprs usados na camada %s: %s', self.__class__.__name__, self.used_eprs)
         return self.used_eprs
     
     def get_used_qubits(self):
-        self.logger.debug(f"Qubits usados na camada {self.__class__.__name__}: {self.used_qubits}")
+        self.logger.debug('Qubits usados na camada %s: %s', self.__class__.__name__, self.used_qubits)
         return self.used_qubits
     
     def request(self, alice_id: int, bob_id: int):
@@ -57,12 +80,13 @@ class LinkLayer:
             alice = self._network.get_host(alice_id)
             bob = self._network.get_host(bob_id)
         except KeyError:
-            self.logger.log(f'Host {alice_id} ou {bob_id} não encontrado na rede.')
+            self.logger.log('Host %s ou %s não encontrado na rede.', alice_id, bob_id)
             return False
 
         for attempt in range(1, 3):
             self._network.timeslot()
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Tentativa de emaranhamento entre {alice_id} e {bob_id}.')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Tentativa de emaranhamento entre %s e %s.', self._network.get_timeslot(), alice_id, bob_id)
 
             entangle = self._physical_layer.entanglement_creation_heralding_protocol(alice, bob)
 
@@ -73,14 +97,14 @@ class LinkLayer:
                 self._requests.append((alice_id, bob_id))
 
                 # Adiciona os EPRs criados pela camada física à lista de EPRs criados da camada de enlace
-                if self._physical_layer.created_eprs:
-                    self.created_eprs.extend(self._physical_layer.created_eprs)
-                    self._physical_layer.created_eprs.clear()  # Limpa a lista da camada física
+                self._collect_created_eprs()
                 
-                self.logger.log(f'Timeslot {self._network.get_timeslot()}: Entrelaçamento criado entre {alice} e {bob} na tentativa {attempt}.')
+                if self.logger.enabled:
+                    self.logger.log('Timeslot %s: Entrelaçamento criado entre %s e %s na tentativa %s.', self._network.get_timeslot(), alice, bob, attempt)
                 return True
             else:
-                self.logger.log(f'Timeslot {self._network.get_timeslot()}: Entrelaçamento falhou entre {alice} e {bob} na tentativa {attempt}.')
+                if self.logger.enabled:
+                    self.logger.log('Timeslot %s: Entrelaçamento falhou entre %s e %s na tentativa %s.', self._network.get_timeslot(), alice, bob, attempt)
                 self._failed_requests.append((alice_id, bob_id))
 
         # Verifica se deve realizar a purificação após duas falhas
@@ -88,22 +112,29 @@ class LinkLayer:
             purification_success = self.purification(alice_id, bob_id)
             
             # Independente de a purificação ser bem-sucedida ou não, sempre transferimos os EPRs criados
-            if self._physical_layer.created_eprs:
-                self.created_eprs.extend(self._physical_layer.created_eprs)
-                self._physical_layer.created_eprs.clear()  # Limpa a lista da camada física
+            self._collect_created_eprs()
             
             return purification_success
 
         # Após a segunda tentativa, garante que todos os EPRs criados sejam transferidos
-        if self._physical_layer.created_eprs:
-            self.created_eprs.extend(self._physical_layer.created_eprs)
-            self._physical_layer.created_eprs.clear()  # Limpa a lista da camada física
+        self._collect_created_eprs()
             
         return False
 
+    def _collect_created_eprs(self):
+        """
+        Transfere os EPRs criados pela camada física para a camada de enlace, registrando suas fidelidades.
+        """
+        created_eprs = self._physical_layer.created_eprs
+        if created_eprs:
+            for epr in created_eprs:
+                self.fidelity_stats.add(epr.get_current_fidelity())
+            self.created_eprs.extend(created_eprs)
+            created_eprs.clear()  # Limpa a lista da camada física
+
     def purification_calculator(self, f1: int, f2: int, purification_type: int) -> float:
         """
-        Cálculo das fórmulas de purificação.
+        Cálculo das fórmulas de purificação (ver kernels.purification, que aceita também arrays).
         
         Args:
             f1: int : Fidelidade do primeiro EPR.
@@ -113,29 +144,17 @@ class LinkLayer:
         Returns:
             float : Fidelidade após purificação.
         """
-        f1f2 = f1 * f2
-
-        if purification_type == 1:
-            self.logger.log('A purificação utilizada foi tipo 1.')
-            return f1f2 / ((f1f2) + ((1 - f1) * (1 - f2)))
-
-        elif purification_type == 2:
-            result = (f1f2 + ((1 - f1) / 3) * ((1 - f2) / 3)) / (f1f2 + f1 * ((1 - f2) / 3) + f2 * ((1 - f1) / 3) + 5 * ((1 - f1) / 3) * ((1 - f2) / 3))
-            self.logger.log('A purificação utilizada foi tipo 2.')
-            return result
-
-        elif purification_type == 3:
-            result = (2 * f1f2 + 1 - f1 - f2) / ((1 / 4) * (f1 + f2 - f1f2) + 3 / 4)
-            self.logger.log('A purificação utilizada foi tipo 3.')
-            return result
-        
-        self.logger.log('Purificação só pode aceitar os valores (1, 2 ou 3), a fórmula 1 foi escolhida por padrão.')
-        return f1f2 / ((f1f2) + ((1 - f1) * (1 - f2)))
+        if purification_type in kernels.PURIFICATION_TYPES:
+            self.logger.log('A purificação utilizada foi tipo %s.', purification_type)
+        else:
+            self.logger.log('Purificação só pode aceitar os valores (1, 2 ou 3), a fórmula 1 foi escolhida por padrão.')
+        return kernels.purification(f1, f2, purification_type)
 
 
     def purification(self, alice_id: int, bob_id: int, purification_type: int = 1):
         """
-        Purificação de EPRs.
+        Purificação de EPRs. Usa os dois pares falhos de maior fidelidade do canal entre Alice e Bob, que são
+        consumidos (removidos do canal) independentemente do resultado.
 
         Args:
             alice_id : int : Id do host Alice.
@@ -144,65 +163,200 @@ class LinkLayer:
         """
         self._network.timeslot()  # Incrementa o timeslot para a tentativa de purificação
 
-        eprs_fail = self._physical_layer.failed_eprs
-
-        if len(eprs_fail) < 2:
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Não há EPRs suficientes para purificação no canal ({alice_id}, {bob_id}).')
+        pool = self._network.get_eprs_from_edge(alice_id, bob_id) if self._network.graph.has_edge(alice_id, bob_id) else None
+        if pool is None or pool.failed_count < 2:
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Não há EPRs suficientes para purificação no canal (%s, %s).', self._network.get_timeslot(), alice_id, bob_id)
             return False
 
-        eprs_fail1 = eprs_fail[-1]
-        eprs_fail2 = eprs_fail[-2]
-        f1 = eprs_fail1.get_current_fidelity()
-        f2 = eprs_fail2.get_current_fidelity()
+        (eprs_fail1, eprs_fail2), fidelities = pool.failed(2)
+        f1, f2 = fidelities.tolist()
 
-        purification_prob = (f1 * f2) + ((1 - f1) * (1 - f2))
+        purification_prob = kernels.purification_success_probability(f1, f2)
 
         # Incrementa a contagem de EPRs utilizados, pois ambos serão usados na tentativa de purificação
         self.used_eprs += 2
         self.used_qubits += 4
+        ledger = self._network.epr_ledger
+        ledger.record(EprLedger.CONSUME, eprs_fail1, cause='purification')
+        ledger.record(EprLedger.CONSUME, eprs_fail2, cause='purification')
+        pool.remove(eprs_fail1)
+        pool.remove(eprs_fail2)
 
         if purification_prob > 0.5:
             new_fidelity = self.purification_calculator(f1, f2, purification_type)
 
             if new_fidelity > 0.8:  # Verifica se a nova fidelidade é maior que 0.8
-                epr_purified = Epr((alice_id, bob_id), new_fidelity)
+                epr_purified = self._physical_layer.create_epr_pair(new_fidelity, increment_timeslot=False, increment_eprs=False)
                 self._physical_layer.add_epr_to_channel(epr_purified, (alice_id, bob_id))
-                self._physical_layer.failed_eprs.remove(eprs_fail1)
-                self._physical_layer.failed_eprs.remove(eprs_fail2)
-                self.logger.log(f'EPRS Usados {self.used_eprs}')
-                self.logger.log(f'Timeslot {self._network.get_timeslot()}: Purificação bem sucedida no canal ({alice_id}, {bob_id}) com nova fidelidade {new_fidelity}.')
+                ledger.record(EprLedger.PURIFY, epr_purified, (alice_id, bob_id), 'purification')
+                self.logger.log('EPRS Usados %s', self.used_eprs)
+                if self.logger.enabled:
+                    self.logger.log('Timeslot %s: Purificação bem sucedida no canal (%s, %s) com nova fidelidade %s.', self._network.get_timeslot(), alice_id, bob_id, new_fidelity)
                 return True
             else:
-                self._physical_layer.failed_eprs.remove(eprs_fail1)
-                self._physical_layer.failed_eprs.remove(eprs_fail2)
-                self.logger.log(f'Timeslot {self._network.get_timeslot()}: Purificação falhou no canal ({alice_id}, {bob_id}) devido a baixa fidelidade após purificação.')
+                if self.logger.enabled:
+                    self.logger.log('Timeslot %s: Purificação falhou no canal (%s, %s) devido a baixa fidelidade após purificação.', self._network.get_timeslot(), alice_id, bob_id)
                 return False
         else:
-            self._physical_layer.failed_eprs.remove(eprs_fail1)
-            self._physical_layer.failed_eprs.remove(eprs_fail2)
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Purificação falhou no canal ({alice_id}, {bob_id}) devido a baixa probabilidade de sucesso da purificação.')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Purificação falhou no canal (%s, %s) devido a baixa probabilidade de sucesso da purificação.', self._network.get_timeslot(), alice_id, bob_id)
             return False
-        
+
+    def purification_schedule(self, alice_id: int, bob_id: int, schedule: str = 'recurrence', rounds: int = 1, purification_type: int = 1,
+                              threshold: float = 0.8, failed_only: bool = True) -> int:
+        """
+        Purificação em lote dos pares de um canal, em várias rodadas, com uma operação vetorizada por rodada
+        (ver kernels.purification).
+
+        Esquemas:
+            'recurrence': a cada rodada, os pares são ordenados por fidelidade e purificados dois a dois (o
+                primeiro com o segundo, o terceiro com o quarto...); os resultados seguem para a rodada seguinte.
+            'pumping': os pares, ordenados por fidelidade, são divididos em grupos de rounds + 1; em cada grupo, o
+                de maior fidelidade é purificado, uma vez por rodada, com cada um dos demais.
+
+        Como em purification, uma purificação só é bem-sucedida se a probabilidade de sucesso
+        (f1 * f2 + (1 - f1) * (1 - f2)) for maior que 0.5, e os pares usados são consumidos mesmo se ela falhar.
+        Ao final, os pares purificados com fidelidade acima de threshold são adicionados ao canal; os demais são
+        descartados. Cada rodada ocupa um timeslot.
+
+        Args:
+            alice_id : int : Id do host Alice.
+            bob_id : int : Id do host Bob.
+            schedule : str : Esquema de purificação ('recurrence' ou 'pumping').
+            rounds : int : Número de rodadas.
+            purification_type : int : Tipo de protocolo de purificação (ver purification_calculator).
+            threshold : float : Fidelidade mínima dos pares purificados mantidos no canal.
+            failed_only : bool : Se True, usa somente os pares falhos do canal; se False, todos os pares.
+
+        Returns:
+            int : Número de pares purificados adicionados ao canal.
+
+        Raises:
+            ValueError: Se o esquema for inválido.
+        """
+        if schedule not in ('recurrence', 'pumping'):
+            raise ValueError("Esquema de purificação inválido. Escolha entre 'recurrence' e 'pumping'.")
+        network = self._network
+        if not network.graph.has_edge(alice_id, bob_id):
+            self.logger.log('Canal entre %s-%s não existe', alice_id, bob_id)
+            return 0
+        pool = network.get_eprs_from_edge(alice_id, bob_id)
+        eprs, fidelities = pool.failed() if failed_only else pool.best()
+        if schedule == 'recurrence':
+            consumed, results, steps = self._recurrence(fidelities, rounds, purification_type)
+        else:
+            consumed, results, steps = self._pumping(fidelities, rounds, purification_type)
+
+        # Aplica ao canal somente o resultado líquido: os pares consumidos e os pares purificados mantidos
+        consumed = np.flatnonzero(consumed).tolist()
+        if consumed:
+            used = [eprs[i] for i in consumed]
+            ledger = network.epr_ledger
+            ledger.record_many(EprLedger.CONSUME, used, (alice_id, bob_id), 'purification', fidelities=fidelities[consumed])
+            for epr in used:
+                pool.remove(epr)
+            self.used_eprs += len(used)
+            self.used_qubits += 2 * len(used)
+            kept = results[results > threshold]
+            purified = [self._physical_layer.create_epr_pair(fidelity, increment_timeslot=False, increment_eprs=False) for fidelity in kept.tolist()]
+            for epr in purified:
+                self._physical_layer.add_epr_to_channel(epr, (alice_id, bob_id))
+            ledger.record_many(EprLedger.PURIFY, purified, (alice_id, bob_id), 'purification', fidelities=kept)
+        else:
+            purified = []
+        network.timeslot(max(steps, 1))
+        if self.logger.enabled:
+            self.logger.log('Timeslot %s: Purificação em lote (%s, %s rodadas) no canal (%s, %s): %s pares consumidos, %s pares purificados.',
+                            network.get_timeslot(), schedule, steps, alice_id, bob_id, len(consumed), len(purified))
+        return len(purified)
+
+    def _recurrence(self, fidelities: np.ndarray, rounds: int, purification_type: int) -> tuple:
+        """
+        Esquema de recorrência (ver purification_schedule) sobre fidelidades em ordem decrescente.
+
+        Returns:
+            tuple : (máscara dos pares consumidos, fidelidades dos pares purificados, rodadas executadas).
+        """
+        consumed = np.zeros(len(fidelities), dtype=bool)
+        current = fidelities
+        # Origem de cada par da rodada: índice do par original, ou -1 para pares já purificados
+        origin = np.arange(len(fidelities))
+        steps = 0
+        while steps < rounds and len(current) >= 2:
+            order = np.argsort(-current, kind='stable')
+            current = current[order]
+            origin = origin[order]
+            count = len(current) // 2
+            f1 = current[0:2 * count:2]
+            f2 = current[1:2 * count:2]
+            used = origin[:2 * count]
+            consumed[used[used >= 0]] = True
+            success = kernels.purification_success_probability(f1, f2) > 0.5
+            purified = kernels.purification(f1[success], f2[success], purification_type)
+            current = np.concatenate([purified, current[2 * count:]])
+            origin = np.concatenate([np.full(len(purified), -1), origin[2 * count:]])
+            steps += 1
+        return consumed, current[origin < 0], steps
+
+    def _pumping(self, fidelities: np.ndarray, rounds: int, purification_type: int) -> tuple:
+        """
+        Esquema de bombeamento (ver purification_schedule) sobre fidelidades em ordem decrescente.
+
+        Returns:
+            tuple : (máscara dos pares consumidos, fidelidades dos pares purificados, rodadas executadas).
+        """
+        size = rounds + 1
+        groups = -(-len(fidelities) // size)
+        padded = np.full(groups * size, np.nan)
+        padded[:len(fidelities)] = fidelities
+        padded = padded.reshape(groups, size)
+        used = np.zeros(padded.shape, dtype=bool)
+        target = padded[:, 0]
+        # Os grupos com um único par não são purificados
+        alive = ~np.isnan(padded[:, 1]) if size > 1 else np.zeros(groups, dtype=bool)
+        used[:, 0] = alive
+        steps = 0
+        for column in range(1, size):
+            auxiliary = padded[:, column]
+            active = alive & ~np.isnan(auxiliary)
+            if not active.any():
+                break
+            used[:, column] = active
+            with np.errstate(invalid='ignore', divide='ignore'):
+                success = active & (kernels.purification_success_probability(target, auxiliary) > 0.5)
+                target = np.where(success, kernels.purification(target, auxiliary, purification_type), target)
+            alive &= ~active | success
+            steps += 1
+        consumed = used.reshape(-1)[:len(fidelities)]
+        return consumed, target[alive], steps
+
     def avg_fidelity_on_linklayer(self):
         """
-        Calcula a fidelidade média dos EPRs criados na camada de enlace.
+        Calcula a fidelidade média dos EPRs criados na camada de enlace, em O(1).
         
         Returns:
             float : Fidelidade média dos EPRs da camada de enlace.
         """
-        total_fidelity = 0
-        total_eprs = len(self.created_eprs)
-
-        for epr in self.created_eprs:   
-            total_fidelity += epr.get_current_fidelity()
-
-        if total_eprs == 0:
+        stats = self.fidelity_stats
+        if stats.count == 0:
             self.logger.log('Não há EPRs criados na camada de enlace.')
             return 0
 
+        print(f'Total de EPRs criados na camada de enlace: {stats.count}')
+        print(f'Total de fidelidade dos EPRs criados na camada de enlace: {stats.total}')
+        self.logger.log('A fidelidade média dos EPRs criados na camada de enlace é %s', stats.mean)
+        return stats.mean
 
-        print(f'Total de EPRs criados na camada de enlace: {total_eprs}')
-        print(f'Total de fidelidade dos EPRs criados na camada de enlace: {total_fidelity}')
-        avg_fidelity = total_fidelity / total_eprs
-        self.logger.log(f'A fidelidade média dos EPRs criados na camada de enlace é {avg_fidelity}')
-        return avg_fidelity
+    def fidelity_quantile(self, q: float) -> float:
+        """
+        Retorna um quantil estimado da fidelidade dos EPRs criados na camada de enlace.
+
+        Args:
+            q (float): Quantil (0.5, 0.95 ou 0.99).
+
+        Returns:
+            float : Quantil da fidelidade, ou 0 se não houver EPRs.
+        """
+        value = self.fidelity_stats.quantile(q)
+        return value if value is not None else 0
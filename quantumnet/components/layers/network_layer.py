@@ -1,7 +1,9 @@
+import copy
 import networkx as nx
+import numpy as np
 from quantumnet.components import Host
-from quantumnet.objects import Logger, Epr
-from random import uniform
+from quantumnet.objects import Logger, Epr, EprLedger, StreamingStats
+from .. import kernels
 
 class NetworkLayer:
     def __init__(self, network, link_layer, physical_layer):
@@ -21,6 +23,31 @@ class NetworkLayer:
         self.used_eprs = 0  # Inicializa o contador de EPRs utilizados
         self.used_qubits = 0  # Inicializa o contador de Qubits utilizados
         self.routes_used = {}  # Inicializa o dicionário de rotas usadas 
+        self.route_stats = StreamingStats()  # Tamanhos (em saltos) das rotas registradas em routes_used
+        self._predecessors = {}  # Cache dos predecessores de caminhos mínimos, por origem
+        self._predecessors_version = None  # Versão da topologia usada no cache
+    def fork(self, network, link_layer, physical_layer):
+        """
+        Cria uma cópia da camada de rede para uma bifurcação da rede (ver Network.fork). O cache de
+        predecessores é mantido, já que a topologia da rede bifurcada é a mesma.
+
+        args:
+            network : Network : Rede bifurcada.
+            link_layer : LinkLayer : Camada de enlace da rede bifurcada.
+            physical_layer : PhysicalLayer : Camada física da rede bifurcada.
+
+        returns:
+            NetworkLayer : Cópia da camada.
+        """
+        layer = copy.copy(self)
+        layer._network = network
+        layer._link_layer = link_layer
+        layer._physical_layer = physical_layer
+        layer.routes_used = dict(self.routes_used)
+        layer.route_stats = self.route_stats.copy()
+        layer._predecessors = dict(self._predecessors)
+        return layer
+
     def __str__(self):
         """ Retorna a representação em string da camada de rede. 
         
@@ -30,13 +57,87 @@ class NetworkLayer:
 
     def get_used_eprs(self):
         """Retorna a contagem de EPRs utilizados na camada de rede."""
-        self.logger.debug(f"Eprs usados na camada {self.__class__.__name__}: {self.used_eprs}")
+        self.logger.debug('Eprs usados na camada %s: %s', self.__class__.__name__, self.used_eprs)
         return self.used_eprs
     
     def get_used_qubits(self):
-        self.logger.debug(f"Qubits usados na camada {self.__class__.__name__}: {self.used_qubits}")
+        self.logger.debug('Qubits usados na camada %s: %s', self.__class__.__name__, self.used_qubits)
         return self.used_qubits
 
+    def _get_predecessors(self, source: int) -> dict:
+        """
+        Retorna os predecessores de cada nó nos caminhos mínimos a partir da origem.
+        O resultado fica em cache até a próxima alteração na topologia da rede.
+
+        args:
+            source (int): ID do nó de origem.
+
+        returns:
+            dict: Lista de predecessores de cada nó alcançável.
+        """
+        version = self._network.graph_version
+        if self._predecessors_version != version:
+            self._predecessors.clear()
+            self._predecessors_version = version
+        pred = self._predecessors.get(source)
+        if pred is None:
+            pred = nx.predecessor(self._network.graph, source)
+            self._predecessors[source] = pred
+        return pred
+
+    def all_shortest_paths(self, Alice: int, Bob: int, live_only: bool = False):
+        """
+        Enumera, sob demanda, todos os caminhos mínimos entre dois nós, na mesma ordem de nx.all_shortest_paths.
+        Os caminhos são construídos a partir dos predecessores em cache.
+
+        args:
+            Alice (int): ID do nó de origem.
+            Bob (int): ID do nó de destino.
+            live_only (bool): Se True, descarta durante a busca os caminhos com algum canal sem pares EPR.
+
+        returns:
+            generator: Caminhos mínimos entre os nós.
+
+        raises:
+            nx.NetworkXNoPath: Se não houver caminho entre os nós.
+        """
+        pred = self._get_predecessors(Alice)
+        if Bob not in pred:
+            raise nx.NetworkXNoPath(f'Target {Bob} cannot be reached from given sources')
+        live = self._network.live_neighbors if live_only else None
+        return self._build_paths(Alice, Bob, pred, live)
+
+    @staticmethod
+    def _build_paths(source: int, target: int, pred: dict, live=None):
+        """
+        Percorre os predecessores do destino até a origem, gerando um caminho por vez. Se `live` for
+        informado (função que retorna os vizinhos com pares EPR de um nó), os ramos que passam por um
+        canal sem pares EPR são descartados sem serem percorridos.
+        """
+        seen = {target}
+        stack = [[target, 0]]
+        top = 0
+        while top >= 0:
+            node, i = stack[top]
+            if node == source:
+                yield [p for p, n in reversed(stack[:top + 1])]
+            if len(pred[node]) > i:
+                stack[top][1] = i + 1
+                next_node = pred[node][i]
+                if next_node in seen:
+                    continue
+                if live is not None and next_node not in live(node):
+                    continue
+                seen.add(next_node)
+                top += 1
+                if top == len(stack):
+                    stack.append([next_node, 0])
+                else:
+                    stack[top][:] = [next_node, 0]
+            else:
+                seen.discard(node)
+                top -= 1
+
     def short_route_valid(self, Alice: int, Bob: int, increment_timeslot=True) -> list:
         """
         Escolhe a melhor rota entre dois hosts com critérios adicionais.
@@ -51,40 +152,33 @@ class NetworkLayer:
         """
         if increment_timeslot:
             self._network.timeslot()  # Incrementa o timeslot sempre que uma rota é verificada
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Buscando rota válida entre {Alice} e {Bob}.')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Buscando rota válida entre %s e %s.', self._network.get_timeslot(), Alice, Bob)
 
         if Alice is None or Bob is None:
             self.logger.log('IDs de hosts inválidos fornecidos.')
             return None
 
         if not self._network.graph.has_node(Alice) or not self._network.graph.has_node(Bob):
-            self.logger.log(f'Um dos nós ({Alice} ou {Bob}) não existe no grafo.')
+            self.logger.log('Um dos nós (%s ou %s) não existe no grafo.', Alice, Bob)
             return None
 
         try:
-            all_shortest_paths = list(nx.all_shortest_paths(self._network.graph, Alice, Bob))
+            # Os caminhos mínimos são percorridos apenas pelos canais que têm pares EPR
+            valid_paths = self.all_shortest_paths(Alice, Bob, live_only=True)
         except nx.NetworkXNoPath:
-            self.logger.log(f'Sem rota encontrada entre {Alice} e {Bob}')
+            self.logger.log('Sem rota encontrada entre %s e %s', Alice, Bob)
             return None
 
-        for path in all_shortest_paths:
-            valid_path = True
-            for i in range(len(path) - 1):
-                node = path[i]
-                next_node = path[i + 1]
-                if len(self._network.get_eprs_from_edge(node, next_node)) < 1:
-                    self.logger.log(f'Sem pares EPRs entre {node} e {next_node} na rota {path}')
-                    valid_path = False
-                    break
-
-            if valid_path:
-                self.logger.log(f'Rota válida encontrada: {path}')
+        for path in valid_paths:
+            self.logger.log('Rota válida encontrada: %s', path)
 
-                # Armazena a rota se for a primeira vez que é usada
-                if (Alice, Bob) not in self.routes_used:
-                    self.routes_used[(Alice, Bob)] = path.copy()
+            # Armazena a rota se for a primeira vez que é usada
+            if (Alice, Bob) not in self.routes_used:
+                self.routes_used[(Alice, Bob)] = path.copy()
+                self.route_stats.add(len(path) - 1)
 
-                return path
+            return path
 
         self.logger.log('Nenhuma rota válida encontrada.')
         return None
@@ -93,7 +187,9 @@ class NetworkLayer:
 
     def entanglement_swapping(self, Alice: int = None, Bob: int = None) -> bool:
         """
-        Realiza o Entanglement Swapping em toda a rota determinada pelo short_route_valid.
+        Realiza o Entanglement Swapping em toda a rota determinada pelo short_route_valid (ver
+        entanglement_swapping_routes). O par virtual final fica na tabela de enlaces virtuais da rede
+        (virtual_links); o grafo da rede não é alterado.
         
         args:
             Alice (int, optional): ID do host de origem. Se não fornecido, usa o primeiro nó da rota válida.
@@ -110,107 +206,191 @@ class NetworkLayer:
             self.logger.log('Não foi possível determinar uma rota válida.')
             return False
 
-        # Define Alice e Bob como o primeiro e o último nó da rota, respectivamente
-        Alice = route[0]
-        Bob = route[-1]
-
-        # Itera sobre a rota realizando o entanglement swapping para cada segmento da rota
-        while len(route) > 1:
-            # Incrementa o timeslot antes de cada operação de entanglement swapping
-            self._network.timeslot()
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Realizando Entanglement Swapping.')
-
-            node1 = route[0]    # Primeiro nó na rota
-            node2 = route[1]    # Segundo nó na rota
-            node3 = route[2] if len(route) > 2 else None  # Terceiro nó na rota (se existir)
-
-            # Verifica se existe um canal entre node1 e node2
-            if not self._network.graph.has_edge(node1, node2):
-                self.logger.log(f'Canal entre {node1}-{node2} não existe')
-                return False
-
-            try:
-                # Obtém o primeiro par EPR entre node1 e node2
-                epr1 = self._network.get_eprs_from_edge(node1, node2)[0]
-            except IndexError:
-                # Se não houver pares EPR suficientes, loga a falha e retorna False
-                self.logger.log(f'Não há pares EPRs suficientes entre {node1}-{node2}')
-                return False
-
-            # Se houver um terceiro nó, realiza o swapping entre node1, node2 e node3
-            if node3 is not None:
-                # Verifica se existe um canal entre node2 e node3
-                if not self._network.graph.has_edge(node2, node3):
-                    self.logger.log(f'Canal entre {node2}-{node3} não existe')
-                    return False
-
-                try:
-                    # Obtém o primeiro par EPR entre node2 e node3
-                    epr2 = self._network.get_eprs_from_edge(node2, node3)[0]
-                except IndexError:
-                    # Se não houver pares EPR suficientes, loga a falha e retorna False
-                    self.logger.log(f'Não há pares EPRs suficientes entre {node2}-{node3}')
-                    return False
-
-                # Mede a fidelidade dos pares EPR
-                fidelity1 = epr1.get_current_fidelity()
-                fidelity2 = epr2.get_current_fidelity()
-                
-                # Calcula a probabilidade de sucesso do entanglement swapping
-                success_prob = fidelity1 * fidelity2 + (1 - fidelity1) * (1 - fidelity2)
-                
-                # Verifica se o swapping foi bem-sucedido com base na probabilidade de sucesso
-                if uniform(0, 1) > success_prob:
-                    self.logger.log(f'Entanglement Swapping falhou entre {node1}-{node2} e {node2}-{node3}')
-                    return False
-
-                # Calcula a nova fidelidade do par EPR virtual
-                new_fidelity = (fidelity1 * fidelity2) / ((fidelity1 * fidelity2) + (1 - fidelity1) * (1 - fidelity2))
-                epr_virtual = Epr((node1, node3), new_fidelity)
-
-                # Se o canal entre node1 e node3 não existir, adiciona um novo canal
-                if not self._network.graph.has_edge(node1, node3):
-                    self._network.graph.add_edge(node1, node3, eprs=[])
-
-                # Adiciona o par EPR virtual ao canal entre node1 e node3
-                self._network.physical.add_epr_to_channel(epr_virtual, (node1, node3))
-                # Remove os pares EPR antigos dos canais entre node1-node2 e node2-node3
-                self._network.physical.remove_epr_from_channel(epr1, (node1, node2))
-                self._network.physical.remove_epr_from_channel(epr2, (node2, node3))
-
-                # Atualiza o contador de EPRs utilizados
-                self.used_eprs += 1
-
-                # Remove o segundo nó da rota, pois o swapping foi realizado
-                route.pop(1)
-            else:
-                # Se não há um terceiro nó, apenas remove o segundo nó da rota
-                route.pop(1)
+        return self.entanglement_swapping_routes([route])[0]
+
+    @staticmethod
+    def swap_chain(hop_fidelities, decay: float = 1.0) -> tuple:
+        """
+        Avalia o entanglement swapping sequencial ao longo de rotas inteiras, com uma passagem vetorizada sobre
+        as fidelidades dos saltos de todas as rotas (ver kernels.swap_chain).
+
+        args:
+            hop_fidelities (list | np.ndarray): Fidelidades dos pares de cada salto, uma sequência por rota
+                (ou um array (rotas, saltos)).
+            decay (float): Fator de decoerência aplicado a cada passo (timeslot) do swapping.
+
+        returns:
+            tuple : (survival, fidelity), arrays (rotas, maior número de saltos), com a probabilidade de sucesso
+                e a fidelidade do par virtual depois de j swappings na coluna j.
+        """
+        return kernels.swap_chain(hop_fidelities, decay)
+
+    def _step_decay(self) -> float:
+        """
+        Fator de decoerência de cada passo do swapping. Durante um evento do simulador os timeslots são adiados
+        (ver Network.timeslot) e os pares não envelhecem dentro da cadeia.
+        """
+        network = self._network
+        if network._simulator is not None and network._simulator.dispatching:
+            return 1.0
+        return network.decoherence_factor
+
+    def _route_pairs(self, routes: list, exclusive: bool = True) -> tuple:
+        """
+        Seleciona o par EPR de cada salto das rotas: o mais antigo de cada canal ou, com exclusive=True, o
+        mais antigo ainda não reservado por uma rota anterior da lista. Cada canal guarda o último par reservado,
+        de forma que a próxima reserva custa O(1) mesmo com muitas rotas compartilhando o canal.
 
-        # Loga o sucesso do entanglement swapping
-        self.logger.log(f'Entanglement Swapping concluído com sucesso entre {Alice} e {Bob}')
-        return True
+        returns:
+            tuple : (pares de cada rota, fidelidades de cada rota); None nas rotas sem canal ou sem pares.
+        """
+        network = self._network
+        graph = network.graph
+        reserved = {}  # Último par reservado de cada canal
+        route_eprs = []
+        slots = []
+        for route in routes:
+            eprs = []
+            for u, v in zip(route, route[1:]):
+                if not graph.has_edge(u, v):
+                    self.logger.log('Canal entre %s-%s não existe', u, v)
+                    eprs = None
+                    break
+                pool = network.get_eprs_from_edge(u, v)
+                epr = pool.following(reserved.get(pool) if exclusive else None)
+                if epr is None:
+                    self.logger.log('Não há pares EPRs suficientes entre %s-%s', u, v)
+                    eprs = None
+                    break
+                eprs.append(epr)
+            if eprs is not None and exclusive:
+                for epr in eprs:
+                    reserved[epr._pool] = epr
+            route_eprs.append(eprs)
+            if eprs is not None:
+                slots.extend(epr._slot for epr in eprs)
+        values = network.fidelity_store.get_many(np.array(slots, dtype=np.int64)).tolist()
+        fidelities = []
+        start = 0
+        for eprs in route_eprs:
+            if eprs is None:
+                fidelities.append(None)
+                continue
+            fidelities.append(values[start:start + len(eprs)])
+            start += len(eprs)
+        return route_eprs, fidelities
+
+    def evaluate_routes(self, routes: list) -> tuple:
+        """
+        Calcula, sem consumir pares nem avançar o timeslot, a probabilidade de sucesso e a fidelidade final do
+        entanglement swapping de cada rota, usando o par mais antigo de cada salto e a decoerência de cada passo
+        (ver swap_chain). A fidelidade final é a do par entre os extremos ao fim do swapping, um timeslot depois
+        do último swapping.
+
+        args:
+            routes (list): Rotas (listas de nós).
+
+        returns:
+            tuple : (probabilidades de sucesso, fidelidades finais), arrays com um valor por rota; as rotas sem
+                canal ou sem pares em algum salto têm probabilidade 0 e fidelidade NaN.
+        """
+        _, fidelities = self._route_pairs(routes, exclusive=False)
+        success = np.zeros(len(routes))
+        final = np.full(len(routes), np.nan)
+        feasible = [i for i, values in enumerate(fidelities) if values is not None]
+        if feasible:
+            decay = self._step_decay()
+            survival, fidelity = self.swap_chain([fidelities[i] for i in feasible], decay)
+            success[feasible] = survival[:, -1]
+            final[feasible] = fidelity[:, -1] * decay
+        return success, final
+
+    def entanglement_swapping_routes(self, routes: list) -> list:
+        """
+        Realiza o Entanglement Swapping ao longo de várias rotas, em lote. Cada rota usa, em cada salto, o par EPR
+        mais antigo ainda não usado por uma rota anterior da lista.
+
+        O resultado de cada rota é calculado por swap_chain, com a decoerência de cada passo, e um único sorteio:
+        a rota é percorrida com sucesso até o primeiro swapping j com P_j menor que o número sorteado, o que tem
+        a mesma distribuição que sortear cada swapping em sequência. Somente o efeito líquido é aplicado à rede:
+        os pares dos saltos combinados com sucesso são consumidos e um único par virtual, entre o primeiro nó da
+        rota e o último alcançado, é adicionado aos enlaces virtuais. As rotas são processadas em paralelo: o
+        timeslot avança o número de passos da rota mais longa (um por salto percorrido, como no swapping
+        sequencial), e o par virtual de uma rota mais curta envelhece pelos passos restantes.
+
+        args:
+            routes (list): Rotas (listas de nós, com pelo menos 2 nós).
+
+        returns:
+            list: True para cada rota em que todos os swappings foram bem-sucedidos, False caso contrário.
+        """
+        network = self._network
+        results = [False] * len(routes)
+        route_eprs, fidelities = self._route_pairs(routes)
+        feasible = [i for i, eprs in enumerate(route_eprs) if eprs is not None]
+        if not feasible:
+            return results
+        decay = self._step_decay()
+        survival, fidelity = self.swap_chain([fidelities[i] for i in feasible], decay)
+        hops = np.array([len(route_eprs[i]) for i in feasible], dtype=np.int64)
+        uniforms = network.rng.uniforms(len(feasible))
+        # Número de swappings bem-sucedidos de cada rota: o primeiro que falha, ou todos
+        columns = np.arange(1, survival.shape[1])
+        failed = (survival[:, 1:] < uniforms[:, None]) & (columns < hops[:, None])
+        first = failed.argmax(axis=1) if failed.shape[1] else np.zeros(len(feasible), dtype=np.int64)
+        swaps = np.where(failed.any(axis=1), first, hops - 1).tolist()
+        steps = max(swaps) + 1
+
+        ledger = network.epr_ledger
+        virtual_links = network.virtual_links
+        finals = []
+        for row, i in enumerate(feasible):
+            route = routes[i]
+            count = swaps[row]
+            complete = count == len(route) - 2
+            if count:
+                # Consome os pares dos saltos combinados; o par do salto j é consumido no passo max(j, 1)
+                eprs = route_eprs[i][:count + 1]
+                edges = list(zip(route, route[1:]))[:count + 1]
+                consumed = [value * decay ** max(j, 1) for j, value in enumerate(fidelities[i][:count + 1])]
+                ledger.record_many(EprLedger.CONSUME, eprs, edges, 'swap', fidelities=consumed)
+                for epr in eprs:
+                    epr._pool.remove(epr)
+                # O par virtual é criado no passo count e envelhece até o último passo do lote
+                finals.append((route, count, float(fidelity[row, count]) * decay ** (steps - count)))
+                self.used_eprs += count
+            if complete:
+                self.logger.log('Entanglement Swapping concluído com sucesso entre %s e %s', route[0], route[-1])
+                results[i] = True
+            else:
+                self.logger.log('Entanglement Swapping falhou entre %s-%s e %s-%s', route[0], route[count + 1], route[count + 1], route[count + 2])
+        network.timeslot(steps)
+        for route, count, value in finals:
+            epr_virtual = self._physical_layer.create_epr_pair(value, increment_timeslot=False, increment_eprs=False)
+            virtual_links.add(epr_virtual, route[0], route[count + 1])
+            ledger.record(EprLedger.SWAP, epr_virtual, (route[0], route[count + 1]), 'swap')
+        return results
 
     def get_avg_size_routes(self):
         """
-        Calcula o tamanho médio das rotas utilizadas, considerando o número de saltos (arestas) entre os nós.
+        Calcula o tamanho médio das rotas utilizadas, considerando o número de saltos (arestas) entre os nós, em O(1).
         
         returns:
             float: Tamanho médio das rotas utilizadas.
         """
-        total_size = 0
-        num_routes = 0
-        
-        # Itera sobre as rotas armazenadas no dicionário
-        for route in self.routes_used.values():
-            total_size += len(route) - 1  # Soma o número de arestas (saltos), que é o número de nós menos 1
-            num_routes += 1  # Conta o número de rotas
-        
-        # Calcula a média, se houver rotas válidas
-        if num_routes > 0:
-            self.avg_size_routes = total_size / num_routes
-        else:
-            # Retorna 0 se não houver rotas válidas
-            self.avg_size_routes = 0.0
-        
+        # Retorna 0 se não houver rotas válidas
+        self.avg_size_routes = self.route_stats.mean if self.route_stats.count else 0.0
         return self.avg_size_routes
+
+    def route_size_quantile(self, q: float) -> float:
+        """
+        Retorna um quantil estimado do tamanho (em saltos) das rotas utilizadas.
+
+        args:
+            q (float): Quantil (0.5, 0.95 ou 0.99).
+
+        returns:
+            float: Quantil do tamanho das rotas, ou 0 se não houver rotas.
+        """
+        value = self.route_stats.quantile(q)
+        return value if value is not None else 0.0
@@ -1,7 +1,7 @@
-from ...objects import Logger, Qubit, Epr
+from ...objects import Logger, Qubit, Epr, EprLedger
 from ...components import Host
-from random import uniform
-import random
+import copy
+import math
 
 class PhysicalLayer:
     def __init__(self, network, physical_layer_id: int = 0):
@@ -16,9 +16,8 @@ class PhysicalLayer:
         self._physical_layer_id = physical_layer_id
         self._network = network
         self._qubits = []
-        self._failed_eprs = []
         self.created_eprs = []  # Lista para armazenar todos os EPRs criados
-        self._initial_qubits_fidelity = random.uniform(self.min_prob, self.max_prob)
+        self._initial_qubits_fidelity = network.rng.uniform(self.min_prob, self.max_prob)
         self._count_qubit = 0
         self._count_epr = 0
         self.logger = Logger.get_instance()
@@ -34,6 +33,22 @@ class PhysicalLayer:
         """
         return f'Physical Layer {self.physical_layer_id}'
       
+    def fork(self, network):
+        """Cria uma cópia da camada física para uma bifurcação da rede (ver Network.fork). As listas de
+        objetos são copiadas; os objetos, não.
+
+        Args:
+            network (Network): Rede bifurcada.
+
+        Returns:
+            PhysicalLayer: Cópia da camada.
+        """
+        layer = copy.copy(self)
+        layer._network = network
+        layer._qubits = list(self._qubits)
+        layer.created_eprs = list(self.created_eprs)
+        return layer
+
     @property
     def physical_layer_id(self):
         """Retorna o id da camada física.
@@ -54,19 +69,33 @@ class PhysicalLayer:
     
     @property
     def failed_eprs(self):
-        """Retorna os pares EPR que falharam.
+        """Retorna os pares EPR que falharam e ainda estão nos canais. Os pares falhos ficam marcados nos pools
+        dos canais (ver EprPool.failed), em ordem de fidelidade por canal.
+
+        A propriedade é somente leitura: a tupla é montada a cada leitura, percorrendo os canais (O(canais)),
+        e alterá-la não afeta os canais. Para marcar um par como falho, use EprPool.mark_failed; a marca é
+        desfeita quando o par deixa o canal. Para os pares falhos de um único canal, use
+        get_eprs_from_edge(u, v).failed(), em O(pares do canal).
         
         Returns:
-            dict: Dicionário de pares EPR que falharam.
+            tuple: Pares EPR que falharam.
         """
-        return self._failed_eprs
+        network = self._network
+        failed = []
+        for u, v, data in network.graph.edges(data=True):
+            if 'eprs' not in data:
+                continue
+            pool = network.get_eprs_from_edge(u, v)
+            if pool.failed_count:
+                failed.extend(pool.failed()[0])
+        return tuple(failed)
     
     def get_used_eprs(self):
-        self.logger.debug(f"Eprs usados na camada {self.__class__.__name__}: {self.used_eprs}")
+        self.logger.debug('Eprs usados na camada %s: %s', self.__class__.__name__, self.used_eprs)
         return self.used_eprs
     
     def get_used_qubits(self):
-        self.logger.debug(f"Qubits usados na camada {self.__class__.__name__}: {self.used_qubits}")
+        self.logger.debug('Qubits usados na camada %s: %s', self.__class__.__name__, self.used_qubits)
         return self.used_qubits
     
     def create_qubit(self, host_id: int, increment_timeslot: bool = True, increment_qubits : bool = True):
@@ -88,14 +117,78 @@ class PhysicalLayer:
             raise Exception(f'Host {host_id} não existe na rede.')
 
         qubit_id = self._count_qubit
-        qubit = Qubit(qubit_id)
-        self._network.hosts[host_id].add_qubit(qubit)
+        qubit = Qubit(qubit_id, rng=self._network.rng)
+        stored = self._network.hosts[host_id].add_qubit(qubit)
         
-        current_timeslot = self._network.get_timeslot()
-        self._network.register_qubit_creation(qubit_id, current_timeslot)
+        # O timeslot de criação só é registrado se o qubit coube na memória do host
+        if stored:
+            current_timeslot = self._network.get_timeslot()
+            self._network.register_qubit_creation(qubit_id, current_timeslot)
     
         self._count_qubit += 1
-        self.logger.debug(f'Qubit {qubit_id} criado com fidelidade inicial {qubit.get_initial_fidelity()} e adicionado à memória do Host {host_id}.')
+        if stored and self.logger.enabled:
+            self.logger.debug('Qubit %s criado com fidelidade inicial %s e adicionado à memória do Host %s.', qubit_id, qubit.get_initial_fidelity(), host_id)
+
+    def create_qubits(self, host_id: int, num_qubits: int, increment_timeslot: bool = True, increment_qubits: bool = True) -> list:
+        """Cria vários qubits de uma vez e os adiciona à memória do host especificado. As fidelidades iniciais
+        são sorteadas em bloco e os qubits são anexados à memória de uma só vez. Todos são criados no mesmo timeslot.
+
+        Args:
+            host_id (int): ID do host onde os qubits serão criados.
+            num_qubits (int): Número de qubits.
+            increment_timeslot (bool): Indica se o timeslot deve ser incrementado (uma vez).
+            increment_qubits (bool): Indica se os qubits devem ser contabilizados como usados.
+
+        Returns:
+            list: Qubits criados.
+
+        Raises:
+            Exception: Se o host especificado não existir na rede.
+        """
+        return self.create_qubits_on_hosts([host_id], num_qubits, increment_timeslot, increment_qubits)
+
+    def create_qubits_on_hosts(self, host_ids: list, num_qubits: int, increment_timeslot: bool = True, increment_qubits: bool = True) -> list:
+        """Cria o mesmo número de qubits em cada um dos hosts informados, em lote. Os qubits e as fidelidades
+        iniciais são os mesmos que chamadas sucessivas a create_qubit, host a host, produziriam.
+
+        Args:
+            host_ids (list): IDs dos hosts, na ordem de criação.
+            num_qubits (int): Número de qubits por host.
+            increment_timeslot (bool): Indica se o timeslot deve ser incrementado (uma vez).
+            increment_qubits (bool): Indica se os qubits devem ser contabilizados como usados.
+
+        Returns:
+            list: Qubits criados.
+
+        Raises:
+            Exception: Se algum dos hosts não existir na rede.
+        """
+        if increment_timeslot:
+            self._network.timeslot()
+
+        total = num_qubits * len(host_ids)
+        if increment_qubits:
+            self.used_qubits += total
+
+        hosts = self._network.hosts
+        for host_id in host_ids:
+            if host_id not in hosts:
+                raise Exception(f'Host {host_id} não existe na rede.')
+
+        first_id = self._count_qubit
+        fidelities = self._network.rng.uniforms(total).tolist()
+        qubits = [Qubit(first_id + i, fidelity) for i, fidelity in enumerate(fidelities)]
+        current_timeslot = self._network.get_timeslot()
+        qubit_timeslots = self._network.qubit_timeslots
+        for i, host_id in enumerate(host_ids):
+            start = i * num_qubits
+            # Os qubits que não couberem na memória (os últimos do bloco) são descartados e não são registrados
+            stored = hosts[host_id].add_qubits(qubits[start:start + num_qubits])
+            qubit_timeslots.update({first_id + start + k: {'timeslot': current_timeslot} for k in range(stored)})
+
+        self._count_qubit += total
+        self.logger.debug('%s qubits criados em cada um de %s hosts.', num_qubits, len(host_ids))
+        return qubits
 
     def create_epr_pair(self, fidelity: float = 1.0, increment_timeslot: bool = True, increment_eprs: bool = True):
         """Cria um par de qubits entrelaçados.
@@ -114,6 +207,28 @@ class PhysicalLayer:
         self._count_epr += 1
         return epr
 
+    def create_epr_pairs(self, num_eprs: int, fidelity: float = 1.0, increment_timeslot: bool = True, increment_eprs: bool = True) -> list:
+        """Cria vários pares EPR com a mesma fidelidade, com ids consecutivos.
+
+        Args:
+            num_eprs (int): Número de pares.
+            fidelity (float): Fidelidade dos pares.
+            increment_timeslot (bool): Indica se o timeslot deve ser incrementado (uma vez).
+            increment_eprs (bool): Indica se os pares devem ser contabilizados como usados.
+
+        Returns:
+            list: Pares EPR criados.
+        """
+        if increment_timeslot:
+            self._network.timeslot()
+
+        if increment_eprs:
+            self.used_eprs += num_eprs
+
+        first_id = self._count_epr
+        self._count_epr += num_eprs
+        return [Epr(epr_id, fidelity) for epr_id in range(first_id, first_id + num_eprs)]
+
     def add_epr_to_channel(self, epr: Epr, channel: tuple):
         """Adiciona um par EPR ao canal.
 
@@ -122,10 +237,9 @@ class PhysicalLayer:
             channel (tuple): Canal.
         """
         u, v = channel
-        if not self._network.graph.has_edge(u, v):
-            self._network.graph.add_edge(u, v, eprs=[])
-        self._network.graph.edges[u, v]['eprs'].append(epr)
-        self.logger.debug(f'Par EPR {epr} adicionado ao canal {channel}.')
+        self._network.add_channel(u, v)
+        self._network.get_eprs_from_edge(u, v).append(epr)
+        self.logger.debug('Par EPR %s adicionado ao canal %s.', epr, channel)
 
     def remove_epr_from_channel(self, epr: Epr, channel: tuple):
         """Remove um par EPR do canal.
@@ -136,13 +250,64 @@ class PhysicalLayer:
         """
         u, v = channel
         if not self._network.graph.has_edge(u, v):
-            self.logger.debug(f'Canal {channel} não existe.')
+            self.logger.debug('Canal %s não existe.', channel)
             return
         try:
-            self._network.graph.edges[u, v]['eprs'].remove(epr)
-            self.logger.debug(f'Par EPR {epr} removido do canal {channel}.')
+            self._network.get_eprs_from_edge(u, v).remove(epr)
+            self.logger.debug('Par EPR %s removido do canal %s.', epr, channel)
         except ValueError:
-            self.logger.debug(f'Par EPR {epr} não encontrado no canal {channel}.')
+            self.logger.debug('Par EPR %s não encontrado no canal %s.', epr, channel)
+
+    def schedule_epr_generation(self, alice_host_id: int, bob_host_id: int, delay: int = 1, fidelity: float = 1.0, on_complete=None):
+        """Agenda no simulador da rede a conclusão da geração de um par EPR em um canal.
+
+        Args:
+            alice_host_id (int): ID do Host de Alice.
+            bob_host_id (int): ID do Host de Bob.
+            delay (int): Número de timeslots até a conclusão da geração.
+            fidelity (float): Fidelidade do par gerado.
+            on_complete (callable): Chamada como on_complete(epr) após o par ser adicionado ao canal.
+
+        Returns:
+            Event: Evento agendado.
+        """
+        def complete():
+            epr = self.create_epr_pair(fidelity, increment_timeslot=False)
+            self.add_epr_to_channel(epr, (alice_host_id, bob_host_id))
+            self._network.epr_ledger.record(EprLedger.CREATE, epr, (alice_host_id, bob_host_id), 'scheduled')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Geração do par EPR %s concluída no canal (%s, %s).', self._network.get_timeslot(), epr.epr_id, alice_host_id, bob_host_id)
+            if on_complete is not None:
+                on_complete(epr)
+        return self._network.schedule(delay, complete)
+
+    def schedule_epr_expiry(self, epr: Epr, channel: tuple, threshold: float = 0.8):
+        """Agenda no simulador da rede a remoção de um par EPR quando a decoerência levar sua fidelidade abaixo de um limiar.
+
+        Args:
+            epr (Epr): Par EPR.
+            channel (tuple): Canal do par.
+            threshold (float): Fidelidade mínima.
+
+        Returns:
+            Event: Evento agendado, ou None se a fidelidade nunca cai abaixo do limiar.
+        """
+        fidelity = epr.get_current_fidelity()
+        factor = self._network.decoherence_factor
+        if fidelity < threshold:
+            delay = 0
+        elif threshold <= 0 or not 0 < factor < 1:
+            return None
+        else:
+            # Menor número de timeslots k tal que fidelidade * fator ** k < limiar
+            delay = math.floor(math.log(threshold / fidelity) / math.log(factor)) + 1
+
+        def expire():
+            if epr.get_current_fidelity() < threshold:
+                self._network.epr_ledger.record(EprLedger.EXPIRE, epr, channel, 'expiry')
+                self.remove_epr_from_channel(epr, channel)
+                self.logger.debug('Par EPR %s expirou no canal %s.', epr, channel)
+        return self._network.schedule(delay, expire)
 
     def fidelity_measurement_only_one(self, qubit: Qubit):
         """Mede a fidelidade de um qubit.
@@ -156,13 +321,14 @@ class PhysicalLayer:
         fidelity = qubit.get_current_fidelity()  # Inicializa a variável 'fidelity' no início
         
         if self._network.get_timeslot() > 0:
-            # Aplica um fator de decoerência (0.99 neste exemplo)
+            # Aplica um fator de decoerência (0.99 neste exemplo). No modo de decoerência 'lazy', a leitura
+            # acima já materializou a decoerência acumulada e a escrita abaixo reinicia a contagem do qubit.
             new_fidelity = max(0, fidelity * 0.99)  
             qubit.set_current_fidelity(new_fidelity)  # Atualiza a fidelidade do qubit
-            self.logger.log(f'A fidelidade do qubit {qubit} é {new_fidelity}')
+            self.logger.log('A fidelidade do qubit %s é %s', qubit, new_fidelity)
             return new_fidelity
 
-        self.logger.log(f'A fidelidade do qubit {qubit} é {fidelity}')
+        self.logger.log('A fidelidade do qubit %s é %s', qubit, fidelity)
         return fidelity
 
     def fidelity_measurement(self, qubit1: Qubit, qubit2: Qubit):
@@ -170,7 +336,7 @@ class PhysicalLayer:
         fidelity1 = self.fidelity_measurement_only_one(qubit1)
         fidelity2 = self.fidelity_measurement_only_one(qubit2)
         combined_fidelity = fidelity1 * fidelity2
-        self.logger.log(f'A fidelidade entre o qubit {fidelity1} e o qubit {fidelity2} é {combined_fidelity}')
+        self.logger.log('A fidelidade entre o qubit %s e o qubit %s é %s', fidelity1, fidelity2, combined_fidelity)
         return combined_fidelity
     
     def entanglement_creation_heralding_protocol(self, alice: Host, bob: Host):
@@ -189,7 +355,8 @@ class PhysicalLayer:
         q2 = qubit2.get_current_fidelity()
 
         epr_fidelity = q1 * q2
-        self.logger.log(f'Timeslot {self._network.get_timeslot()}: Par epr criado com fidelidade {epr_fidelity}')
+        if self.logger.enabled:
+            self.logger.log('Timeslot %s: Par epr criado com fidelidade %s', self._network.get_timeslot(), epr_fidelity)
         epr = self.create_epr_pair(epr_fidelity)
 
         # Armazena o EPR criado na lista de EPRs criados
@@ -197,17 +364,23 @@ class PhysicalLayer:
 
         alice_host_id = alice.host_id
         bob_host_id = bob.host_id
+        ledger = self._network.epr_ledger
+        ledger.record(EprLedger.CREATE, epr, (alice_host_id, bob_host_id), 'heralding')
 
         if epr_fidelity >= 0.8:
             # Se a fidelidade for adequada, adiciona o EPR ao canal da rede
-            self._network.graph.edges[(alice_host_id, bob_host_id)]['eprs'].append(epr)
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: O protocolo de criação de emaranhamento foi bem sucedido com a fidelidade necessária.')
+            self._network.get_eprs_from_edge(alice_host_id, bob_host_id).append(epr)
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: O protocolo de criação de emaranhamento foi bem sucedido com a fidelidade necessária.', self._network.get_timeslot())
             return True
         else:
-            # Adiciona o EPR ao canal mesmo com baixa fidelidade
-            self._network.graph.edges[(alice_host_id, bob_host_id)]['eprs'].append(epr)
-            self._failed_eprs.append(epr)
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: O protocolo de criação de emaranhamento foi bem sucedido, mas com fidelidade baixa.')
+            # Adiciona o EPR ao canal mesmo com baixa fidelidade, marcado como falho (candidato à purificação)
+            pool = self._network.get_eprs_from_edge(alice_host_id, bob_host_id)
+            pool.append(epr)
+            pool.mark_failed(epr)
+            ledger.record(EprLedger.FAIL, epr, (alice_host_id, bob_host_id), 'heralding')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: O protocolo de criação de emaranhamento foi bem sucedido, mas com fidelidade baixa.', self._network.get_timeslot())
             return False
 
     def echp_on_demand(self, alice_host_id: int, bob_host_id: int):
@@ -232,13 +405,17 @@ class PhysicalLayer:
         prob_on_demand_epr_create = self._network.edges[alice_host_id, bob_host_id]['prob_on_demand_epr_create']
         echp_success_probability = prob_on_demand_epr_create * fidelity_qubit1 * fidelity_qubit2
             
-        if uniform(0, 1) < echp_success_probability:
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Par EPR criado com a fidelidade de {fidelity_qubit1 * fidelity_qubit2}')
+        if self._network.rng.uniform() < echp_success_probability:
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Par EPR criado com a fidelidade de %s', self._network.get_timeslot(), fidelity_qubit1 * fidelity_qubit2)
             epr = self.create_epr_pair(fidelity_qubit1 * fidelity_qubit2)
-            self._network.edges[alice_host_id, bob_host_id]['eprs'].append(epr)
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: A probabilidade de sucesso do ECHP é {echp_success_probability}')
+            self._network.get_eprs_from_edge(alice_host_id, bob_host_id).append(epr)
+            self._network.epr_ledger.record(EprLedger.CREATE, epr, (alice_host_id, bob_host_id), 'echp')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: A probabilidade de sucesso do ECHP é %s', self._network.get_timeslot(), echp_success_probability)
             return True
-        self.logger.log(f'Timeslot {self._network.get_timeslot()}: A probabilidade de sucesso do ECHP falhou.')
+        if self.logger.enabled:
+            self.logger.log('Timeslot %s: A probabilidade de sucesso do ECHP falhou.', self._network.get_timeslot())
         return False
 
     def echp_on_replay(self, alice_host_id: int, bob_host_id: int):
@@ -263,11 +440,15 @@ class PhysicalLayer:
         prob_replay_epr_create = self._network.edges[alice_host_id, bob_host_id]['prob_replay_epr_create']
         echp_success_probability = prob_replay_epr_create * fidelity_qubit1 * fidelity_qubit2
         
-        if uniform(0, 1) < echp_success_probability:
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Par EPR criado com a fidelidade de {fidelity_qubit1 * fidelity_qubit2}')
+        if self._network.rng.uniform() < echp_success_probability:
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Par EPR criado com a fidelidade de %s', self._network.get_timeslot(), fidelity_qubit1 * fidelity_qubit2)
             epr = self.create_epr_pair(fidelity_qubit1 * fidelity_qubit2)
-            self._network.edges[alice_host_id, bob_host_id]['eprs'].append(epr)
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: A probabilidade de sucesso do ECHP é {echp_success_probability}')
+            self._network.get_eprs_from_edge(alice_host_id, bob_host_id).append(epr)
+            self._network.epr_ledger.record(EprLedger.CREATE, epr, (alice_host_id, bob_host_id), 'echp')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: A probabilidade de sucesso do ECHP é %s', self._network.get_timeslot(), echp_success_probability)
             return True
-        self.logger.log(f'Timeslot {self._network.get_timeslot()}: A probabilidade de sucesso do ECHP falhou.')
+        if self.logger.enabled:
+            self.logger.log('Timeslot %s: A probabilidade de sucesso do ECHP falhou.', self._network.get_timeslot())
         return False
\ No newline at end of file
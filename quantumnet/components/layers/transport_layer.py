@@ -1,10 +1,12 @@
+import copy
 import networkx as nx
+import numpy as np
 from quantumnet.components import Host
-from quantumnet.objects import Logger, Epr
-from random import uniform
+from quantumnet.objects import Logger, Epr, StreamingStats, TransportLog
+from .. import kernels
 
 class TransportLayer:
-    def __init__(self, network, network_layer, link_layer, physical_layer):
+    def __init__(self, network, network_layer, link_layer, physical_layer, retention='all', spill_path: str = None):
         """
         Inicializa a camada de transporte.
         
@@ -13,17 +15,44 @@ class TransportLayer:
             network_layer : NetworkLayer : Camada de rede.
             link_layer : LinkLayer : Camada de enlace.
             physical_layer : PhysicalLayer : Camada física.
+            retention : str | int : Política de retenção do registro de transmissões ('all', 'spill' ou os últimos N).
+            spill_path : str : Arquivo do registro de transmissões na retenção 'spill'.
         """
         self._network = network
         self._physical_layer = physical_layer
         self._network_layer = network_layer
         self._link_layer = link_layer
         self.logger = Logger.get_instance()
-        self.transmitted_qubits = []
+        self.transport_log = TransportLog(retention, spill_path)  # Registro colunar dos qubits transmitidos
+        self.fidelity_stats = StreamingStats()  # Fidelidades finais dos qubits teletransportados
         self.used_eprs = 0
         self.used_qubits = 0
         self.created_eprs = []  # Lista para armazenar EPRs criados
 
+    def fork(self, network, network_layer, link_layer, physical_layer):
+        """
+        Cria uma cópia da camada de transporte para uma bifurcação da rede (ver Network.fork). O registro de
+        transmissões é bifurcado (ver TransportLog.fork).
+
+        args:
+            network : Network : Rede bifurcada.
+            network_layer : NetworkLayer : Camada de rede da rede bifurcada.
+            link_layer : LinkLayer : Camada de enlace da rede bifurcada.
+            physical_layer : PhysicalLayer : Camada física da rede bifurcada.
+
+        returns:
+            TransportLayer : Cópia da camada.
+        """
+        layer = copy.copy(self)
+        layer._network = network
+        layer._network_layer = network_layer
+        layer._link_layer = link_layer
+        layer._physical_layer = physical_layer
+        layer.transport_log = self.transport_log.fork()
+        layer.fidelity_stats = self.fidelity_stats.copy()
+        layer.created_eprs = list(self.created_eprs)
+        return layer
+
     def __str__(self):
         """ Retorna a representação em string da camada de transporte. 
         
@@ -32,11 +61,11 @@ class TransportLayer:
         return f'Transport Layer'
     
     def get_used_eprs(self):
-        self.logger.debug(f"Eprs usados na camada {self.__class__.__name__}: {self.used_eprs}")
+        self.logger.debug('Eprs usados na camada %s: %s', self.__class__.__name__, self.used_eprs)
         return self.used_eprs
     
     def get_used_qubits(self):
-        self.logger.debug(f"Qubits usados na camada {self.__class__.__name__}: {self.used_qubits}")
+        self.logger.debug('Qubits usados na camada %s: %s', self.__class__.__name__, self.used_qubits)
         return self.used_qubits
     
     def request_transmission(self, alice_id: int, bob_id: int, num_qubits: int):
@@ -55,11 +84,11 @@ class TransportLayer:
         available_qubits = len(alice.memory)
 
         if available_qubits < num_qubits:
-            self.logger.log(f'Número insuficiente de qubits na memória de Alice (Host:{alice_id}). Tentando transmitir os {available_qubits} qubits disponíveis.')
+            self.logger.log('Número insuficiente de qubits na memória de Alice (Host:%s). Tentando transmitir os %s qubits disponíveis.', alice_id, available_qubits)
             num_qubits = available_qubits
 
         if num_qubits == 0:
-            self.logger.log(f'Nenhum qubit disponível na memória de Alice ({alice_id}) para transmissão.')
+            self.logger.log('Nenhum qubit disponível na memória de Alice (%s) para transmissão.', alice_id)
             return False
 
         max_attempts = 2
@@ -68,13 +97,15 @@ class TransportLayer:
 
         while attempts < max_attempts and not success:
             self._network.timeslot()  # Incrementa o timeslot para cada tentativa de transmissão
-            self.logger.log(f'Timeslot {self._network.get_timeslot()}: Tentativa de transmissão {attempts + 1} entre {alice_id} e {bob_id}.')
+            if self.logger.enabled:
+                self.logger.log('Timeslot %s: Tentativa de transmissão %s entre %s e %s.', self._network.get_timeslot(), attempts + 1, alice_id, bob_id)
             
             routes = []
             for _ in range(num_qubits):
                 route = self._network_layer.short_route_valid(alice_id, bob_id)
                 if route is None:
-                    self.logger.log(f'Não foi possível encontrar uma rota válida na tentativa {attempts + 1}. Timeslot: {self._network.get_timeslot()}')
+                    if self.logger.enabled:
+                        self.logger.log('Não foi possível encontrar uma rota válida na tentativa %s. Timeslot: %s', attempts + 1, self._network.get_timeslot())
                     break
                 routes.append(route)
             
@@ -85,8 +116,9 @@ class TransportLayer:
                         node1 = route[i]
                         node2 = route[i + 1]
                         # Verifica se há pelo menos um par EPR disponível no canal
-                        if len(self._network.get_eprs_from_edge(node1, node2)) < 1:
-                            self.logger.log(f'Falha ao encontrar par EPR entre {node1} e {node2} na tentativa {attempts + 1}. Timeslot: {self._network.get_timeslot()}')
+                        if not self._network.has_epr(node1, node2):
+                            if self.logger.enabled:
+                                self.logger.log('Falha ao encontrar par EPR entre %s e %s na tentativa %s. Timeslot: %s', node1, node2, attempts + 1, self._network.get_timeslot())
                             success = False
                             break
                     if not success:
@@ -98,16 +130,13 @@ class TransportLayer:
         if success:
             # Registrar os qubits transmitidos
             for route in routes:
-                qubit_info = {
-                    'route': route,
-                    'alice_id': alice_id,
-                    'bob_id': bob_id,
-                }
-                self.transmitted_qubits.append(qubit_info)
-            self.logger.log(f'Transmissão de {num_qubits} qubits entre {alice_id} e {bob_id} concluída com sucesso. Timeslot: {self._network.get_timeslot()}')
+                self._record_transmission(TransportLog.REQUEST, alice_id, bob_id, route, timeslot=self._network.get_timeslot())
+            if self.logger.enabled:
+                self.logger.log('Transmissão de %s qubits entre %s e %s concluída com sucesso. Timeslot: %s', num_qubits, alice_id, bob_id, self._network.get_timeslot())
             return True
         else:
-            self.logger.log(f'Falha na transmissão de {num_qubits} qubits entre {alice_id} e {bob_id} após {attempts} tentativas. Timeslot: {self._network.get_timeslot()}')
+            if self.logger.enabled:
+                self.logger.log('Falha na transmissão de %s qubits entre %s e %s após %s tentativas. Timeslot: %s', num_qubits, alice_id, bob_id, attempts, self._network.get_timeslot())
             return False
 
     def teleportation_protocol(self, alice_id: int, bob_id: int):
@@ -122,12 +151,14 @@ class TransportLayer:
             bool : True se o teletransporte foi bem-sucedido, False caso contrário.
         """
         self._network.timeslot()  # Incrementa o timeslot para o protocolo de teletransporte
-        self.logger.log(f'Timeslot {self._network.get_timeslot()}: Iniciando teletransporte entre {alice_id} e {bob_id}.')
+        if self.logger.enabled:
+            self.logger.log('Timeslot %s: Iniciando teletransporte entre %s e %s.', self._network.get_timeslot(), alice_id, bob_id)
         
         # Estabelece uma rota válida
         route = self._network_layer.short_route_valid(alice_id, bob_id)
         if route is None:
-            self.logger.log(f'Não foi possível encontrar uma rota válida para teletransporte entre {alice_id} e {bob_id}. Timeslot: {self._network.get_timeslot()}')
+            if self.logger.enabled:
+                self.logger.log('Não foi possível encontrar uma rota válida para teletransporte entre %s e %s. Timeslot: %s', alice_id, bob_id, self._network.get_timeslot())
             return False
         
         # Pega um qubit de Alice e um qubit de Bob
@@ -135,10 +166,11 @@ class TransportLayer:
         bob = self._network.get_host(bob_id)
         
         if len(alice.memory) < 1 or len(bob.memory) < 1:
-            self.logger.log(f'Alice ou Bob não possuem qubits suficientes para teletransporte. Timeslot: {self._network.get_timeslot()}')
+            if self.logger.enabled:
+                self.logger.log('Alice ou Bob não possuem qubits suficientes para teletransporte. Timeslot: %s', self._network.get_timeslot())
             return False
         
-        qubit_alice = alice.memory.pop(0)  # Remove o primeiro qubit da memória de Alice
+        qubit_alice = alice.memory.popleft()  # Remove o primeiro qubit da memória de Alice
         qubit_bob = bob.memory.pop()       # Remove o último qubit da memória de Bob
         
         # Calcula a fidelidade final do teletransporte
@@ -146,71 +178,137 @@ class TransportLayer:
         f_bob = qubit_bob.get_current_fidelity()
         
         # Assume fidelidade do link como a média das fidelidades dos pares EPR na rota
-        fidelities = []
-        for i in range(len(route) - 1):
-            epr_pairs = self._network.get_eprs_from_edge(route[i], route[i+1])
-            fidelities.extend([epr.get_current_fidelity() for epr in epr_pairs])
+        f_route = self.route_fidelity(route)
         
-        if not fidelities:
-            self.logger.log(f'Não foi possível encontrar pares EPR na rota entre {alice_id} e {bob_id}. Timeslot: {self._network.get_timeslot()}')
+        if f_route is None:
+            if self.logger.enabled:
+                self.logger.log('Não foi possível encontrar pares EPR na rota entre %s e %s. Timeslot: %s', alice_id, bob_id, self._network.get_timeslot())
             return False
         
-        f_route = sum(fidelities) / len(fidelities)
-        
         # Fidelidade final do qubit teletransportado
-        F_final = f_alice * f_bob * f_route + (1 - f_alice) * (1 - f_bob) * (1 - f_route)
-        
-        qubit_info = {
-            'alice_id': alice_id,
-            'bob_id': bob_id,
-            'route': route,
-            'fidelity_alice': f_alice,
-            'fidelity_bob': f_bob,
-            'fidelity_route': f_route,
-            'F_final': F_final,
-            'qubit_alice': qubit_alice,
-            'qubit_bob': qubit_bob,
-            'success': True
-        }
+        F_final = kernels.teleport_fidelity(f_alice, f_bob, f_route)
         
         # Adiciona o qubit teletransportado à memória de Bob com a fidelidade final calculada
-        qubit_alice.fidelity = F_final
-        bob.memory.append(qubit_alice)
-        self.logger.log(f'Teletransporte de qubit de {alice_id} para {bob_id} foi bem-sucedido com fidelidade final de {F_final}. Timeslot: {self._network.get_timeslot()}')
+        qubit_alice.set_current_fidelity(F_final)
+        if not bob.memory.append(qubit_alice):
+            if self.logger.enabled:
+                self.logger.log('Memória de Bob (Host %s) cheia: o qubit teletransportado de %s foi descartado. Timeslot: %s', bob_id, alice_id, self._network.get_timeslot())
+            return False
+        if self.logger.enabled:
+            self.logger.log('Teletransporte de qubit de %s para %s foi bem-sucedido com fidelidade final de %s. Timeslot: %s', alice_id, bob_id, F_final, self._network.get_timeslot())
         
         # Par virtual é deletado no final
         for i in range(len(route) - 1):
-            self._network.remove_epr(route[i], route[i + 1])
+            self._network.remove_epr(route[i], route[i + 1], cause='teleport')
         
-        self.transmitted_qubits.append(qubit_info)
+        self._record_transmission(TransportLog.TELEPORT, alice_id, bob_id, route, fidelity_alice=f_alice, fidelity_bob=f_bob,
+                                  fidelity_route=f_route, F_final=F_final, timeslot=self._network.get_timeslot(),
+                                  qubit_id=qubit_alice.qubit_id, qubit_bob_id=qubit_bob.qubit_id)
         return True
 
-    def avg_fidelity_on_transportlayer(self):
+    def route_fidelity(self, route: list):
+        """
+        Calcula a fidelidade da rota como a média das fidelidades de todos os pares EPR de todos os saltos.
+        Usa a soma de fidelidades mantida por cada canal, com custo O(número de saltos).
+
+        args:
+            route : list : Lista de nós da rota.
+
+        returns:
+            float or None : Fidelidade da rota, ou None se não houver pares EPR na rota.
         """
-        Calcula a fidelidade média de todos os qubits realmente utilizados na camada de transporte.
+        total = 0.0
+        count = 0
+        for i in range(len(route) - 1):
+            pool = self._network.get_eprs_from_edge(route[i], route[i + 1])
+            total += pool.fidelity_sum()
+            count += len(pool)
+        if count == 0:
+            return None
+        return total / count
+
+    def routes_fidelity(self, routes: list) -> np.ndarray:
+        """
+        Calcula a fidelidade de várias rotas de uma vez. A soma e a contagem de cada canal são lidas
+        uma única vez, mesmo que o canal apareça em várias rotas.
+
+        args:
+            routes : list : Lista de rotas (listas de nós).
 
         returns:
-            float : Fidelidade média dos qubits utilizados na camada de transporte.
+            np.ndarray : Fidelidade de cada rota (NaN para rotas sem pares EPR).
+        """
+        channels = {}
+        result = np.full(len(routes), np.nan)
+        for index, route in enumerate(routes):
+            total = 0.0
+            count = 0
+            for i in range(len(route) - 1):
+                edge = (route[i], route[i + 1])
+                totals = channels.get(edge)
+                if totals is None:
+                    pool = self._network.get_eprs_from_edge(*edge)
+                    totals = (pool.fidelity_sum(), len(pool))
+                    channels[edge] = channels[edge[::-1]] = totals
+                total += totals[0]
+                count += totals[1]
+            if count:
+                result[index] = total / count
+        return result
+
+    @property
+    def transmitted_qubits(self):
+        """
+        Qubits transmitidos, como uma sequência de dicionários (visão do registro colunar de transmissões).
+
+        returns:
+            TransportLog : Registro de transmissões.
         """
-        total_fidelity = 0
-        total_qubits_used = 0
+        return self.transport_log
 
-        # Calcula a fidelidade dos qubits transmitidos e registrados no log de qubits transmitidos
-        for qubit_info in self.transmitted_qubits:
-            fidelity = qubit_info['F_final']
-            total_fidelity += fidelity
-            total_qubits_used += 1
-            self.logger.log(f'Fidelidade do qubit utilizado de {qubit_info["alice_id"]} para {qubit_info["bob_id"]}: {fidelity}')
+    def _record_transmission(self, kind: int, alice_id: int, bob_id: int, route: list, **fields):
+        """
+        Registra um qubit transmitido e atualiza as estatísticas de fidelidade.
 
+        args:
+            kind : int : Tipo do registro (TransportLog.REQUEST, TELEPORT ou TRANSPORT).
+            alice_id : int : Id do host Alice.
+            bob_id : int : Id do host Bob.
+            route : list : Rota usada.
+            **fields : Demais campos do registro (ver TransportLog.append).
+        """
+        self.transport_log.append(kind, alice_id, bob_id, route, **fields)
+        if fields.get('F_final') is not None:
+            self.fidelity_stats.add(fields['F_final'])
+
+    def avg_fidelity_on_transportlayer(self):
+        """
+        Calcula a fidelidade média de todos os qubits realmente utilizados na camada de transporte, em O(1).
+
+        returns:
+            float : Fidelidade média dos qubits utilizados na camada de transporte.
+        """
         # Considera apenas os qubits efetivamente transmitidos (não inclui os qubits que permanecem na memória dos hosts)
-        if total_qubits_used == 0:
+        stats = self.fidelity_stats
+        if stats.count == 0:
             self.logger.log('Nenhum qubit foi utilizado na camada de transporte.')
             return 0.0
 
-        avg_fidelity = total_fidelity / total_qubits_used
-        self.logger.log(f'A fidelidade média de todos os qubits utilizados na camada de transporte é {avg_fidelity}')
-        
-        return avg_fidelity
+        self.logger.log('A fidelidade média de todos os qubits utilizados na camada de transporte é %s', stats.mean)
+        return stats.mean
+
+    def fidelity_quantile(self, q: float) -> float:
+        """
+        Retorna um quantil estimado da fidelidade final dos qubits teletransportados.
+
+        args:
+            q : float : Quantil (0.5, 0.95 ou 0.99).
+
+        returns:
+            float : Quantil da fidelidade, ou 0 se nenhum qubit foi teletransportado.
+        """
+        value = self.fidelity_stats.quantile(q)
+        return value if value is not None else 0.0
 
 
     def get_teleported_qubits(self):
@@ -218,7 +316,7 @@ class TransportLayer:
         Retorna a lista de qubits teletransportados.
         
         returns:
-            list : Lista de dicionários contendo informações dos qubits teletransportados.
+            TransportLog : Sequência de dicionários contendo informações dos qubits teletransportados.
         """
         return self.transmitted_qubits
 
@@ -241,20 +339,22 @@ class TransportLayer:
         # Se Alice tiver menos qubits do que o necessário, crie mais qubits
         if available_qubits < num_qubits:
             qubits_needed = num_qubits - available_qubits
-            self.logger.log(f'Número insuficiente de qubits na memória de Alice (Host {alice_id}). Criando mais {qubits_needed} qubits para completar os {num_qubits} necessários.')
+            self.logger.log('Número insuficiente de qubits na memória de Alice (Host %s). Criando mais %s qubits para completar os %s necessários.', alice_id, qubits_needed, num_qubits)
 
             for _ in range(qubits_needed):
                 self._network.timeslot()  # Incrementa o timeslot a cada criação de qubit
-                self.logger.log(f"Timeslot antes da criação do qubit: {self._network.get_timeslot()}")
+                if self.logger.enabled:
+                    self.logger.log('Timeslot antes da criação do qubit: %s', self._network.get_timeslot())
                 self._physical_layer.create_qubit(alice_id)  # Cria novos qubits para Alice
-                self.logger.log(f"Qubit criado para Alice (Host {alice_id}) no timeslot: {self._network.get_timeslot()}")
+                if self.logger.enabled:
+                    self.logger.log('Qubit criado para Alice (Host %s) no timeslot: %s', alice_id, self._network.get_timeslot())
 
             # Atualiza a quantidade de qubits disponíveis após a criação
             available_qubits = len(alice.memory)
 
         # Certifique-se de que Alice tenha exatamente o número de qubits necessários após a criação
         if available_qubits != num_qubits:
-            self.logger.log(f'Erro: Alice tem {available_qubits} qubits, mas deveria ter {num_qubits} qubits. Abortando transmissão.')
+            self.logger.log('Erro: Alice tem %s qubits, mas deveria ter %s qubits. Abortando transmissão.', available_qubits, num_qubits)
             return False
 
         # Começa a transmissão dos qubits
@@ -263,76 +363,62 @@ class TransportLayer:
         success_count = 0
 
         while attempts < max_attempts and success_count < num_qubits:
-            self.logger.log(f'Tentativa {attempts + 1} de transmissão de qubits entre {alice_id} e {bob_id}.')
+            self.logger.log('Tentativa %s de transmissão de qubits entre %s e %s.', attempts + 1, alice_id, bob_id)
 
             for _ in range(num_qubits - success_count):
                 # Tenta encontrar uma rota válida
                 route = self._network_layer.short_route_valid(alice_id, bob_id)
 
                 if route is None:
-                    self.logger.log(f'Não foi possível encontrar uma rota válida na tentativa {attempts + 1}. Timeslot: {self._network.get_timeslot()}')
+                    if self.logger.enabled:
+                        self.logger.log('Não foi possível encontrar uma rota válida na tentativa %s. Timeslot: %s', attempts + 1, self._network.get_timeslot())
                     break
 
                 # Verifica a fidelidade dos pares EPR ao longo da rota
-                fidelities = []
-                for i in range(len(route) - 1):
-                    node1 = route[i]
-                    node2 = route[i + 1]
-
-
-                    epr_pairs = self._network.get_eprs_from_edge(node1, node2)
-                    if len(epr_pairs) == 0:
-                        self.logger.log(f'Não foi possível encontrar pares EPR suficientes na rota {route[i]} -> {route[i + 1]}.')
-                        break
-                    fidelities.extend([epr.get_current_fidelity() for epr in epr_pairs])
+                f_route = self.route_fidelity(route)
 
                 # Se falhar em encontrar pares EPR suficientes, tenta na próxima tentativa
-                if len(fidelities) == 0:
+                if f_route is None:
+                    self.logger.log('Não foi possível encontrar pares EPR suficientes na rota %s.', route)
                     attempts += 1
                     continue
 
-                f_route = sum(fidelities) / len(fidelities)
-
                 # Se a rota for encontrada, transmite o qubit imediatamente
                 if len(alice.memory) > 0:  # Verifica se ainda há qubits na memória de Alice
-                    qubit_alice = alice.memory.pop(0)  # REMOVE o qubit de Alice
+                    qubit_alice = alice.memory.popleft()  # REMOVE o qubit de Alice
                     f_alice = qubit_alice.get_current_fidelity()
                     F_final = f_alice * f_route
 
-                    # Armazena informações sobre o qubit transmitido
-                    qubit_info = {
-                        'alice_id': alice_id,
-                        'bob_id': bob_id,
-                        'route': route,
-                        'fidelity_alice': f_alice,
-                        'fidelity_route': f_route,
-                        'F_final': F_final,
-                        'timeslot': self._network.get_timeslot(),
-                        'qubit': qubit_alice
-                    }
-
                     # Adiciona o qubit transmitido à memória de Bob
-                    qubit_alice.fidelity = F_final
-                    bob.memory.append(qubit_alice)
+                    qubit_alice.set_current_fidelity(F_final)
+                    if not bob.memory.append(qubit_alice):
+                        # Memória de Bob cheia: o qubit é descartado e as próximas transmissões também falhariam
+                        self.logger.log('Memória de Bob (Host %s) cheia. Qubit de %s descartado na rota %s.', bob_id, alice_id, route)
+                        attempts = max_attempts
+                        break
 
                     # Incrementa o contador de qubits e timeslot
                     success_count += 1
                     self.used_qubits += 1
-                    self.logger.log(f'Teletransporte de qubit de {alice_id} para {bob_id} na rota {route} foi bem-sucedido com fidelidade final de {F_final}.')
+                    self.logger.log('Teletransporte de qubit de %s para %s na rota %s foi bem-sucedido com fidelidade final de %s.', alice_id, bob_id, route, F_final)
 
                     # Armazena as informações do qubit transmitido
-                    self.transmitted_qubits.append(qubit_info)
+                    self._record_transmission(TransportLog.TRANSPORT, alice_id, bob_id, route, fidelity_alice=f_alice,
+                                              fidelity_route=f_route, F_final=F_final, timeslot=self._network.get_timeslot(),
+                                              qubit_id=qubit_alice.qubit_id)
                 else:
-                    self.logger.log(f'Alice não possui qubits suficientes para continuar a transmissão.')
+                    self.logger.log('Alice não possui qubits suficientes para continuar a transmissão.')
                     break
 
             attempts += 1
 
         if success_count == num_qubits:
-            self.logger.log(f'Transmissão e teletransporte de {num_qubits} qubits entre {alice_id} e {bob_id} concluídos com sucesso. Timeslot: {self._network.get_timeslot()}')
+            if self.logger.enabled:
+                self.logger.log('Transmissão e teletransporte de %s qubits entre %s e %s concluídos com sucesso. Timeslot: %s', num_qubits, alice_id, bob_id, self._network.get_timeslot())
             return True
         else:
-            self.logger.log(f'Falha na transmissão de {num_qubits} qubits entre {alice_id} e {bob_id}. Apenas {success_count} qubits foram transmitidos com sucesso. Timeslot: {self._network.get_timeslot()}')
+            if self.logger.enabled:
+                self.logger.log('Falha na transmissão de %s qubits entre %s e %s. Apenas %s qubits foram transmitidos com sucesso. Timeslot: %s', num_qubits, alice_id, bob_id, success_count, self._network.get_timeslot())
             return False
 
 
@@ -1,8 +1,12 @@
+import copy
+import gc
 import networkx as nx
-from ..objects import Logger, Qubit
+import numpy as np
+from ..objects import Logger, Qubit, FidelityStore, EprPool, EprLedger, RandomSource, CopyOnWriteMapping, VirtualLinks
 from ..components import Host
 from .layers import *
-import random
+from .simulation import Simulator
+from . import topologies, snapshot
 import os
 import csv
 
@@ -10,16 +14,46 @@ class Network():
     """
     Um objeto para utilizar como rede.
     """
-    def __init__(self) -> None:
+    DECOHERENCE_MODES = ('eager', 'vectorized', 'lazy')
+    READY_TOPOLOGIES = ('Grade', 'Linha', 'Anel', 'Waxman', 'Barabasi-Albert', 'Geometrica')
+
+    def __init__(self, decoherence_mode: str = 'eager', decoherence_factor: float = 0.9, host_memory_size: int = None, seed: int = None, transport_retention='all', transport_spill_path: str = None, epr_ledger_path: str = None) -> None:
+        """
+        Args:
+            decoherence_mode (str): Como a decoerência é aplicada a cada timeslot. 'eager' percorre cada
+                qubit e par EPR; 'vectorized' mantém as fidelidades de todas as memórias e canais em
+                um array NumPy e aplica a decoerência com uma única multiplicação mascarada; 'lazy'
+                não faz nada a cada timeslot e calcula a fidelidade somente quando ela é lida.
+            decoherence_factor (float): Fator de decoerência aplicado a cada timeslot.
+            host_memory_size (int): Capacidade da memória dos hosts criados por set_ready_topology.
+                Se None, as memórias não têm limite.
+            seed (int): Semente do gerador de números aleatórios da rede. Se None, usa entropia do sistema.
+            transport_retention (str | int): Retenção do registro de transmissões da camada de transporte:
+                'all', 'spill' (grava em disco) ou o número de registros mais recentes mantidos.
+            transport_spill_path (str): Arquivo do registro de transmissões na retenção 'spill'.
+            epr_ledger_path (str): Arquivo do registro do ciclo de vida dos pares EPR (mapeado em memória).
+                Se None, o registro fica em memória.
+        """
+        if decoherence_mode not in self.DECOHERENCE_MODES:
+            raise ValueError(f'Modo de decoerência inválido. Escolha entre {self.DECOHERENCE_MODES}.')
         # Sobre a rede
         self._graph = nx.Graph()
+        self._graph_version = 0
+        self._live_channels = {}  # Índice dos canais com pelo menos um par EPR, no padrão {nó: {vizinhos}}
         self._topology = None
         self._hosts = {}
+        # Depois da primeira bifurcação (ver fork), hosts e índice de canais passam a ser CopyOnWriteMapping e
+        # os pools dos canais ficam em _pools, por aresta (u, v) com u <= v; _graph_shared indica se o grafo é
+        # compartilhado com outra rede
+        self._pools = None
+        self._graph_shared = False
+        # Números aleatórios de todas as camadas
+        self._rng = RandomSource(seed)
         # Camadas
         self._physical = PhysicalLayer(self)
         self._link = LinkLayer(self, self._physical)
         self._network = NetworkLayer(self, self._link, self._physical)
-        self._transport = TransportLayer(self, self._network, self._link, self._physical)
+        self._transport = TransportLayer(self, self._network, self._link, self._physical, transport_retention, transport_spill_path)
         self._application = ApplicationLayer(self, self._transport, self._network, self._link, self._physical)
         # Sobre a execução
         self.logger = Logger.get_instance()
@@ -29,6 +63,16 @@ class Network():
         self.min_prob = 0.2
         self.timeslot_total = 0
         self.qubit_timeslots = {}  # Dicionário para armazenar qubits criados e seus timeslots
+        self.decoherence_mode = decoherence_mode
+        self.decoherence_factor = decoherence_factor
+        self.host_memory_size = host_memory_size
+        # Fidelidades de todos os canais (e, nos modos 'vectorized' e 'lazy', das memórias) em um único array
+        self._fidelity_store = FidelityStore(clock=self.get_timeslot, lazy=decoherence_mode == 'lazy', decoherence_factor=decoherence_factor)
+        # Ciclo de vida (criação, falha, purificação, swapping, consumo, expiração) de todos os pares EPR
+        self._epr_ledger = EprLedger(clock=self.get_timeslot, path=epr_ledger_path)
+        # Enlaces virtuais criados pelo entanglement swapping, fora do grafo (que contém somente os canais físicos)
+        self._virtual_links = VirtualLinks(self._fidelity_store)
+        self._simulator = None
 
     @property
     def hosts(self):
@@ -43,13 +87,42 @@ class Network():
     @property
     def graph(self):
         """
-        Grafo da rede.
+        Grafo da rede, somente com os canais físicos (os enlaces virtuais criados pelo entanglement swapping
+        ficam em virtual_links). Não deve ser alterado diretamente (ver add_channel e add_host), já que pode
+        ser compartilhado com bifurcações da rede.
 
         Returns:
             nx.Graph : Grafo da rede.
         """
         return self._graph
     
+    @property
+    def rng(self):
+        """
+        Fonte de números aleatórios da rede.
+
+        Returns:
+            RandomSource : Fonte de números aleatórios.
+        """
+        return self._rng
+
+    @property
+    def graph_version(self):
+        """
+        Versão da topologia da rede. É incrementada a cada alteração de nós ou arestas do grafo.
+
+        Returns:
+            int : Versão da topologia.
+        """
+        return self._graph_version
+
+    def topology_changed(self):
+        """
+        Registra uma alteração na topologia da rede, invalidando as rotas em cache.
+        Deve ser chamada por quem alterar o grafo diretamente (por exemplo, via rede.graph.add_edge).
+        """
+        self._graph_version += 1
+
     @property
     def nodes(self):
         """
@@ -137,20 +210,24 @@ class Network():
         # Adiciona o host ao dicionário de hosts, se não existir
         if host.host_id not in self._hosts:        
             self._hosts[host.host_id] = host
-            Logger.get_instance().debug(f'Host {host.host_id} adicionado aos hosts da rede.')
+            self.bind_host_memory(host)
+            Logger.get_instance().debug('Host %s adicionado aos hosts da rede.', host.host_id)
         else:
             raise Exception(f'Host {host.host_id} já existe nos hosts da rede.')
             
         # Adiciona o nó ao grafo da rede, se não existir
+        self._own_graph()
         if not self._graph.has_node(host.host_id):
             self._graph.add_node(host.host_id)
-            Logger.get_instance().debug(f'Nó {host.host_id} adicionado ao grafo da rede.')
+            self.topology_changed()
+            Logger.get_instance().debug('Nó %s adicionado ao grafo da rede.', host.host_id)
             
         # Adiciona as conexões do nó ao grafo da rede, se não existirem
         for connection in host.connections:
             if not self._graph.has_edge(host.host_id, connection):
                 self._graph.add_edge(host.host_id, connection)
-                Logger.get_instance().debug(f'Conexões do {host.host_id} adicionados ao grafo da rede.')
+                self.topology_changed()
+                Logger.get_instance().debug('Conexões do %s adicionados ao grafo da rede.', host.host_id)
     
     def get_host(self, host_id: int) -> Host:
         """
@@ -164,6 +241,149 @@ class Network():
         """
         return self._hosts[host_id]
 
+    @property
+    def fidelity_store(self):
+        """
+        Armazenamento de fidelidades compartilhado pelos canais da rede e, nos modos de decoerência
+        'vectorized' e 'lazy', também pelas memórias dos hosts.
+
+        Returns:
+            FidelityStore : Armazenamento de fidelidades.
+        """
+        return self._fidelity_store
+
+    @property
+    def epr_ledger(self):
+        """
+        Registro do ciclo de vida de todos os pares EPR da rede.
+
+        Returns:
+            EprLedger : Registro de eventos dos pares EPR.
+        """
+        return self._epr_ledger
+
+    @property
+    def virtual_links(self):
+        """
+        Tabela dos enlaces virtuais (pares EPR entre hosts não vizinhos, criados pelo entanglement swapping).
+
+        Returns:
+            VirtualLinks : Tabela dos enlaces virtuais.
+        """
+        return self._virtual_links
+
+    def new_epr_pool(self, alice: int, bob: int) -> EprPool:
+        """
+        Cria o pool de pares EPR de um canal. As fidelidades ficam no armazenamento compartilhado da rede.
+
+        Args:
+            alice (int): ID do host Alice.
+            bob (int): ID do host Bob.
+
+        Returns:
+            EprPool : Pool vazio de pares EPR.
+        """
+        self._set_channel_live((alice, bob), False)
+        pool = EprPool(self._fidelity_store, (alice, bob), on_change=self._set_channel_live)
+        if self._pools is not None:
+            self._pools[self._edge_key(alice, bob)] = pool
+        return pool
+
+    def add_channel(self, alice: int, bob: int):
+        """
+        Cria um canal entre dois hosts, com um pool vazio de pares EPR, se ele ainda não existir.
+
+        Args:
+            alice (int): ID do host Alice.
+            bob (int): ID do host Bob.
+        """
+        if self._graph.has_edge(alice, bob):
+            return
+        self._own_graph()
+        self._graph.add_edge(alice, bob, eprs=self.new_epr_pool(alice, bob))
+        self.topology_changed()
+
+    def _set_channel_live(self, edge: tuple, live: bool):
+        """
+        Atualiza o índice de canais com pares EPR. Chamado pelos pools quando ficam vazios ou deixam de estar.
+
+        Args:
+            edge (tuple): Canal (u, v).
+            live (bool): True se o canal passou a ter pares EPR, False se ficou sem nenhum.
+        """
+        u, v = edge
+        if live:
+            self._live_channels.setdefault(u, set()).add(v)
+            self._live_channels.setdefault(v, set()).add(u)
+        else:
+            self._live_channels.get(u, set()).discard(v)
+            self._live_channels.get(v, set()).discard(u)
+
+    def has_epr(self, alice: int, bob: int) -> bool:
+        """
+        Verifica, em O(1), se o canal entre dois hosts tem pelo menos um par EPR.
+
+        Args:
+            alice (int): ID do host Alice.
+            bob (int): ID do host Bob.
+
+        Returns:
+            bool : True se o canal existe e tem pares EPR.
+        """
+        return bob in self._live_channels.get(alice, ())
+
+    def live_neighbors(self, host_id: int) -> set:
+        """
+        Retorna os vizinhos de um host cujos canais têm pelo menos um par EPR.
+
+        Args:
+            host_id (int): ID do host.
+
+        Returns:
+            set : IDs dos vizinhos.
+        """
+        return self._live_channels.get(host_id, set())
+
+    def live_edges(self) -> list:
+        """
+        Retorna os canais que têm pelo menos um par EPR.
+
+        Returns:
+            list : Lista de arestas (u, v).
+        """
+        edges = []
+        visited = set()
+        for u, neighbors in self._live_channels.items():
+            visited.add(u)
+            edges.extend((u, v) for v in neighbors if v not in visited)
+        return edges
+
+    def is_route_live(self, route: list) -> bool:
+        """
+        Verifica, em O(tamanho da rota), se todos os saltos da rota têm pelo menos um par EPR.
+
+        Args:
+            route (list): Lista de nós da rota.
+
+        Returns:
+            bool : True se a rota pode ser usada.
+        """
+        live = self._live_channels
+        for i in range(len(route) - 1):
+            if route[i + 1] not in live.get(route[i], ()):
+                return False
+        return True
+
+    def bind_host_memory(self, host: Host):
+        """
+        Prepara a memória de um host conforme o modo de decoerência da rede.
+
+        Args:
+            host (Host): Host da rede.
+        """
+        if self.decoherence_mode != 'eager' and host.memory.store is None:
+            host.bind_fidelity_store(self._fidelity_store)
+
     def get_eprs(self):
         """
         Cria uma lista de qubits entrelaçados (EPRs) associadas a cada aresta do grafo.
@@ -174,7 +394,7 @@ class Network():
         """
         eprs = {}
         for edge in self.edges:
-            eprs[edge] = self._graph.edges[edge]['eprs']
+            eprs[edge] = self.get_eprs_from_edge(*edge)
         return eprs
     
     def get_eprs_from_edge(self, alice: int, bob: int) -> list:
@@ -185,109 +405,395 @@ class Network():
             alice (int): ID do host Alice.
             bob (int): ID do host Bob.
         Returns:
-            list : Lista de EPRs da aresta.
+            EprPool : Pool de EPRs da aresta.
         """
-        edge = (alice, bob)
-        return self._graph.edges[edge]['eprs']
+        if self._pools is None:
+            return self._graph.edges[alice, bob]['eprs']
+        return self._pools[self._edge_key(alice, bob)]
     
-    def remove_epr(self, alice: int, bob: int) -> list:
+    def remove_epr(self, alice: int, bob: int, cause: str = 'unknown') -> list:
         """
-        Remove um EPR de um canal.
+        Remove um EPR de um canal e registra o seu consumo.
 
         Args:
-            channel (tuple): Canal de comunicação.
+            alice (int): ID do host Alice.
+            bob (int): ID do host Bob.
+            cause (str): Causa do consumo, registrada no registro de ciclo de vida dos pares EPR.
         """
         channel = (alice, bob)
         try:
-            epr = self._graph.edges[channel]['eprs'].pop(-1)   
-            return epr
+            epr = self.get_eprs_from_edge(alice, bob).pop(-1)
         except IndexError:
             raise Exception('Não há Pares EPRs.')   
+        self._epr_ledger.record(EprLedger.CONSUME, epr, channel, cause)
+        return epr
         
-    def set_ready_topology(self, topology_name: str, *args: int) -> str:
+    def set_ready_topology(self, topology_name: str, *args) -> str:
         """
         Cria um grafo com uma das topologias prontas para serem utilizadas. 
-        São elas: Grade, Linha, Anel. Os nós são numerados de 0 a n-1, onde n é o número de nós.
+        São elas: Grade, Linha, Anel, Waxman, Barabasi-Albert e Geometrica (grafo geométrico aleatório).
+        Os nós são numerados de 0 a n-1, onde n é o número de nós.
+
+        O grafo é construído diretamente com rótulos inteiros (ver topologies), e os qubits dos hosts e os
+        pares EPR dos canais são criados em lote.
 
         Args: 
             topology_name (str): Nome da topologia a ser utilizada.
-            **args (int): Argumentos para a topologia. Geralmente, o número de hosts.
-        
-        """
-        # Nomeia a topologia da rede
-        self._topology = topology_name
-    
-        # Cria o grafo da topologia escolhida
+            *args: Argumentos para a topologia:
+                Grade: linhas, colunas;
+                Linha, Anel: número de hosts;
+                Waxman: número de hosts[, beta[, alpha]];
+                Barabasi-Albert: número de hosts, arestas de cada novo host;
+                Geometrica: número de hosts, raio de ligação (no quadrado unitário).
+        """
+        # Cria as arestas da topologia escolhida
+        positions = None
         if topology_name == 'Grade':
             if len(args) != 2:
                 raise Exception('Para a topologia Grade, são necessários dois argumentos.')
-            self._graph = nx.grid_2d_graph(*args)
+            num_nodes, edges = topologies.grid_edges(*args)
         elif topology_name == 'Linha':
             if len(args) != 1:
                 raise Exception('Para a topologia Linha, é necessário um argumento.')
-            self._graph = nx.path_graph(*args)
+            num_nodes, edges = topologies.line_edges(*args)
         elif topology_name == 'Anel':
             if len(args) != 1:
                 raise Exception('Para a topologia Anel, é necessário um argumento.')
-            self._graph = nx.cycle_graph(*args)
+            num_nodes, edges = topologies.ring_edges(*args)
+        elif topology_name == 'Waxman':
+            if not 1 <= len(args) <= 3:
+                raise Exception('Para a topologia Waxman, são necessários de um a três argumentos.')
+            num_nodes, edges, positions = topologies.waxman_edges(*args, rng=self._rng.generator)
+        elif topology_name == 'Barabasi-Albert':
+            if len(args) != 2:
+                raise Exception('Para a topologia Barabasi-Albert, são necessários dois argumentos.')
+            num_nodes, edges = topologies.barabasi_albert_edges(*args, rng=self._rng.generator)
+        elif topology_name == 'Geometrica':
+            if len(args) != 2:
+                raise Exception('Para a topologia Geometrica, são necessários dois argumentos.')
+            num_nodes, edges, positions = topologies.random_geometric_edges(*args, rng=self._rng.generator)
+        else:
+            raise Exception(f'Topologia {topology_name} não existe. Escolha entre {self.READY_TOPOLOGIES}.')
 
-        # Converte os labels dos nós para inteiros
-        self._graph = nx.convert_node_labels_to_integers(self._graph)
+        # Nomeia a topologia da rede
+        self._topology = topology_name
+        self._populate(topologies.build_graph(num_nodes, edges, positions))
+
+    def load_topology(self, path: str, file_format: str = None, delimiter: str = None, num_qubits: int = 10, num_eprs: int = 10):
+        """
+        Cria a rede a partir de um arquivo de topologia: lista de arestas, CSV ou GraphML. O arquivo é lido
+        em colunas (ver topologies) e a rede é criada em lote, como em set_ready_topology.
 
-        # Cria os hosts e adiciona ao dicionário de hosts
-        for node in self._graph.nodes():
-            self._hosts[node] = Host(node)
-        self.start_hosts()
-        self.start_channels()
-        self.start_eprs()
+        Os atributos de aresta 'prob_on_demand_epr_create', 'prob_replay_epr_create' e 'initial_eprs'
+        (número inicial de pares EPR do canal) são usados quando presentes; os ausentes são sorteados ou
+        recebem os valores padrão. Os demais atributos numéricos são mantidos nas arestas do grafo.
+
+        Args:
+            path (str): Arquivo da topologia.
+            file_format (str): 'edgelist', 'csv' ou 'graphml'. Se None, é deduzido da extensão do arquivo
+                (.csv, .graphml ou .xml; qualquer outra é lida como lista de arestas).
+            delimiter (str): Separador das colunas da lista de arestas ou do CSV.
+            num_qubits (int): Número de qubits inicializados em cada host.
+            num_eprs (int): Número de pares EPR dos canais sem o atributo 'initial_eprs'.
+        """
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lower()
+            file_format = {'.csv': 'csv', '.graphml': 'graphml', '.xml': 'graphml'}.get(extension, 'edgelist')
+        if file_format == 'edgelist':
+            nodes, edges, attributes = topologies.read_edge_list(path, delimiter=delimiter)
+        elif file_format == 'csv':
+            nodes, edges, attributes = topologies.read_csv(path, delimiter=delimiter or ',')
+        elif file_format == 'graphml':
+            nodes, edges, attributes = topologies.read_graphml(path)
+        else:
+            raise ValueError("Formato de topologia inválido. Escolha entre 'edgelist', 'csv' ou 'graphml'.")
+
+        self._topology = os.path.basename(path)
+        self._populate(topologies.build_graph(nodes, edges, attributes=attributes), num_qubits, num_eprs)
+        self.logger.log('Topologia carregada de %s: %s nós e %s canais.', path, self._graph.number_of_nodes(), self._graph.number_of_edges())
+
+    def _populate(self, graph: nx.Graph, num_qubits: int = 10, num_eprs: int = 10):
+        """
+        Usa o grafo como topologia da rede e cria, em lote, os hosts, os qubits, os canais e os pares EPR.
+
+        Args:
+            graph (nx.Graph): Grafo da topologia.
+            num_qubits (int): Número de qubits de cada host.
+            num_eprs (int): Número de pares EPR dos canais sem o atributo 'initial_eprs'.
+        """
+        self._graph = graph
+        self._graph_shared = False
+        self._pools = None
+        self._virtual_links = VirtualLinks(self._fidelity_store)
+        self.topology_changed()
+
+        # A coleta de lixo cíclica é suspensa durante a criação em lote: os milhões de objetos criados
+        # disparariam várias coletas completas sem nada a liberar
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            # Cria os hosts e adiciona ao dicionário de hosts
+            for node in self._graph.nodes():
+                self._hosts[node] = Host(node, memory_size=self.host_memory_size)
+                self.bind_host_memory(self._hosts[node])
+            self.start_hosts(num_qubits)
+            self.start_channels()
+            self.start_eprs(num_eprs)
+        finally:
+            if gc_enabled:
+                gc.enable()
     
     def start_hosts(self, num_qubits: int = 10):
         """
-        Inicializa os hosts da rede.
+        Inicializa os hosts da rede, criando os qubits de cada host em lote.
         
         Args:
             num_qubits (int): Número de qubits a serem inicializados.
         """
-        for host_id in self._hosts:
-            for i in range(num_qubits):
-                self.physical.create_qubit(host_id, increment_timeslot=False,increment_qubits=False)
+        self.physical.create_qubits_on_hosts(list(self._hosts), num_qubits, increment_timeslot=False, increment_qubits=False)
         print("Hosts inicializados")    
 
     def start_channels(self):
         """
-        Inicializa os canais da rede.
-        
-        Args:
-            prob_on_demand_epr_create (float): Probabilidade de criar um EPR sob demanda.
-            prob_replay_epr_create (float): Probabilidade de criar um EPR de replay.
+        Inicializa os canais da rede. As probabilidades de criação de pares EPR sob demanda e por replay
+        de cada canal são sorteadas em bloco; os canais que já têm essas probabilidades (por exemplo,
+        lidas de um arquivo por load_topology) as mantêm.
         """
-        for edge in self.edges:
-            self._graph.edges[edge]['prob_on_demand_epr_create'] = random.uniform(self.min_prob, self.max_prob)
-            self._graph.edges[edge]['prob_replay_epr_create'] = random.uniform(self.min_prob, self.max_prob)
-            self._graph.edges[edge]['eprs'] = list()
+        edges = list(self._graph.edges(data=True))
+        probabilities = self._rng.uniforms(2 * len(edges), self.min_prob, self.max_prob).tolist()
+        for i, (u, v, data) in enumerate(edges):
+            data.setdefault('prob_on_demand_epr_create', probabilities[2 * i])
+            data.setdefault('prob_replay_epr_create', probabilities[2 * i + 1])
+            data['eprs'] = self.new_epr_pool(u, v)
         print("Canais inicializados")
         
     def start_eprs(self, num_eprs: int = 10):
         """
-        Inicializa os pares EPRs nas arestas da rede.
+        Inicializa os pares EPRs nas arestas da rede. Os pares de todos os canais são criados e anexados
+        ao armazenamento de fidelidades em lote.
 
         Args:
-            num_eprs (int): Número de pares EPR a serem inicializados para cada canal.
-        """
-        for edge in self.edges:
-            for i in range(num_eprs):
-                epr = self.physical.create_epr_pair(increment_timeslot=False,increment_eprs=False)
-                self._graph.edges[edge]['eprs'].append(epr)
-                self.logger.debug(f'Par EPR {epr} adicionado ao canal.')
+            num_eprs (int): Número de pares EPR a serem inicializados para cada canal. Os canais com o
+                atributo 'initial_eprs' usam o valor do atributo.
+        """
+        edges = list(self._graph.edges(data=True))
+        counts = np.array([data.get('initial_eprs', num_eprs) for _, _, data in edges], dtype=np.int64).reshape(-1)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).tolist()
+        first_id = self.physical._count_epr
+        eprs = self.physical.create_epr_pairs(offsets[-1], increment_timeslot=False, increment_eprs=False)
+        # Todos os pares são anexados ao armazenamento de fidelidades de uma só vez
+        slots = self._fidelity_store.attach_many(eprs)
+        epr_ids = np.arange(first_id, first_id + len(eprs))
+        for i, (u, v, data) in enumerate(edges):
+            start = offsets[i]
+            end = offsets[i + 1]
+            data['eprs'].extend_attached(eprs[start:end], slots[start:end], epr_ids[start:end])
+        channels = np.repeat(np.array([(u, v) for u, v, _ in edges], dtype=np.int64).reshape(-1, 2), counts, axis=0)
+        self._epr_ledger.record_many(EprLedger.CREATE, eprs, channels, 'start', fidelities=np.ones(len(eprs)), epr_ids=epr_ids)
+        self.logger.debug('%s pares EPR adicionados aos canais.', len(eprs))
         print("Pares EPRs adicionados")
 
+
+    def save_snapshot(self, path: str):
+        """
+        Grava o estado completo da rede em um arquivo binário (ver snapshot): grafo e atributos dos canais,
+        memórias dos hosts, pares EPR, contadores e registros das camadas, timeslot_total, qubit_timeslots e
+        estado do gerador de números aleatórios. As tabelas de roteamento dos hosts não são gravadas.
+
+        Args:
+            path (str): Arquivo do snapshot.
+
+        Raises:
+            ValueError: Se houver eventos agendados no simulador da rede.
+        """
+        snapshot.save(self, path)
+        self.logger.log('Snapshot da rede gravado em %s.', path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, mmap: bool = True, transport_spill_path: str = None, epr_ledger_path: str = None) -> 'Network':
+        """
+        Cria uma rede com o estado gravado por save_snapshot. Com mmap=True, o arquivo é mapeado em memória e
+        os arrays de fidelidades e dos canais são visões do arquivo (copy-on-write): o arquivo não é alterado
+        e pode ser usado para restaurar várias redes.
+
+        Args:
+            path (str): Arquivo do snapshot.
+            mmap (bool): Se True, mapeia o arquivo em memória; se False, lê o arquivo inteiro.
+            transport_spill_path (str): Arquivo do registro de transmissões, se a retenção gravada for 'spill'.
+            epr_ledger_path (str): Arquivo do registro do ciclo de vida dos pares EPR. Se None, fica em memória.
+
+        Returns:
+            Network : Rede restaurada.
+        """
+        meta, arrays = snapshot.read(path, mmap)
+        network = cls(**meta['config'], transport_spill_path=transport_spill_path, epr_ledger_path=epr_ledger_path)
+        snapshot.restore(network, meta, arrays)
+        network.logger.log('Snapshot da rede carregado de %s.', path)
+        return network
+
+    def fork(self, seed: int = None) -> 'Network':
+        """
+        Cria uma bifurcação da rede (copy-on-write), para simular cenários alternativos a partir do estado
+        atual. A rede bifurcada começa com o mesmo estado desta e as duas evoluem de forma independente.
+
+        A bifurcação não copia a rede: hosts (e suas memórias), pools dos canais e dos enlaces virtuais e
+        grafo passam a ser compartilhados pelas duas redes, e cada uma copia um host ou um pool no primeiro
+        acesso a ele (via hosts, get_host, get_eprs_from_edge ou virtual_links) e o grafo na primeira
+        alteração da topologia. Os arrays do armazenamento de fidelidades e o registro do ciclo de vida dos
+        pares EPR também são copiados somente na primeira escrita. O custo da bifurcação é O(nós + canais), sem copiar qubits nem pares EPR.
+
+        Referências a hosts, memórias, qubits e pares EPR obtidas antes da bifurcação pertencem ao estado
+        compartilhado e não devem ser usadas depois dela, em nenhuma das duas redes: devem ser obtidas
+        novamente.
+
+        Args:
+            seed (int): Semente do gerador de números aleatórios da rede bifurcada. Se None, ela continua a
+                sequência desta rede (as duas sorteiam os mesmos números).
+
+        Returns:
+            Network : Rede bifurcada.
+
+        Raises:
+            ValueError: Se houver eventos agendados no simulador da rede.
+        """
+        if self._simulator is not None and len(self._simulator):
+            raise ValueError('Não é possível bifurcar uma rede com eventos agendados no simulador.')
+        if self._pools is None:
+            pools = {self._edge_key(u, v): data['eprs'] for u, v, data in self._graph.edges(data=True) if 'eprs' in data}
+            self._pools = CopyOnWriteMapping(pools, self._clone_pool)
+        if not isinstance(self._hosts, CopyOnWriteMapping):
+            self._hosts = CopyOnWriteMapping(self._hosts, self._clone_host)
+            self._live_channels = CopyOnWriteMapping(self._live_channels, set.copy)
+
+        child = copy.copy(self)
+        child._simulator = None
+        child._rng = self._rng.copy() if seed is None else RandomSource(seed)
+        child._fidelity_store = self._fidelity_store.fork(child.get_timeslot)
+        child._epr_ledger = self._epr_ledger.fork(child.get_timeslot)
+        child._hosts = self._hosts.fork(child._clone_host)
+        child._pools = self._pools.fork(child._clone_pool)
+        child._virtual_links = self._virtual_links.fork(child._fidelity_store)
+        child._live_channels = self._live_channels.fork()
+        child.qubit_timeslots = dict(self.qubit_timeslots)
+        self._graph_shared = child._graph_shared = True
+        child._physical = self._physical.fork(child)
+        child._link = self._link.fork(child, child._physical)
+        child._network = self._network.fork(child, child._link, child._physical)
+        child._transport = self._transport.fork(child, child._network, child._link, child._physical)
+        child._application = self._application.fork(child, child._transport, child._network, child._link, child._physical)
+        self._adopt_layer_eprs()
+        child._adopt_layer_eprs()
+        return child
+
+    @staticmethod
+    def _edge_key(u: int, v: int) -> tuple:
+        """
+        Chave de um canal nos pools das redes bifurcadas.
+        """
+        return (u, v) if u <= v else (v, u)
+
+    def _clone_host(self, host: Host) -> Host:
+        """
+        Copia um host compartilhado com outra rede (ver fork).
+        """
+        return host.clone(self._fidelity_store)
+
+    def _clone_pool(self, pool: EprPool) -> EprPool:
+        """
+        Copia um pool compartilhado com outra rede (ver fork).
+        """
+        return pool.clone(self._fidelity_store, self._set_channel_live)
+
+    def _own_graph(self):
+        """
+        Copia o grafo, se ele for compartilhado com outra rede, antes de uma alteração na topologia.
+        """
+        if self._graph_shared:
+            self._graph = topologies.copy_graph(self._graph)
+            self._graph_shared = False
+
+    def _adopt_layer_eprs(self):
+        """
+        Depois de uma bifurcação, substitui os pares EPR criados pela camada física e ainda não recolhidos pela
+        camada de enlace pelas cópias desta rede, copiando de imediato os pools em que eles estão.
+        """
+        physical = self._physical
+        if not physical.created_eprs:
+            return
+        clones = {}
+        for epr in physical.created_eprs:
+            if epr in clones:
+                continue
+            pool = epr._pool
+            if pool is not None and pool.edge is not None:
+                self._pools[self._edge_key(*pool.edge)] = pool.clone(self._fidelity_store, self._set_channel_live, clones)
+            if epr not in clones:
+                clones[epr] = epr.clone(self._fidelity_store)
+        physical.created_eprs = [clones[epr] for epr in physical.created_eprs]
         
-    def timeslot(self):
+    @property
+    def simulator(self):
+        """
+        Núcleo de simulação de eventos discretos da rede, criado no primeiro acesso.
+
+        Returns:
+            Simulator : Simulador da rede.
         """
-        Incrementa o timeslot da rede.
+        if self._simulator is None:
+            self._simulator = Simulator(self)
+        return self._simulator
+
+    def schedule(self, delay: int, callback, *args, **kwargs):
+        """
+        Agenda um evento no simulador da rede.
+
+        Args:
+            delay (int): Número de timeslots até o evento.
+            callback (callable): Função chamada quando o evento ocorre.
+
+        Returns:
+            Event : Evento agendado.
         """
-        self.timeslot_total += 1
-        self.apply_decoherence_to_all_layers()
+        return self.simulator.schedule(delay, callback, *args, **kwargs)
+
+    def run(self, until: int = None, max_events: int = None) -> int:
+        """
+        Executa os eventos agendados no simulador da rede.
+
+        Args:
+            until (int): Último timeslot simulado. Se None, executa até não haver mais eventos.
+            max_events (int): Número máximo de eventos executados.
+
+        Returns:
+            int : Número de eventos executados.
+        """
+        return self.simulator.run(until, max_events)
+
+    def timeslot(self, count: int = 1):
+        """
+        Incrementa o timeslot da rede. Durante a execução de um evento do simulador, apenas registra que o
+        evento ocupou mais timeslots; o relógio é avançado pelo simulador.
+
+        Args:
+            count (int): Número de timeslots (a decoerência acumulada é aplicada em um único passo).
+        """
+        if self._simulator is not None and self._simulator.dispatching:
+            self._simulator.defer_timeslot(count)
+            return
+        self.advance_timeslots(count)
+
+    def advance_timeslots(self, count: int = 1):
+        """
+        Avança vários timeslots de uma vez, aplicando a decoerência acumulada (fator ** count) em um único passo.
+
+        Args:
+            count (int): Número de timeslots.
+        """
+        if count <= 0:
+            return
+        self.timeslot_total += count
+        if self.decoherence_mode != 'lazy':
+            self.apply_decoherence_to_all_layers(self.decoherence_factor ** count)
 
     def get_timeslot(self):
         """
@@ -349,7 +855,13 @@ class Network():
                 "EPRs Usados": self.get_total_useds_eprs(),
                 "Qubits Usados": self.get_total_useds_qubits(),
                 "Fidelidade na Camada de Transporte": self.transportlayer.avg_fidelity_on_transportlayer(),
+                "Fidelidade na Camada de Transporte (p50)": self.transportlayer.fidelity_quantile(0.5),
+                "Fidelidade na Camada de Transporte (p95)": self.transportlayer.fidelity_quantile(0.95),
+                "Fidelidade na Camada de Transporte (p99)": self.transportlayer.fidelity_quantile(0.99),
                 "Fidelidade na Camada de Enlace": self.linklayer.avg_fidelity_on_linklayer(),
+                "Fidelidade na Camada de Enlace (p50)": self.linklayer.fidelity_quantile(0.5),
+                "Fidelidade na Camada de Enlace (p95)": self.linklayer.fidelity_quantile(0.95),
+                "Fidelidade na Camada de Enlace (p99)": self.linklayer.fidelity_quantile(0.99),
                 "Média de Rotas": self.networklayer.get_avg_size_routes()
             }
             
@@ -384,6 +896,11 @@ class Network():
         """
         current_timeslot = self.get_timeslot()
 
+        # Uma única multiplicação mascarada para todos os canais (e memórias, fora do modo 'eager')
+        self._fidelity_store.decay(decoherence_factor, current_timeslot)
+        if self.decoherence_mode != 'eager':
+            return
+
         # Aplicar decoerência nos qubits de cada host
         for host_id, host in self.hosts.items():
             for qubit in host.memory:
@@ -393,14 +910,6 @@ class Network():
                     new_fidelity = current_fidelity * decoherence_factor
                     qubit.set_current_fidelity(new_fidelity)
 
-        # Aplicar decoerência nos EPRs em todos os canais (arestas da rede)
-        for edge in self.edges:
-            if 'eprs' in self._graph.edges[edge]:
-                for epr in self._graph.edges[edge]['eprs']:
-                    current_fidelity = epr.get_current_fidelity()
-                    new_fidelity = current_fidelity * decoherence_factor
-                    epr.set_fidelity(new_fidelity)
-
     # def apply_decoherence_to_all_layers(self, decoherence_factor: float = 0.9):
     #     """
     #     Aplica decoerência a todos os qubits e EPRs nas camadas da rede que já avançaram nos timeslots.
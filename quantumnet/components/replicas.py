@@ -0,0 +1,180 @@
+import contextlib
+import io
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import numpy as np
+from scipy import stats
+
+def controller_scenario(seed: int, topology_name: str = 'Grade', topology_args: tuple = (3, 3), n_requests: int = 10, num_bits: int = 10):
+    """
+    Cenário padrão: cria uma rede com controlador, registra as tabelas de roteamento e executa o
+    protocolo E91 entre pares aleatórios de hosts (o laço de "Simulação - Controlador.ipynb").
+
+    Args:
+        seed (int): Semente da réplica.
+        topology_name (str): Nome da topologia.
+        topology_args (tuple): Argumentos da topologia.
+        n_requests (int): Número de requisições.
+        num_bits (int): Tamanho da chave de cada requisição.
+
+    Returns:
+        Network : Rede ao final da execução.
+    """
+    from .network import Network
+    from .controller import Controller
+
+    network = Network(seed=seed)
+    rng = network.rng
+    controller = Controller(network)
+    network.set_ready_topology(topology_name, *topology_args)
+    controller.register_routing_tables()
+    hosts = list(network.hosts)
+    for _ in range(n_requests):
+        alice = rng.choice(hosts)
+        bob = rng.choice(hosts)
+        network.application_layer.qkd_e91_protocol(alice, bob, num_bits)
+    return network
+
+
+def run_replica(scenario, seed: int, metrics_requested: list = None, quiet: bool = True) -> dict:
+    """
+    Executa uma réplica de um cenário e retorna as suas métricas.
+
+    Args:
+        scenario (callable): Função scenario(seed) que monta e executa a simulação e retorna a rede
+            (ou diretamente um dicionário de métricas).
+        seed (int): Semente da réplica, repassada ao cenário. Também é usada para semear os geradores globais
+            `random` e `np.random`, para cenários que ainda dependem deles.
+        metrics_requested (list): Métricas a serem coletadas. Se None, todas.
+        quiet (bool): Se True, descarta o que a simulação imprime na saída padrão.
+
+    Returns:
+        dict : Métricas da réplica.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with output:
+        result = scenario(seed)
+        if isinstance(result, dict):
+            return result
+        return result.get_metrics(metrics_requested, output_type='variable')
+
+
+def aggregate_metrics(results: list, confidence: float = 0.95) -> dict:
+    """
+    Agrega as métricas de várias réplicas em média, desvio padrão e intervalo de confiança (t de Student).
+    Métricas não numéricas são ignoradas.
+
+    Args:
+        results (list): Dicionários de métricas das réplicas.
+        confidence (float): Nível de confiança do intervalo.
+
+    Returns:
+        dict : Para cada métrica, um dicionário com 'mean', 'std', 'ci_low', 'ci_high' e 'n'.
+    """
+    values = {}
+    for metrics in results:
+        for name, value in metrics.items():
+            if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                values.setdefault(name, []).append(float(value))
+
+    summary = {}
+    for name, samples in values.items():
+        samples = np.asarray(samples)
+        n = len(samples)
+        mean = float(samples.mean())
+        std = float(samples.std(ddof=1)) if n > 1 else 0.0
+        if n > 1 and std > 0:
+            half_width = float(stats.t.ppf((1 + confidence) / 2, n - 1) * std / math.sqrt(n))
+        else:
+            half_width = 0.0
+        summary[name] = {'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width, 'n': n}
+    return summary
+
+
+class ReplicaRunner():
+    """
+    Executa réplicas independentes de um cenário em um pool de processos.
+
+    Cada réplica recebe uma semente própria, derivada de uma semente base com np.random.SeedSequence,
+    de forma que o conjunto de réplicas é reprodutível. O cenário precisa poder ser serializado
+    (pickle): uma função definida no nível de um módulo ou um functools.partial dela.
+    """
+    def __init__(self, scenario=None, replicas: int = 10, processes: int = None, seed: int = 0, metrics_requested: list = None, quiet: bool = True) -> None:
+        """
+        Args:
+            scenario (callable): Função scenario(seed) que monta e executa a simulação e retorna a rede
+                (ou um dicionário de métricas). Se None, usa controller_scenario.
+            replicas (int): Número de réplicas.
+            processes (int): Número de processos. Se None, usa todos os núcleos; se 1, executa no processo atual.
+            seed (int): Semente base.
+            metrics_requested (list): Métricas a serem coletadas. Se None, todas.
+            quiet (bool): Se True, descarta o que as réplicas imprimem na saída padrão.
+        """
+        self.scenario = scenario if scenario is not None else controller_scenario
+        self.replicas = replicas
+        self.processes = processes
+        self.seed = seed
+        self.metrics_requested = metrics_requested
+        self.quiet = quiet
+        self.results = {}
+
+    def seeds(self) -> list:
+        """
+        Retorna as sementes das réplicas.
+
+        Returns:
+            list : Uma semente inteira por réplica.
+        """
+        children = np.random.SeedSequence(self.seed).spawn(self.replicas)
+        return [int(child.generate_state(1, dtype=np.uint64)[0] >> 1) for child in children]
+
+    def stream(self):
+        """
+        Executa as réplicas e devolve as métricas à medida que cada uma termina.
+
+        Yields:
+            tuple : (índice da réplica, dicionário de métricas).
+        """
+        task = partial(run_replica, self.scenario, metrics_requested=self.metrics_requested, quiet=self.quiet)
+        seeds = self.seeds()
+        if self.processes == 1:
+            for index, seed in enumerate(seeds):
+                self.results[index] = task(seed)
+                yield index, self.results[index]
+            return
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            futures = {executor.submit(task, seed): index for index, seed in enumerate(seeds)}
+            for future in as_completed(futures):
+                index = futures[future]
+                self.results[index] = future.result()
+                yield index, self.results[index]
+
+    def run(self, confidence: float = 0.95) -> dict:
+        """
+        Executa todas as réplicas e agrega as métricas.
+
+        Args:
+            confidence (float): Nível de confiança dos intervalos.
+
+        Returns:
+            dict : Métricas agregadas (ver aggregate_metrics).
+        """
+        for _ in self.stream():
+            pass
+        return self.summary(confidence)
+
+    def summary(self, confidence: float = 0.95) -> dict:
+        """
+        Agrega as métricas das réplicas já executadas.
+
+        Args:
+            confidence (float): Nível de confiança dos intervalos.
+
+        Returns:
+            dict : Métricas agregadas (ver aggregate_metrics).
+        """
+        return aggregate_metrics([self.results[index] for index in sorted(self.results)], confidence)
@@ -0,0 +1,277 @@
+from collections.abc import MutableMapping
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+class RoutingMatrix():
+    """
+    Tabelas de roteamento de todos os nós de um grafo em forma compacta.
+
+    Para cada par de nós (origem, destino) são guardados o próximo salto e a distância (em saltos) do
+    menor caminho, em matrizes NumPy de inteiros. Os caminhos completos não são armazenados: são
+    reconstruídos sob demanda seguindo os próximos saltos. A memória ocupada é O(n²) inteiros, em vez
+    de O(n² × tamanho do caminho) das tabelas com listas de caminhos.
+    """
+    # Número de origens processadas por vez ao calcular as distâncias, para limitar a memória temporária
+    CHUNK_SIZE = 256
+
+    def __init__(self, graph: nx.Graph) -> None:
+        """
+        Args:
+            graph (nx.Graph): Grafo da rede.
+        """
+        self._nodes = list(graph.nodes())
+        self._index = {node: i for i, node in enumerate(self._nodes)}
+        n = len(self._nodes)
+        dtype = np.int16 if n < np.iinfo(np.int16).max else np.int32
+        self._next_hop = np.full((n, n), -1, dtype=dtype)
+        self._distance = np.full((n, n), -1, dtype=dtype)
+        if n:
+            self._build(nx.to_scipy_sparse_array(graph, nodelist=self._nodes, weight=None, format='csr'))
+
+    def _build(self, adjacency):
+        """
+        Calcula as matrizes de próximo salto e de distância a partir da matriz de adjacência.
+        """
+        n = len(self._nodes)
+        for start in range(0, n, self.CHUNK_SIZE):
+            sources = np.arange(start, min(start + self.CHUNK_SIZE, n))
+            distances, predecessors = shortest_path(adjacency, directed=False, unweighted=True,
+                                                    return_predecessors=True, indices=sources)
+            reachable = np.isfinite(distances)
+            distances = np.where(reachable, distances, -1).astype(self._distance.dtype)
+            next_hop = np.full(distances.shape, -1, dtype=self._next_hop.dtype)
+            next_hop[np.arange(len(sources)), sources] = sources
+            # O próximo salto até um nó a distância d é o próximo salto até o seu predecessor (distância d - 1)
+            for d in range(1, int(distances.max()) + 1):
+                rows, columns = np.nonzero(distances == d)
+                if d == 1:
+                    next_hop[rows, columns] = columns
+                else:
+                    next_hop[rows, columns] = next_hop[rows, predecessors[rows, columns]]
+            self._next_hop[sources] = next_hop
+            self._distance[sources] = distances
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, node):
+        return node in self._index
+
+    @property
+    def nodes(self):
+        """
+        Nós do grafo, na ordem das linhas e colunas das matrizes.
+
+        Returns:
+            list : Nós do grafo.
+        """
+        return self._nodes
+
+    @property
+    def next_hops(self):
+        """
+        Matriz de próximos saltos (índices dos nós; -1 se o destino é inalcançável).
+
+        Returns:
+            np.ndarray : Matriz n x n.
+        """
+        return self._next_hop
+
+    @property
+    def distances(self):
+        """
+        Matriz de distâncias em saltos (-1 se o destino é inalcançável).
+
+        Returns:
+            np.ndarray : Matriz n x n.
+        """
+        return self._distance
+
+    def index(self, node) -> int:
+        """
+        Retorna o índice de um nó nas matrizes.
+
+        Args:
+            node : Nó do grafo.
+
+        Returns:
+            int : Índice do nó.
+        """
+        return self._index[node]
+
+    def next_hop(self, source, destination):
+        """
+        Retorna o próximo salto no menor caminho entre dois nós.
+
+        Args:
+            source : Nó de origem.
+            destination : Nó de destino.
+
+        Returns:
+            Nó do próximo salto, ou None se o destino é inalcançável.
+        """
+        hop = self._next_hop[self._index[source], self._index[destination]]
+        return self._nodes[hop] if hop != -1 else None
+
+    def distance(self, source, destination):
+        """
+        Retorna a distância em saltos entre dois nós.
+
+        Args:
+            source : Nó de origem.
+            destination : Nó de destino.
+
+        Returns:
+            int : Distância, ou None se o destino é inalcançável.
+        """
+        distance = self._distance[self._index[source], self._index[destination]]
+        return int(distance) if distance != -1 else None
+
+    def path(self, source, destination) -> list:
+        """
+        Reconstrói o menor caminho entre dois nós seguindo os próximos saltos.
+
+        Args:
+            source : Nó de origem.
+            destination : Nó de destino.
+
+        Returns:
+            list : Nós do caminho, ou None se o destino é inalcançável.
+        """
+        current = self._index[source]
+        target = self._index[destination]
+        if self._distance[current, target] == -1:
+            return None
+        path = [current]
+        while current != target:
+            current = int(self._next_hop[current, target])
+            path.append(current)
+        return [self._nodes[i] for i in path]
+
+    def destinations(self, source) -> list:
+        """
+        Retorna os destinos alcançáveis a partir de um nó, ordenados pela distância.
+
+        Args:
+            source : Nó de origem.
+
+        Returns:
+            list : Nós alcançáveis (incluindo a própria origem).
+        """
+        distances = self._distance[self._index[source]]
+        reachable = np.flatnonzero(distances != -1)
+        order = reachable[np.argsort(distances[reachable], kind='stable')]
+        return [self._nodes[i] for i in order]
+
+    def routing_table(self, source):
+        """
+        Retorna a tabela de roteamento de um nó.
+
+        Args:
+            source : Nó de origem.
+
+        Returns:
+            RoutingTable : Tabela de roteamento do nó.
+        """
+        return RoutingTable(self, source)
+
+
+class RoutingTable(MutableMapping):
+    """
+    Tabela de roteamento de um nó, apoiada em uma RoutingMatrix.
+
+    Se comporta como o dicionário {destino: caminho} usado anteriormente: table[destino] retorna a lista
+    de nós do caminho, reconstruída sob demanda. Rotas definidas com table[destino] = caminho são
+    guardadas à parte e têm precedência sobre as da matriz.
+    """
+    def __init__(self, matrix: RoutingMatrix, source) -> None:
+        """
+        Args:
+            matrix (RoutingMatrix): Matriz de roteamento da rede.
+            source : Nó dono da tabela.
+        """
+        self._matrix = matrix
+        self._source = source
+        self._overrides = {}
+        self._removed = set()
+
+    @property
+    def source(self):
+        """
+        Nó dono da tabela.
+
+        Returns:
+            Nó de origem.
+        """
+        return self._source
+
+    def _in_matrix(self, destination) -> bool:
+        return (destination in self._matrix and destination not in self._removed
+                and self._matrix.distance(self._source, destination) is not None)
+
+    def __getitem__(self, destination):
+        if destination in self._overrides:
+            return self._overrides[destination]
+        if not self._in_matrix(destination):
+            raise KeyError(destination)
+        return self._matrix.path(self._source, destination)
+
+    def __setitem__(self, destination, path):
+        self._overrides[destination] = path
+
+    def __delitem__(self, destination):
+        if destination in self._overrides:
+            del self._overrides[destination]
+            if self._in_matrix(destination):
+                self._removed.add(destination)
+        elif self._in_matrix(destination):
+            self._removed.add(destination)
+        else:
+            raise KeyError(destination)
+
+    def __contains__(self, destination):
+        return destination in self._overrides or self._in_matrix(destination)
+
+    def __iter__(self):
+        for destination in self._matrix.destinations(self._source):
+            if destination not in self._removed:
+                yield destination
+        for destination in list(self._overrides):
+            if not self._in_matrix(destination):
+                yield destination
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def next_hop(self, destination):
+        """
+        Retorna o próximo salto até um destino.
+
+        Args:
+            destination : Nó de destino.
+
+        Returns:
+            Nó do próximo salto (o próprio nó se o destino for ele mesmo).
+        """
+        path = self[destination]
+        return path[1] if len(path) > 1 else path[0]
+
+    def distance(self, destination) -> int:
+        """
+        Retorna a distância em saltos até um destino.
+
+        Args:
+            destination : Nó de destino.
+
+        Returns:
+            int : Número de saltos.
+        """
+        if destination in self._overrides:
+            return len(self._overrides[destination]) - 1
+        if not self._in_matrix(destination):
+            raise KeyError(destination)
+        return self._matrix.distance(self._source, destination)
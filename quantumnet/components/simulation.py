@@ -0,0 +1,216 @@
+import heapq
+import itertools
+
+class Event():
+    """
+    Evento agendado no simulador.
+    """
+    __slots__ = ('time', 'priority', 'callback', 'args', 'kwargs', 'cancelled')
+
+    def __init__(self, time: int, callback, args: tuple = (), kwargs: dict = None, priority: int = 0) -> None:
+        """
+        Args:
+            time (int): Timeslot em que o evento ocorre.
+            callback (callable): Função chamada quando o evento ocorre.
+            args (tuple): Argumentos posicionais da função.
+            kwargs (dict): Argumentos nomeados da função.
+            priority (int): Desempate entre eventos do mesmo timeslot (menor ocorre antes).
+        """
+        self.time = time
+        self.priority = priority
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.cancelled = False
+
+    def __repr__(self):
+        name = getattr(self.callback, '__name__', repr(self.callback))
+        return f'Event({self.time}, {name})'
+
+    def cancel(self):
+        """
+        Cancela o evento. Eventos cancelados continuam no heap, mas são descartados quando chegam ao topo.
+        """
+        self.cancelled = True
+
+
+class Simulator():
+    """
+    Núcleo de simulação de eventos discretos da rede.
+
+    Os eventos ficam em um heap ordenado por (timeslot, prioridade, ordem de agendamento). O relógio é o
+    próprio timeslot da rede: ao passar para o próximo evento, o simulador avança a rede diretamente até
+    o timeslot dele, aplicando a decoerência de todos os timeslots ociosos de uma só vez.
+
+    Enquanto um evento é executado, o simulador é o dono do relógio: as chamadas a Network.timeslot()
+    feitas pelas camadas não avançam o tempo na hora, apenas registram quantos timeslots o evento ocupou.
+    Assim, eventos do mesmo timeslot (por exemplo, requisições em enlaces disjuntos) são executados no
+    mesmo timeslot, e o relógio avança depois, até o fim do evento mais longo ou até o próximo evento.
+    """
+    def __init__(self, network) -> None:
+        """
+        Args:
+            network (Network): Rede simulada.
+        """
+        self._network = network
+        self._heap = []
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._dispatching = False
+        self._ticks = 0
+        self._busy_until = network.get_timeslot()
+        self.events_processed = 0
+        self.idle_timeslots_skipped = 0
+
+    def __len__(self):
+        return self._pending
+
+    @property
+    def now(self) -> int:
+        """
+        Timeslot atual da rede.
+
+        Returns:
+            int : Timeslot atual.
+        """
+        return self._network.get_timeslot()
+
+    @property
+    def dispatching(self) -> bool:
+        """
+        Indica se um evento está sendo executado.
+
+        Returns:
+            bool : True durante a execução de um evento.
+        """
+        return self._dispatching
+
+    def schedule(self, delay: int, callback, *args, priority: int = 0, **kwargs) -> Event:
+        """
+        Agenda um evento para daqui a alguns timeslots.
+
+        Args:
+            delay (int): Número de timeslots até o evento (0 para o timeslot atual).
+            callback (callable): Função chamada quando o evento ocorre.
+            priority (int): Desempate entre eventos do mesmo timeslot (menor ocorre antes).
+
+        Returns:
+            Event : Evento agendado.
+        """
+        if delay < 0:
+            raise ValueError('Não é possível agendar um evento no passado.')
+        return self.schedule_at(self.now + delay, callback, *args, priority=priority, **kwargs)
+
+    def schedule_at(self, time: int, callback, *args, priority: int = 0, **kwargs) -> Event:
+        """
+        Agenda um evento para um timeslot específico.
+
+        Args:
+            time (int): Timeslot do evento.
+            callback (callable): Função chamada quando o evento ocorre.
+            priority (int): Desempate entre eventos do mesmo timeslot (menor ocorre antes).
+
+        Returns:
+            Event : Evento agendado.
+        """
+        if time < self.now:
+            raise ValueError('Não é possível agendar um evento no passado.')
+        event = Event(time, callback, args, kwargs, priority)
+        heapq.heappush(self._heap, (time, priority, next(self._sequence), event))
+        self._pending += 1
+        return event
+
+    def cancel(self, event: Event):
+        """
+        Cancela um evento agendado.
+
+        Args:
+            event (Event): Evento a ser cancelado.
+        """
+        if not event.cancelled:
+            event.cancel()
+            self._pending -= 1
+
+    def _discard_cancelled(self):
+        while self._heap and self._heap[0][3].cancelled:
+            heapq.heappop(self._heap)
+
+    def peek(self):
+        """
+        Retorna o timeslot do próximo evento.
+
+        Returns:
+            int : Timeslot do próximo evento, ou None se não há eventos.
+        """
+        self._discard_cancelled()
+        return self._heap[0][0] if self._heap else None
+
+    def defer_timeslot(self, count: int = 1):
+        """
+        Registra que o evento em execução ocupou mais timeslots. Chamado por Network.timeslot().
+
+        Args:
+            count (int): Número de timeslots.
+        """
+        self._ticks += count
+
+    def advance_to(self, time: int):
+        """
+        Avança o relógio da rede até um timeslot, aplicando de uma vez a decoerência dos timeslots ociosos.
+
+        Args:
+            time (int): Timeslot de destino.
+        """
+        elapsed = time - self.now
+        if elapsed > 0:
+            if elapsed > 1:
+                self.idle_timeslots_skipped += elapsed - 1
+            self._network.advance_timeslots(elapsed)
+
+    def step(self) -> bool:
+        """
+        Executa o próximo evento.
+
+        Returns:
+            bool : True se um evento foi executado, False se não há eventos.
+        """
+        self._discard_cancelled()
+        if not self._heap:
+            return False
+        time, _, _, event = heapq.heappop(self._heap)
+        self._pending -= 1
+        self.advance_to(time)
+        self._dispatching = True
+        self._ticks = 0
+        try:
+            event.callback(*event.args, **event.kwargs)
+        finally:
+            self._dispatching = False
+        self.events_processed += 1
+        self._busy_until = max(self._busy_until, time + self._ticks)
+        return True
+
+    def run(self, until: int = None, max_events: int = None) -> int:
+        """
+        Executa eventos até o heap esvaziar, até um timeslot ou até um número máximo de eventos.
+        Ao final, o relógio é avançado até o fim do evento mais longo executado (ou até `until`).
+
+        Args:
+            until (int): Último timeslot simulado. Se None, executa até não haver mais eventos.
+            max_events (int): Número máximo de eventos executados.
+
+        Returns:
+            int : Número de eventos executados.
+        """
+        processed = 0
+        while max_events is None or processed < max_events:
+            time = self.peek()
+            if time is None or (until is not None and time > until):
+                break
+            self.step()
+            processed += 1
+        if until is not None:
+            self.advance_to(until)
+        elif max_events is None or processed < max_events:
+            self.advance_to(self._busy_until)
+        return processed
@@ -0,0 +1,543 @@
+"""
+Snapshot binário do estado completo de uma rede (ver Network.save_snapshot e Network.load_snapshot).
+
+Formato do arquivo:
+    MAGIC (8 bytes) | tamanho do cabeçalho (uint64, little-endian) | cabeçalho JSON | arrays
+
+O cabeçalho guarda os valores escalares (configuração da rede, contadores das camadas, estado do gerador
+de números aleatórios, estatísticas) e, para cada array, o dtype, o formato e a posição no arquivo. Os
+arrays são gravados em sequência, alinhados a ALIGNMENT bytes, de forma que a leitura mapeia o arquivo em
+memória (np.memmap, modo copy-on-write) e cada array é uma visão desse mapeamento, sem cópia.
+
+Os objetos Qubit e Epr são gravados em tabelas colunares (um array por campo). Os pares EPR dos canais e
+dos enlaces virtuais, as memórias dos hosts e as listas das camadas guardam apenas os índices dos objetos nessas tabelas, de
+forma que um mesmo objeto referenciado em vários lugares continua sendo um único objeto na restauração.
+"""
+import json
+import struct
+import numpy as np
+import networkx as nx
+from ..objects import Qubit, Epr, EprPool, VirtualLinks
+from ..components import Host
+
+MAGIC = b'QNETSNAP'
+VERSION = 3
+ALIGNMENT = 64
+
+
+def _aligned(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def write(path: str, meta: dict, arrays: dict):
+    """
+    Grava um snapshot.
+
+    Args:
+        path (str): Arquivo de destino.
+        meta (dict): Valores escalares (serializáveis em JSON).
+        arrays (dict): Arrays NumPy, {nome: array}.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    descriptors = {}
+    offset = 0
+    for name, array in arrays.items():
+        descriptors[name] = {'dtype': np.lib.format.dtype_to_descr(array.dtype), 'shape': list(array.shape), 'offset': offset}
+        offset += _aligned(array.nbytes)
+    header = json.dumps({'version': VERSION, 'meta': meta, 'arrays': descriptors}).encode()
+    start = _aligned(len(MAGIC) + 8 + len(header))
+    with open(path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack('<Q', len(header)))
+        file.write(header)
+        file.write(b'\0' * (start - file.tell()))
+        for array in arrays.values():
+            array.tofile(file)
+            file.write(b'\0' * (_aligned(array.nbytes) - array.nbytes))
+
+
+def read(path: str, mmap: bool = True) -> tuple:
+    """
+    Lê um snapshot.
+
+    Args:
+        path (str): Arquivo do snapshot.
+        mmap (bool): Se True, o arquivo é mapeado em memória (copy-on-write: alterações nos arrays não
+            são gravadas no arquivo). Se False, o arquivo é lido inteiro para a memória.
+
+    Returns:
+        tuple : (valores escalares, {nome: array}).
+
+    Raises:
+        ValueError: Se o arquivo não for um snapshot ou tiver outra versão do formato.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} não é um snapshot de rede.')
+        (length,) = struct.unpack('<Q', file.read(8))
+        header = json.loads(file.read(length))
+    if header['version'] != VERSION:
+        raise ValueError(f'Versão de snapshot não suportada: {header["version"]}.')
+    start = _aligned(len(MAGIC) + 8 + length)
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode='c').view(np.ndarray)
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+    arrays = {}
+    for name, descriptor in header['arrays'].items():
+        descr = descriptor['dtype']
+        dtype = np.lib.format.descr_to_dtype(descr if isinstance(descr, str) else [tuple(field) for field in descr])
+        shape = tuple(descriptor['shape'])
+        offset = start + descriptor['offset']
+        nbytes = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        arrays[name] = buffer[offset:offset + nbytes].view(dtype).reshape(shape)
+    return header['meta'], arrays
+
+
+def _index(objects, table: list, positions: dict) -> np.ndarray:
+    """
+    Retorna a posição de cada objeto na tabela, acrescentando os objetos que ainda não estão nela.
+    """
+    indices = []
+    for obj in objects:
+        index = positions.get(id(obj))
+        if index is None:
+            index = positions[id(obj)] = len(table)
+            table.append(obj)
+        indices.append(index)
+    return np.array(indices, dtype=np.int64)
+
+
+def _pack_attributes(records: list, name: str, arrays: dict, exclude: tuple = ()) -> list:
+    """
+    Grava os atributos de nós ou arestas. Atributos numéricos viram arrays (valores e máscara de
+    presença); os demais são mantidos no cabeçalho, em JSON.
+
+    Returns:
+        list : Descrição dos atributos, para o cabeçalho.
+    """
+    keys = {}
+    for record in records:
+        for key in record:
+            if key not in exclude:
+                keys.setdefault(key, None)
+    packed = []
+    for i, key in enumerate(keys):
+        present = np.array([key in record for record in records], dtype=bool)
+        values = [record[key] for record in records if key in record]
+        try:
+            column = np.array(values)
+        except ValueError:
+            column = None
+        if column is not None and column.dtype.kind in 'biuf':
+            arrays[f'{name}.{i}.present'] = present
+            arrays[f'{name}.{i}.values'] = column
+            packed.append({'name': key, 'array': True})
+        else:
+            packed.append({'name': key, 'array': False, 'index': np.flatnonzero(present).tolist(), 'values': values})
+    return packed
+
+
+def _unpack_attributes(packed: list, records: list, name: str, arrays: dict):
+    """
+    Restaura nos dicionários de atributos os atributos gravados por _pack_attributes.
+    """
+    for i, attribute in enumerate(packed):
+        key = attribute['name']
+        if attribute['array']:
+            values = arrays[f'{name}.{i}.values']
+            index = np.flatnonzero(arrays[f'{name}.{i}.present']).tolist()
+            values = [tuple(value) for value in values.tolist()] if values.ndim > 1 else values.tolist()
+        else:
+            index = attribute['index']
+            values = attribute['values']
+        for position, value in zip(index, values):
+            records[position][key] = value
+
+
+def _pack_pools(pools: list, name: str, arrays: dict, epr_table: list, epr_positions: dict):
+    """
+    Grava os pares EPR (na ordem de inserção) e os arrays de uma lista de pools.
+    """
+    pool_eprs = [list(pool) for pool in pools]
+    arrays[f'{name}.edges'] = np.array([pool.edge for pool in pools], dtype=np.int64).reshape(-1, 2)
+    arrays[f'{name}.counts'] = np.array([len(eprs) for eprs in pool_eprs], dtype=np.int64)
+    arrays[f'{name}.eprs'] = _index((epr for eprs in pool_eprs for epr in eprs), epr_table, epr_positions)
+    handles = [np.array([epr._handle for epr in eprs], dtype=np.int64) for eprs in pool_eprs]
+    for field, column, dtype in (('ids', '_ids', np.int64), ('slots', '_slots', np.int64), ('created', '_created', np.int64),
+                                 ('failed', '_failed', bool)):
+        values = [getattr(pool, column)[pool_handles] for pool, pool_handles in zip(pools, handles)]
+        arrays[f'{name}.{field}'] = np.concatenate(values) if values else np.zeros(0, dtype=dtype)
+    arrays[f'{name}.sums'] = np.array([pool._sum for pool in pools], dtype=np.float64)
+    arrays[f'{name}.sum_logs'] = np.array([pool._sum_log for pool in pools], dtype=np.float64)
+    arrays[f'{name}.sum_generations'] = np.array([pool._sum_generation for pool in pools], dtype=np.int64)
+
+
+def _unpack_pools(name: str, arrays: dict, store, eprs: list, on_change) -> list:
+    """
+    Restaura os pools gravados por _pack_pools. Os arrays de posições e de timeslots de criação dos pares são
+    visões dos arrays lidos.
+
+    Returns:
+        list : Pools, na ordem gravada.
+    """
+    pool_eprs = arrays[f'{name}.eprs'].tolist()
+    ids = arrays[f'{name}.ids']
+    slots = arrays[f'{name}.slots']
+    created = arrays[f'{name}.created']
+    failed = arrays[f'{name}.failed']
+    pools = []
+    start = 0
+    for i, (edge, count) in enumerate(zip(arrays[f'{name}.edges'].tolist(), arrays[f'{name}.counts'].tolist())):
+        end = start + count
+        edge = tuple(edge)
+        pool = EprPool.from_arrays(store, edge, [eprs[j] for j in pool_eprs[start:end]], ids[start:end], slots[start:end],
+                                   created[start:end], on_change=on_change, fidelity_sum=float(arrays[f'{name}.sums'][i]),
+                                   sum_log=float(arrays[f'{name}.sum_logs'][i]), sum_generation=int(arrays[f'{name}.sum_generations'][i]),
+                                   failed=failed[start:end])
+        if count:
+            on_change(edge, True)
+        pools.append(pool)
+        start = end
+    return pools
+
+
+def save(network, path: str):
+    """
+    Grava o estado completo da rede em um snapshot: grafo e atributos dos canais, hosts e memórias, pares
+    EPR dos canais, armazenamento de fidelidades, contadores e registros das camadas, timeslot, timeslots
+    de criação dos qubits e estado do gerador de números aleatórios.
+
+    As tabelas de roteamento dos hosts não são gravadas (devem ser registradas novamente pelo controlador).
+
+    Args:
+        network (Network): Rede.
+        path (str): Arquivo de destino.
+
+    Raises:
+        ValueError: Se houver eventos agendados no simulador da rede.
+    """
+    if network._simulator is not None and len(network._simulator):
+        raise ValueError('Não é possível salvar o snapshot de uma rede com eventos agendados no simulador.')
+    physical = network.physical
+    link = network.linklayer
+    network_layer = network.networklayer
+    transport = network.transportlayer
+    store = network.fidelity_store
+    arrays = {}
+    qubit_table, qubit_positions = [], {}
+    epr_table, epr_positions = [], {}
+
+    # Grafo: nós, arestas (na ordem de iteração) e ordem das adjacências de cada nó
+    graph = network.graph
+    nodes = list(graph.nodes())
+    edges = list(graph.edges(data=True))
+    edge_index = {id(data): i for i, (_, _, data) in enumerate(edges)}
+    degrees = []
+    adjacency = []
+    for node in nodes:
+        neighbors = graph._adj[node]
+        degrees.append(len(neighbors))
+        adjacency.extend(edge_index[id(data)] for data in neighbors.values())
+    arrays['graph.nodes'] = np.array(nodes, dtype=np.int64)
+    arrays['graph.edges'] = np.array([(u, v) for u, v, _ in edges], dtype=np.int64).reshape(-1, 2)
+    arrays['graph.degrees'] = np.array(degrees, dtype=np.int64)
+    arrays['graph.adjacency'] = np.array(adjacency, dtype=np.int64)
+    node_attributes = _pack_attributes([graph.nodes[node] for node in nodes], 'graph.node_attributes', arrays)
+    edge_attributes = _pack_attributes([data for _, _, data in edges], 'graph.edge_attributes', arrays, exclude=('eprs',))
+
+    # Pares EPR dos canais, na ordem de inserção
+    pools = [network.get_eprs_from_edge(u, v) if 'eprs' in data else None for u, v, data in edges]
+    has_pool = np.array([pool is not None for pool in pools], dtype=bool)
+    pools = [pool for pool in pools if pool is not None]
+    arrays['pools.mask'] = has_pool
+    _pack_pools(pools, 'pools', arrays, epr_table, epr_positions)
+    # Pares EPR dos enlaces virtuais
+    virtual_links = network.virtual_links
+    _pack_pools([virtual_links.pool(u, v) for u, v in virtual_links], 'virtual', arrays, epr_table, epr_positions)
+
+    # Hosts e memórias
+    hosts = list(network.hosts.values())
+    arrays['hosts.ids'] = np.array([host.host_id for host in hosts], dtype=np.int64)
+    arrays['hosts.memory_sizes'] = np.array([-1 if host.memory_size is None else host.memory_size for host in hosts], dtype=np.int64)
+    arrays['hosts.overflow'] = np.array([host.memory.overflow for host in hosts], dtype=np.int64)
+    arrays['hosts.max_qubits_create'] = np.array([host._max_qubits_create for host in hosts], dtype=np.int64)
+    arrays['hosts.prob_on_demand'] = np.array([host._probability_on_demand_qubit_create for host in hosts], dtype=np.float64)
+    arrays['hosts.prob_replay'] = np.array([host._probability_replay_qubit_create for host in hosts], dtype=np.float64)
+    arrays['hosts.connection_counts'] = np.array([len(host.connections) for host in hosts], dtype=np.int64)
+    arrays['hosts.connections'] = np.array([c for host in hosts for c in host.connections], dtype=np.int64)
+    arrays['hosts.memory_counts'] = np.array([len(host.memory) for host in hosts], dtype=np.int64)
+    arrays['hosts.memory'] = _index((qubit for host in hosts for qubit in host.memory), qubit_table, qubit_positions)
+
+    # Listas de objetos das camadas
+    arrays['physical.qubits'] = _index(physical._qubits, qubit_table, qubit_positions)
+    arrays['physical.created_eprs'] = _index(physical.created_eprs, epr_table, epr_positions)
+    arrays['link.created_eprs'] = _index(link.created_eprs, epr_table, epr_positions)
+    arrays['transport.created_eprs'] = _index(transport.created_eprs, epr_table, epr_positions)
+
+    # Tabelas de objetos
+    arrays['qubits.ids'] = np.array([qubit.qubit_id for qubit in qubit_table], dtype=np.int64)
+    arrays['qubits.states'] = np.array([qubit._qubit_state for qubit in qubit_table], dtype=np.int8)
+    arrays['qubits.initial_fidelities'] = np.array([qubit._initial_fidelity for qubit in qubit_table], dtype=np.float64)
+    arrays['qubits.current_fidelities'] = np.array([qubit._current_fidelity for qubit in qubit_table], dtype=np.float64)
+    arrays['qubits.slots'] = np.array([-1 if qubit._store is not store else qubit._slot for qubit in qubit_table], dtype=np.int64)
+    arrays['eprs.ids'] = np.array([epr._epr_id for epr in epr_table], dtype=np.int64)
+    arrays['eprs.initial_fidelities'] = np.array([epr._initial_fidelity for epr in epr_table], dtype=np.float64)
+    # Pares de listas antigas das camadas podem estar no armazenamento de outra rede (ver Network.fork)
+    arrays['eprs.current_fidelities'] = np.array([epr._current_fidelity if epr._store is None or epr._store is store else epr.get_current_fidelity()
+                                                  for epr in epr_table], dtype=np.float64)
+    arrays['eprs.slots'] = np.array([-1 if epr._store is not store else epr._slot for epr in epr_table], dtype=np.int64)
+
+    # Armazenamento de fidelidades
+    size = store._size
+    arrays['store.fidelities'] = store._fidelities[:size]
+    arrays['store.timeslots'] = store._timeslots[:size]
+    arrays['store.updated'] = store._updated[:size]
+    arrays['store.alive'] = store._alive[:size]
+    arrays['store.free'] = np.array(store._free, dtype=np.int64)
+
+    # Timeslots de criação dos qubits
+    arrays['qubit_timeslots.ids'] = np.fromiter(network.qubit_timeslots.keys(), dtype=np.int64, count=len(network.qubit_timeslots))
+    arrays['qubit_timeslots.timeslots'] = np.fromiter((info['timeslot'] for info in network.qubit_timeslots.values()), dtype=np.int64,
+                                                      count=len(network.qubit_timeslots))
+
+    # Gerador de números aleatórios: estado e amostras já sorteadas e ainda não usadas
+    rng = network.rng
+    arrays['rng.uniforms'] = np.array(rng._uniforms, dtype=np.float64)
+    arrays['rng.bits'] = np.array(rng._bits, dtype=np.int8)
+
+    # Registros
+    arrays['transport.log'] = transport.transport_log.records()
+    arrays['epr_ledger.events'] = network.epr_ledger.events()
+
+    meta = {
+        'config': {
+            'decoherence_mode': network.decoherence_mode,
+            'decoherence_factor': network.decoherence_factor,
+            'host_memory_size': network.host_memory_size,
+            'transport_retention': transport.transport_log.retention,
+        },
+        'network': {
+            'topology': network._topology,
+            'graph_version': network.graph_version,
+            'graph_attributes': graph.graph,
+            'node_attributes': node_attributes,
+            'edge_attributes': edge_attributes,
+            'count_qubit': network.count_qubit,
+            'max_prob': network.max_prob,
+            'min_prob': network.min_prob,
+            'timeslot_total': network.timeslot_total,
+        },
+        'rng': {
+            'seed': rng.seed if isinstance(rng.seed, (int, type(None))) else None,
+            'buffer_size': rng._buffer_size,
+            'state': rng.generator.bit_generator.state,
+        },
+        'store': {
+            'size': size,
+            'count': store._count,
+            'log_decay': store._log_decay,
+            'generation': store.generation,
+        },
+        'physical': {
+            'max_prob': physical.max_prob,
+            'min_prob': physical.min_prob,
+            'physical_layer_id': physical._physical_layer_id,
+            'initial_qubits_fidelity': physical._initial_qubits_fidelity,
+            'count_qubit': physical._count_qubit,
+            'count_epr': physical._count_epr,
+            'used_eprs': physical.used_eprs,
+            'used_qubits': physical.used_qubits,
+        },
+        'link': {
+            'requests': [list(request) for request in link._requests],
+            'failed_requests': [list(request) for request in link._failed_requests],
+            'used_eprs': link.used_eprs,
+            'used_qubits': link.used_qubits,
+            'fidelity_stats': link.fidelity_stats.state(),
+        },
+        'network_layer': {
+            'avg_size_routes': network_layer.avg_size_routes,
+            'used_eprs': network_layer.used_eprs,
+            'used_qubits': network_layer.used_qubits,
+            'routes_used': [[alice, bob, path] for (alice, bob), path in network_layer.routes_used.items()],
+            'route_stats': network_layer.route_stats.state(),
+        },
+        'transport': {
+            'used_eprs': transport.used_eprs,
+            'used_qubits': transport.used_qubits,
+            'fidelity_stats': transport.fidelity_stats.state(),
+            'log_routes': [list(route) for route in transport.transport_log.routes],
+            'log_total': transport.transport_log.total,
+        },
+        'application': {
+            'used_qubits': network.application_layer.used_qubits,
+        },
+    }
+    write(path, meta, arrays)
+
+
+def restore(network, meta: dict, arrays: dict):
+    """
+    Restaura em uma rede recém-criada (com a configuração meta['config']) o estado lido de um snapshot.
+    Os arrays do armazenamento de fidelidades e dos pools dos canais passam a ser visões dos arrays lidos.
+
+    Args:
+        network (Network): Rede recém-criada.
+        meta (dict): Valores escalares do snapshot.
+        arrays (dict): Arrays do snapshot.
+    """
+    physical = network.physical
+    link = network.linklayer
+    network_layer = network.networklayer
+    transport = network.transportlayer
+    store = network.fidelity_store
+
+    # Gerador de números aleatórios
+    rng = network.rng
+    state = meta['rng']['state']
+    bit_generator = getattr(np.random, state['bit_generator'])()
+    bit_generator.state = state
+    rng._generator = np.random.Generator(bit_generator)
+    rng.seed = meta['rng']['seed']
+    rng._buffer_size = meta['rng']['buffer_size']
+    rng._uniforms = arrays['rng.uniforms'].tolist()
+    rng._bits = arrays['rng.bits'].tolist()
+
+    # Rede
+    values = meta['network']
+    network._topology = values['topology']
+    network._graph_version = values['graph_version']
+    network.count_qubit = values['count_qubit']
+    network.max_prob = values['max_prob']
+    network.min_prob = values['min_prob']
+    network.timeslot_total = values['timeslot_total']
+    network.qubit_timeslots = {qubit_id: {'timeslot': timeslot} for qubit_id, timeslot in
+                               zip(arrays['qubit_timeslots.ids'].tolist(), arrays['qubit_timeslots.timeslots'].tolist())}
+
+    # Armazenamento de fidelidades
+    values = meta['store']
+    if values['size']:
+        store._fidelities = arrays['store.fidelities']
+        store._timeslots = arrays['store.timeslots']
+        store._updated = arrays['store.updated']
+        store._alive = arrays['store.alive']
+    store._free = arrays['store.free'].tolist()
+    store._size = values['size']
+    store._count = values['count']
+    store._log_decay = values['log_decay']
+    store.generation = values['generation']
+    # As correções das decoerências parciais não são gravadas: os pools defasados recalculam as suas somas
+    store._corrections.clear()
+
+    # Tabelas de objetos
+    qubits = []
+    for qubit_id, qubit_state, initial, current, slot in zip(arrays['qubits.ids'].tolist(), arrays['qubits.states'].tolist(),
+                                                            arrays['qubits.initial_fidelities'].tolist(),
+                                                            arrays['qubits.current_fidelities'].tolist(), arrays['qubits.slots'].tolist()):
+        qubit = Qubit(qubit_id, initial)
+        qubit._qubit_state = qubit_state
+        qubit._current_fidelity = current
+        if slot >= 0:
+            qubit._store = store
+            qubit._slot = slot
+        qubits.append(qubit)
+    eprs = []
+    for epr_id, initial, current, slot in zip(arrays['eprs.ids'].tolist(), arrays['eprs.initial_fidelities'].tolist(),
+                                              arrays['eprs.current_fidelities'].tolist(), arrays['eprs.slots'].tolist()):
+        epr = Epr(epr_id, initial)
+        epr._current_fidelity = current
+        if slot >= 0:
+            epr._store = store
+            epr._slot = slot
+        eprs.append(epr)
+
+    # Hosts e memórias
+    memory = arrays['hosts.memory'].tolist()
+    connections = arrays['hosts.connections'].tolist()
+    memory_start = 0
+    connection_start = 0
+    for host_id, memory_size, overflow, max_qubits_create, prob_on_demand, prob_replay, connection_count, memory_count in zip(
+            arrays['hosts.ids'].tolist(), arrays['hosts.memory_sizes'].tolist(), arrays['hosts.overflow'].tolist(),
+            arrays['hosts.max_qubits_create'].tolist(), arrays['hosts.prob_on_demand'].tolist(), arrays['hosts.prob_replay'].tolist(),
+            arrays['hosts.connection_counts'].tolist(), arrays['hosts.memory_counts'].tolist()):
+        host = Host(host_id, prob_on_demand, prob_replay, max_qubits_create, None if memory_size < 0 else memory_size)
+        network.bind_host_memory(host)
+        host.memory.extend_attached([qubits[i] for i in memory[memory_start:memory_start + memory_count]])
+        host.memory.overflow = overflow
+        host.connections.extend(connections[connection_start:connection_start + connection_count])
+        memory_start += memory_count
+        connection_start += connection_count
+        network._hosts[host_id] = host
+
+    # Grafo, com a mesma ordem de nós, de arestas e de adjacências
+    values = meta['network']
+    graph = nx.Graph()
+    graph.graph.update(values['graph_attributes'])
+    nodes = arrays['graph.nodes'].tolist()
+    node_data = [{} for _ in nodes]
+    _unpack_attributes(values['node_attributes'], node_data, 'graph.node_attributes', arrays)
+    graph.add_nodes_from(zip(nodes, node_data))
+    edges = arrays['graph.edges'].tolist()
+    edge_data = [{} for _ in edges]
+    _unpack_attributes(values['edge_attributes'], edge_data, 'graph.edge_attributes', arrays)
+
+    # Pools dos canais: os arrays de posições e de timeslots de criação são visões do snapshot
+    pools = iter(_unpack_pools('pools', arrays, store, eprs, network._set_channel_live))
+    for data, has_pool in zip(edge_data, arrays['pools.mask'].tolist()):
+        if has_pool:
+            data['eprs'] = next(pools)
+
+    # Enlaces virtuais
+    virtual_links = network._virtual_links = VirtualLinks(store)
+    for pool in _unpack_pools('virtual', arrays, store, eprs, virtual_links._set_live):
+        virtual_links._pools[pool.edge] = pool
+
+    # As adjacências são preenchidas diretamente, na ordem gravada (add_edges_from não a reproduz sempre)
+    adjacency = arrays['graph.adjacency'].tolist()
+    position = 0
+    for node, degree in zip(nodes, arrays['graph.degrees'].tolist()):
+        neighbors = graph._adj[node]
+        for edge in adjacency[position:position + degree]:
+            u, v = edges[edge]
+            neighbors[v if u == node else u] = edge_data[edge]
+        position += degree
+    network._graph = graph
+
+    # Camadas
+    values = meta['physical']
+    physical.max_prob = values['max_prob']
+    physical.min_prob = values['min_prob']
+    physical._physical_layer_id = values['physical_layer_id']
+    physical._initial_qubits_fidelity = values['initial_qubits_fidelity']
+    physical._count_qubit = values['count_qubit']
+    physical._count_epr = values['count_epr']
+    physical.used_eprs = values['used_eprs']
+    physical.used_qubits = values['used_qubits']
+    physical._qubits = [qubits[i] for i in arrays['physical.qubits'].tolist()]
+    physical.created_eprs = [eprs[i] for i in arrays['physical.created_eprs'].tolist()]
+
+    values = meta['link']
+    link._requests = [tuple(request) for request in values['requests']]
+    link._failed_requests = [tuple(request) for request in values['failed_requests']]
+    link.used_eprs = values['used_eprs']
+    link.used_qubits = values['used_qubits']
+    link.created_eprs = [eprs[i] for i in arrays['link.created_eprs'].tolist()]
+    link.fidelity_stats.load_state(values['fidelity_stats'])
+
+    values = meta['network_layer']
+    network_layer.avg_size_routes = values['avg_size_routes']
+    network_layer.used_eprs = values['used_eprs']
+    network_layer.used_qubits = values['used_qubits']
+    network_layer.routes_used = {(alice, bob): path for alice, bob, path in values['routes_used']}
+    network_layer.route_stats.load_state(values['route_stats'])
+
+    values = meta['transport']
+    transport.used_eprs = values['used_eprs']
+    transport.used_qubits = values['used_qubits']
+    transport.created_eprs = [eprs[i] for i in arrays['transport.created_eprs'].tolist()]
+    transport.fidelity_stats.load_state(values['fidelity_stats'])
+    transport.transport_log.restore(arrays['transport.log'], values['log_routes'], values['log_total'])
+
+    network.application_layer.used_qubits = meta['application']['used_qubits']
+    network.epr_ledger.restore(arrays['epr_ledger.events'])
@@ -0,0 +1,343 @@
+"""
+Geradores e leitores de topologias com nós inteiros.
+
+Cada gerador retorna o número de nós e as arestas em um array (m, 2), construídos com NumPy, sem criar
+um grafo intermediário com outros rótulos. Os geradores aleatórios recebem um np.random.Generator e
+retornam também as posições dos nós, quando existem.
+
+Os leitores (read_edge_list, read_csv, read_graphml) retornam os nós, as arestas e os atributos das
+arestas em colunas (arrays NumPy), sem criar objetos Python por linha do arquivo.
+"""
+from array import array
+import xml.etree.ElementTree as ET
+import networkx as nx
+import numpy as np
+from scipy.spatial import cKDTree, ConvexHull, QhullError
+
+# Número máximo de pares avaliados por vez nos geradores que comparam todos os pares (Waxman)
+CHUNK_PAIRS = 1 << 22
+
+
+def grid_edges(rows: int, cols: int) -> tuple:
+    """
+    Grade rows x cols. O nó da linha i e coluna j é i * cols + j. As arestas saem na mesma ordem de
+    nx.convert_node_labels_to_integers(nx.grid_2d_graph(rows, cols)).
+
+    Args:
+        rows (int): Número de linhas.
+        cols (int): Número de colunas.
+
+    Returns:
+        tuple : (número de nós, arestas).
+    """
+    n = rows * cols
+    nodes = np.arange(n, dtype=np.int64)
+    down = nodes[nodes < n - cols]
+    right = nodes[nodes % cols != cols - 1]
+    sources = np.concatenate([down, right])
+    targets = np.concatenate([down + cols, right + 1])
+    # Para cada nó, primeiro a aresta para baixo e depois a aresta para a direita
+    order = np.lexsort((np.repeat([0, 1], [len(down), len(right)]), sources))
+    return n, np.stack([sources[order], targets[order]], axis=1)
+
+
+def line_edges(n: int) -> tuple:
+    """
+    Linha com n nós.
+
+    Args:
+        n (int): Número de nós.
+
+    Returns:
+        tuple : (número de nós, arestas).
+    """
+    nodes = np.arange(max(n - 1, 0), dtype=np.int64)
+    return n, np.stack([nodes, nodes + 1], axis=1)
+
+
+def ring_edges(n: int) -> tuple:
+    """
+    Anel com n nós. As arestas saem na mesma ordem de nx.cycle_graph(n).
+
+    Args:
+        n (int): Número de nós.
+
+    Returns:
+        tuple : (número de nós, arestas).
+    """
+    if n == 1:
+        return n, np.array([[0, 0]], dtype=np.int64)
+    _, edges = line_edges(n)
+    if n > 2:
+        edges = np.concatenate([edges[:1], [[0, n - 1]], edges[1:]])
+    return n, edges
+
+
+def waxman_edges(n: int, beta: float = 0.4, alpha: float = 0.1, rng: np.random.Generator = None) -> tuple:
+    """
+    Topologia de Waxman: n nós em posições uniformes no quadrado unitário, e cada par (u, v) ligado com
+    probabilidade beta * exp(-d(u, v) / (alpha * L)), onde L é a maior distância entre dois nós.
+    Os pares são sorteados em blocos de até CHUNK_PAIRS pares, o que limita a memória temporária.
+
+    Args:
+        n (int): Número de nós.
+        beta (float): Probabilidade máxima de ligação.
+        alpha (float): Razão entre a distância característica das ligações e L.
+        rng (np.random.Generator): Gerador de números aleatórios.
+
+    Returns:
+        tuple : (número de nós, arestas, posições (n, 2)).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    positions = rng.random((n, 2))
+    if n < 2:
+        return n, np.zeros((0, 2), dtype=np.int64), positions
+    # A maior distância entre dois nós está entre vértices do fecho convexo
+    try:
+        hull = positions[ConvexHull(positions).vertices]
+    except QhullError:
+        hull = positions
+    L = np.sqrt(((hull[:, None, :] - hull[None, :, :]) ** 2).sum(axis=2)).max()
+    if L == 0:
+        L = 1.0
+    edges = []
+    chunk = max(1, CHUNK_PAIRS // n)
+    for start in range(0, n - 1, chunk):
+        sources = np.arange(start, min(start + chunk, n - 1))
+        distances = np.sqrt(((positions[sources, None, :] - positions[None, :, :]) ** 2).sum(axis=2))
+        probabilities = beta * np.exp(-distances / (alpha * L))
+        # Somente os pares (u, v) com u < v
+        probabilities[np.arange(n)[None, :] <= sources[:, None]] = 0
+        u, v = np.nonzero(rng.random(probabilities.shape) < probabilities)
+        edges.append(np.stack([sources[u], v], axis=1))
+    return n, np.concatenate(edges).astype(np.int64), positions
+
+
+def barabasi_albert_edges(n: int, m: int, rng: np.random.Generator = None) -> tuple:
+    """
+    Topologia de Barabási–Albert: cada novo nó se liga a m nós existentes, escolhidos com probabilidade
+    proporcional ao grau (ligação preferencial). Os m primeiros nós formam uma estrela com centro em m.
+
+    Args:
+        n (int): Número de nós.
+        m (int): Número de arestas de cada novo nó.
+        rng (np.random.Generator): Gerador de números aleatórios.
+
+    Returns:
+        tuple : (número de nós, arestas).
+    """
+    if m < 1 or m >= n:
+        raise ValueError(f'Barabási–Albert exige 1 <= m < n (m = {m}, n = {n}).')
+    rng = rng if rng is not None else np.random.default_rng()
+    edges = np.empty((m * (n - m), 2), dtype=np.int64)
+    # Cada nó aparece em `repeated` uma vez por aresta incidente: sortear uma posição é sortear um nó
+    # com probabilidade proporcional ao grau
+    repeated = np.empty(2 * m * (n - m), dtype=np.int64)
+    edges[:m, 0] = m
+    edges[:m, 1] = np.arange(m)
+    repeated[:m] = np.arange(m)
+    repeated[m:2 * m] = m
+    size = 2 * m
+    count = m
+    for source in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.update(repeated[rng.integers(0, size, m - len(targets))].tolist())
+        targets = sorted(targets)
+        edges[count:count + m, 0] = source
+        edges[count:count + m, 1] = targets
+        repeated[size:size + m] = targets
+        repeated[size + m:size + 2 * m] = source
+        size += 2 * m
+        count += m
+    return n, edges
+
+
+def random_geometric_edges(n: int, radius: float, rng: np.random.Generator = None) -> tuple:
+    """
+    Grafo geométrico aleatório: n nós em posições uniformes no quadrado unitário, ligados quando a
+    distância entre eles é no máximo `radius`. Os pares são encontrados com uma KD-tree, em
+    O(n log n + m).
+
+    Args:
+        n (int): Número de nós.
+        radius (float): Distância máxima das ligações.
+        rng (np.random.Generator): Gerador de números aleatórios.
+
+    Returns:
+        tuple : (número de nós, arestas, posições (n, 2)).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    positions = rng.random((n, 2))
+    pairs = cKDTree(positions).query_pairs(radius, output_type='ndarray') if n else np.zeros((0, 2))
+    pairs = pairs.astype(np.int64)
+    # Ordena as arestas por nó de origem, para que a construção seja reprodutível
+    return n, pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))], positions
+
+
+# Atributos de aresta reconhecidos pela rede. Nos arquivos de lista de arestas sem cabeçalho, as colunas
+# após a origem e o destino são lidas nesta ordem.
+EDGE_ATTRIBUTES = ('prob_on_demand_epr_create', 'prob_replay_epr_create', 'initial_eprs')
+
+
+def _edge_columns(table: np.ndarray, names: tuple) -> tuple:
+    """
+    Separa uma tabela numérica (m, k) em arestas (m, 2) e colunas de atributos.
+    """
+    if table.shape[1] < 2:
+        raise ValueError('Cada aresta precisa de pelo menos duas colunas (origem e destino).')
+    if table.shape[1] - 2 > len(names):
+        raise ValueError(f'O arquivo tem {table.shape[1] - 2} colunas de atributos, mas apenas {len(names)} nomes.')
+    edges = table[:, :2].astype(np.int64)
+    attributes = {name: table[:, 2 + i] for i, name in enumerate(names[:table.shape[1] - 2])}
+    return np.unique(edges), edges, attributes
+
+
+def read_edge_list(path: str, delimiter: str = None, names: tuple = EDGE_ATTRIBUTES, comments: str = '#') -> tuple:
+    """
+    Lê uma lista de arestas: uma aresta por linha, com a origem, o destino e, opcionalmente, atributos
+    numéricos nas colunas seguintes. O arquivo é lido pelo leitor em C do NumPy (np.loadtxt).
+
+    Args:
+        path (str): Arquivo.
+        delimiter (str): Separador das colunas. Se None, qualquer espaço em branco.
+        names (tuple): Nomes das colunas de atributos, na ordem do arquivo.
+        comments (str): Prefixo das linhas de comentário.
+
+    Returns:
+        tuple : (nós, arestas (m, 2), {atributo: array}).
+    """
+    table = np.loadtxt(path, delimiter=delimiter, comments=comments, ndmin=2, dtype=np.float64)
+    return _edge_columns(table, tuple(names))
+
+
+def read_csv(path: str, delimiter: str = ',') -> tuple:
+    """
+    Lê um CSV de arestas com cabeçalho. As duas primeiras colunas são a origem e o destino; as demais são
+    atributos numéricos das arestas, nomeados pelo cabeçalho.
+
+    Args:
+        path (str): Arquivo.
+        delimiter (str): Separador das colunas.
+
+    Returns:
+        tuple : (nós, arestas (m, 2), {atributo: array}).
+    """
+    with open(path) as file:
+        header = [name.strip() for name in file.readline().split(delimiter)]
+    table = np.loadtxt(path, delimiter=delimiter, skiprows=1, ndmin=2, dtype=np.float64)
+    if table.size == 0:
+        table = table.reshape(0, len(header))
+    return _edge_columns(table, tuple(header[2:]))
+
+
+def read_graphml(path: str) -> tuple:
+    """
+    Lê um arquivo GraphML de forma incremental (os elementos são descartados assim que lidos). Os ids dos
+    nós são convertidos para inteiros se todos forem números; senão, os nós são numerados na ordem em que
+    aparecem. Os atributos numéricos das arestas são lidos em colunas; arestas sem um atributo recebem NaN.
+
+    Args:
+        path (str): Arquivo.
+
+    Returns:
+        tuple : (nós, arestas (m, 2), {atributo: array}).
+    """
+    keys = {}
+    index = {}
+    sources = array('q')
+    targets = array('q')
+    columns = {}
+    count = 0
+    for _, element in ET.iterparse(path, events=('end',)):
+        tag = element.tag.rsplit('}', 1)[-1]
+        if tag == 'key':
+            if element.get('for') in ('edge', 'all') and element.get('attr.type') in ('double', 'float', 'int', 'long'):
+                keys[element.get('id')] = element.get('attr.name', element.get('id'))
+        elif tag == 'node':
+            index.setdefault(element.get('id'), len(index))
+            element.clear()
+        elif tag == 'edge':
+            sources.append(index.setdefault(element.get('source'), len(index)))
+            targets.append(index.setdefault(element.get('target'), len(index)))
+            for data in element:
+                name = keys.get(data.get('key'))
+                if name is not None:
+                    column = columns.get(name)
+                    if column is None:
+                        column = columns[name] = array('d', [np.nan]) * count
+                    column.append(float(data.text))
+            count += 1
+            for column in columns.values():
+                if len(column) < count:
+                    column.append(np.nan)
+            element.clear()
+    ids = list(index)
+    try:
+        labels = np.array([int(node_id) for node_id in ids], dtype=np.int64)
+    except ValueError:
+        labels = np.arange(len(ids), dtype=np.int64)
+    edges = np.stack([np.frombuffer(sources, dtype=np.int64), np.frombuffer(targets, dtype=np.int64)], axis=1)
+    edges = labels[edges] if len(edges) else edges.reshape(0, 2)
+    attributes = {name: np.frombuffer(column, dtype=np.float64) for name, column in columns.items()}
+    return labels, edges, attributes
+
+
+def build_graph(nodes, edges: np.ndarray, positions: np.ndarray = None, attributes: dict = None) -> nx.Graph:
+    """
+    Cria o grafo com os nós e as arestas informados, na ordem informada.
+
+    Args:
+        nodes (int | np.ndarray): Número de nós (nós 0 a nodes - 1) ou array com os nós.
+        edges (np.ndarray): Arestas (m, 2).
+        positions (np.ndarray): Posições dos nós (atributo 'pos'), opcional.
+        attributes (dict): Atributos das arestas, {nome: array com um valor por aresta}. Valores NaN são
+            ignorados; 'initial_eprs' é convertido para inteiro.
+
+    Returns:
+        nx.Graph : Grafo.
+    """
+    graph = nx.Graph()
+    nodes = range(nodes) if isinstance(nodes, (int, np.integer)) else nodes.tolist()
+    if positions is None:
+        graph.add_nodes_from(nodes)
+    else:
+        graph.add_nodes_from((node, {'pos': tuple(pos)}) for node, pos in zip(nodes, positions.tolist()))
+    if not attributes:
+        graph.add_edges_from(edges.tolist())
+        return graph
+    names = list(attributes)
+    table = np.stack([attributes[name] for name in names], axis=1)
+    if np.isnan(table).any():
+        rows = ({name: value for name, value in zip(names, row) if value == value} for row in table.tolist())
+    else:
+        rows = (dict(zip(names, row)) for row in table.tolist())
+    graph.add_edges_from((u, v, data) for (u, v), data in zip(edges.tolist(), rows))
+    return graph
+
+
+def copy_graph(graph: nx.Graph) -> nx.Graph:
+    """
+    Copia o grafo (atributos do grafo, dos nós e das arestas, em dicionários novos) mantendo a ordem das
+    adjacências de cada nó, que Graph.copy nem sempre reproduz e que define a ordem dos caminhos mínimos.
+
+    Args:
+        graph (nx.Graph): Grafo.
+
+    Returns:
+        nx.Graph : Cópia do grafo.
+    """
+    copy = graph.__class__()
+    copy.graph.update(graph.graph)
+    copy.add_nodes_from((node, data.copy()) for node, data in graph.nodes(data=True))
+    edge_data = {}
+    for node, neighbors in graph._adj.items():
+        row = copy._adj[node]
+        for neighbor, data in neighbors.items():
+            # As duas direções de uma aresta compartilham o mesmo dicionário de atributos
+            key = id(data)
+            twin = edge_data.get(key)
+            if twin is None:
+                twin = edge_data[key] = data.copy()
+            row[neighbor] = twin
+    return copy
@@ -1,3 +1,12 @@
-from .logger import Logger
+from .logger import Logger, TraceSink, TraceEvent
+from .random_source import RandomSource
+from .copy_on_write import CopyOnWriteMapping
 from .qubit import Qubit
-from .epr import Epr
\ No newline at end of file
+from .epr import Epr
+from .fidelity_store import FidelityStore
+from .quantum_memory import QuantumMemory
+from .epr_pool import EprPool
+from .metrics import StreamingStats, P2Quantile
+from .transport_log import TransportLog
+from .epr_ledger import EprLedger
+from .virtual_links import VirtualLinks
@@ -0,0 +1,74 @@
+from collections.abc import MutableMapping
+
+class CopyOnWriteMapping(MutableMapping):
+    """
+    Dicionário cujos valores são compartilhados com as cópias criadas por fork() até serem acessados.
+
+    O primeiro acesso a um valor compartilhado (leitura ou escrita, já que o objeto devolvido pode ser
+    alterado por quem o recebe) substitui o valor por uma cópia feita pela função `clone`, e os acessos
+    seguintes usam essa cópia. Valores atribuídos diretamente pertencem ao dicionário. Verificar se uma
+    chave existe, iterar sobre as chaves e contar os valores não copiam nada.
+    """
+    def __init__(self, items: dict = None, clone=None) -> None:
+        """
+        Args:
+            items (dict): Valores iniciais, todos compartilhados.
+            clone (callable): Chamada como clone(valor) no primeiro acesso a um valor compartilhado.
+        """
+        self._items = dict(items) if items else {}
+        self._owned = set()
+        self._clone = clone
+
+    def __getitem__(self, key):
+        value = self._items[key]
+        if key not in self._owned:
+            value = self._clone(value)
+            self._items[key] = value
+            self._owned.add(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._items[key] = value
+        self._owned.add(key)
+
+    def __delitem__(self, key):
+        del self._items[key]
+        self._owned.discard(key)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f'CopyOnWriteMapping({self._items!r})'
+
+    def is_owned(self, key) -> bool:
+        """
+        Verifica se o valor de uma chave já pertence ao dicionário (foi copiado ou atribuído).
+
+        Args:
+            key: Chave.
+
+        Returns:
+            bool : True se o valor não é compartilhado.
+        """
+        return key in self._owned
+
+    def fork(self, clone=None) -> 'CopyOnWriteMapping':
+        """
+        Cria um dicionário com os mesmos valores. A partir daí, todos os valores passam a ser compartilhados
+        pelos dois dicionários e são copiados por cada um deles no primeiro acesso.
+
+        Args:
+            clone (callable): Função de cópia do novo dicionário. Se None, usa a deste.
+
+        Returns:
+            CopyOnWriteMapping : Novo dicionário.
+        """
+        self._owned = set()
+        return CopyOnWriteMapping(self._items, clone or self._clone)
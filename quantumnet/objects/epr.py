@@ -1,12 +1,47 @@
-import random
+from .random_source import RandomSource
+
 class Epr():
-    def __init__(self,  epr_id: int, initial_fidelity: float = None) -> None:
+    __slots__ = ('_epr_id', '_initial_fidelity', '_current_fidelity', '_store', '_slot', '_pool', '_handle')
+
+    def __init__(self,  epr_id: int, initial_fidelity: float = None, rng: RandomSource = None) -> None:
         self._epr_id = epr_id
-        self._initial_fidelity = initial_fidelity  if initial_fidelity is not None else random.uniform(0, 1)
-        self._current_fidelity = initial_fidelity  if initial_fidelity is not None else random.uniform(0, 1)
+        if initial_fidelity is None:
+            rng = rng or RandomSource.default()
+            self._initial_fidelity = rng.uniform(0, 1)
+            self._current_fidelity = rng.uniform(0, 1)
+        else:
+            self._initial_fidelity = initial_fidelity
+            self._current_fidelity = initial_fidelity
+        # Armazenamento de fidelidades ao qual o par está anexado (ver FidelityStore)
+        self._store = None
+        self._slot = None
+        # Pool do canal em que o par está e sua posição nele (ver EprPool)
+        self._pool = None
+        self._handle = None
         # Ainda vamos ver se isso vai ser necessário
         # self.qubits = qubits
     
+    def clone(self, store=None):
+        """
+        Cria uma cópia do par EPR, fora de qualquer pool. Se o par estiver anexado a um armazenamento de
+        fidelidades, a cópia ocupa a mesma posição no armazenamento informado (uma bifurcação do original).
+
+        Args:
+            store (FidelityStore): Armazenamento da cópia.
+
+        Returns:
+            Epr : Cópia do par.
+        """
+        epr = Epr.__new__(Epr)
+        epr._epr_id = self._epr_id
+        epr._initial_fidelity = self._initial_fidelity
+        epr._current_fidelity = self._current_fidelity
+        epr._store = store if self._store is not None else None
+        epr._slot = self._slot if self._store is not None else None
+        epr._pool = None
+        epr._handle = None
+        return epr
+
     @property
     def epr_id(self):
         return self._epr_id
@@ -15,8 +50,15 @@ class Epr():
         return self._initial_fidelity
     
     def get_current_fidelity(self):
+        if self._store is not None:
+            return self._store.get(self._slot)
         return self._current_fidelity
     
     def set_fidelity(self, new_fidelity: float):
         """Define a nova fidelidade do par EPR."""
-        self._current_fidelity = new_fidelity
\ No newline at end of file
+        if self._pool is not None:
+            self._pool.set_fidelity(self, new_fidelity)
+        elif self._store is not None:
+            self._store.set(self._slot, new_fidelity)
+        else:
+            self._current_fidelity = new_fidelity
\ No newline at end of file
@@ -0,0 +1,270 @@
+import copy
+import numpy as np
+
+class EprLedger():
+    """
+    Registro (somente de inserção) do ciclo de vida dos pares EPR.
+
+    Cada evento (criação, falha, purificação, swapping, consumo, expiração) é uma linha de um array
+    estruturado compacto com o id do par, o tipo do evento, a causa, o timeslot, o canal (u, v) e a
+    fidelidade do par no momento do evento. O registro não guarda referências aos objetos Epr.
+
+    Se um caminho de arquivo for informado, o array fica em um arquivo mapeado em memória (np.memmap),
+    que cresce conforme necessário.
+    """
+    # Eventos. CREATE, PURIFY e SWAP iniciam o ciclo de vida de um par; CONSUME e EXPIRE o encerram.
+    CREATE = 0
+    FAIL = 1
+    PURIFY = 2
+    SWAP = 3
+    CONSUME = 4
+    EXPIRE = 5
+    EVENTS = ('create', 'fail', 'purify', 'swap', 'consume', 'expire')
+    STARTS = (CREATE, PURIFY, SWAP)
+    ENDS = (CONSUME, EXPIRE)
+    # Causas (quem gerou o evento)
+    CAUSES = ('unknown', 'start', 'heralding', 'echp', 'scheduled', 'purification', 'swap', 'teleport', 'expiry')
+
+    DTYPE = np.dtype([
+        ('epr_id', np.int64),
+        ('event', np.int8),
+        ('cause', np.int8),
+        ('timeslot', np.int64),
+        ('u', np.int64),
+        ('v', np.int64),
+        ('fidelity', np.float64),
+    ])
+
+    def __init__(self, clock=None, path: str = None, capacity: int = 1024) -> None:
+        """
+        Args:
+            clock (callable): Função que retorna o timeslot atual.
+            path (str): Arquivo para o armazenamento mapeado em memória. Se None, o registro fica em memória.
+            capacity (int): Capacidade inicial. Dobra sempre que necessário.
+        """
+        self._clock = clock
+        self.path = path
+        self._size = 0
+        self._causes = {cause: code for code, cause in enumerate(self.CAUSES)}
+        self._data = self._allocate(capacity)
+        # True enquanto o array for compartilhado com o registro de origem (ver fork)
+        self._shared = False
+
+    def __len__(self):
+        return self._size
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """
+        Cria (ou amplia, se houver arquivo) o array de eventos com a capacidade informada.
+        """
+        if self.path is None:
+            data = np.zeros(capacity, dtype=self.DTYPE)
+            if self._size:
+                data[:self._size] = self._data[:self._size]
+            self._shared = False
+            return data
+        if self._size:
+            self._data.flush()
+            del self._data
+        mode = 'r+' if self._size else 'w+'
+        if self._size:
+            with open(self.path, 'r+b') as file:
+                file.truncate(capacity * self.DTYPE.itemsize)
+        return np.memmap(self.path, dtype=self.DTYPE, mode=mode, shape=(capacity,))
+
+    def record(self, event: int, epr, edge: tuple = None, cause: str = 'unknown', timeslot: int = None):
+        """
+        Registra um evento do ciclo de vida de um par EPR.
+
+        Args:
+            event (int): Tipo do evento (CREATE, FAIL, PURIFY, SWAP, CONSUME ou EXPIRE).
+            epr (Epr): Par EPR.
+            edge (tuple): Canal (u, v). Se None, usa o canal em que o par está, se houver.
+            cause (str): Causa do evento (uma de CAUSES).
+            timeslot (int): Timeslot do evento. Se None, usa o relógio do registro.
+        """
+        if self._size == len(self._data):
+            self._data = self._allocate(2 * len(self._data))
+        elif self._shared:
+            self._data = self._allocate(len(self._data))
+        if edge is None:
+            pool = epr._pool
+            edge = pool.edge if pool is not None and pool.edge is not None else (-1, -1)
+        u, v = edge
+        if timeslot is None:
+            timeslot = self._clock() if self._clock is not None else 0
+        epr_id = epr.epr_id
+        self._data[self._size] = (
+            epr_id if isinstance(epr_id, (int, np.integer)) else -1,
+            event,
+            self._causes.get(cause, 0),
+            timeslot,
+            u if isinstance(u, (int, np.integer)) else -1,
+            v if isinstance(v, (int, np.integer)) else -1,
+            epr.get_current_fidelity(),
+        )
+        self._size += 1
+
+    def record_many(self, event: int, eprs: list, edges, cause: str = 'unknown', fidelities=None, timeslot: int = None, epr_ids=None):
+        """
+        Registra o mesmo evento para vários pares EPR de uma vez.
+
+        Args:
+            event (int): Tipo do evento.
+            eprs (list): Pares EPR.
+            edges (tuple | np.ndarray): Canal (u, v) de todos os pares, ou um array (k, 2) com o canal de cada par.
+            cause (str): Causa do evento (uma de CAUSES).
+            fidelities (array-like): Fidelidades dos pares. Se None, são lidas dos pares.
+            timeslot (int): Timeslot do evento. Se None, usa o relógio do registro.
+            epr_ids (array-like): Ids dos pares. Se None, são lidos dos pares.
+        """
+        count = len(eprs)
+        if count == 0:
+            return
+        capacity = len(self._data)
+        if self._size + count > capacity:
+            while self._size + count > capacity:
+                capacity *= 2
+            self._data = self._allocate(capacity)
+        elif self._shared:
+            self._data = self._allocate(capacity)
+        if timeslot is None:
+            timeslot = self._clock() if self._clock is not None else 0
+        if fidelities is None:
+            fidelities = [epr.get_current_fidelity() for epr in eprs]
+        rows = self._data[self._size:self._size + count]
+        if epr_ids is None:
+            epr_ids = [epr.epr_id if isinstance(epr.epr_id, (int, np.integer)) else -1 for epr in eprs]
+        rows['epr_id'] = epr_ids
+        rows['event'] = event
+        rows['cause'] = self._causes.get(cause, 0)
+        rows['timeslot'] = timeslot
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        rows['u'] = edges[:, 0]
+        rows['v'] = edges[:, 1]
+        rows['fidelity'] = fidelities
+        self._size += count
+
+    def restore(self, events: np.ndarray):
+        """
+        Substitui os eventos registrados pelos informados (por exemplo, lidos de um snapshot).
+
+        Args:
+            events (np.ndarray): Eventos (campos de DTYPE), na ordem de registro.
+        """
+        capacity = len(self._data)
+        while capacity < len(events):
+            capacity *= 2
+        self._size = 0
+        if capacity != len(self._data) or self._shared:
+            self._data = self._allocate(capacity)
+        self._data[:len(events)] = events
+        self._size = len(events)
+
+    def fork(self, clock=None) -> 'EprLedger':
+        """
+        Cria um registro com os mesmos eventos, em O(1): o novo registro lê o array deste até registrar o seu
+        primeiro evento, quando copia os eventos para um array próprio, em memória. Como este registro
+        somente acrescenta eventos depois dos já registrados, ele não precisa copiar nada.
+
+        Args:
+            clock (callable): Relógio do novo registro. Se None, usa o deste.
+
+        Returns:
+            EprLedger : Novo registro, em memória.
+        """
+        ledger = copy.copy(self)
+        if clock is not None:
+            ledger._clock = clock
+        ledger.path = None
+        ledger._shared = True
+        return ledger
+
+    def events(self) -> np.ndarray:
+        """
+        Retorna os eventos registrados.
+
+        Returns:
+            np.ndarray : Array estruturado (campos de DTYPE), na ordem de registro.
+        """
+        return self._data[:self._size]
+
+    def counts(self) -> dict:
+        """
+        Conta os eventos por tipo.
+
+        Returns:
+            dict : {nome do evento: quantidade}.
+        """
+        counts = np.bincount(self.events()['event'], minlength=len(self.EVENTS))
+        return {name: int(count) for name, count in zip(self.EVENTS, counts)}
+
+    def lifetimes(self) -> np.ndarray:
+        """
+        Calcula o ciclo de vida dos pares que já foram encerrados (consumidos ou expirados).
+
+        Returns:
+            np.ndarray : Array estruturado com epr_id, u, v (canal de criação), created, ended, end_event
+                e lifetime (ended - created).
+        """
+        events = self.events()
+        starts = events[np.isin(events['event'], self.STARTS)]
+        ends = events[np.isin(events['event'], self.ENDS)]
+        # Primeiro início e primeiro fim de cada par
+        start_ids, start_index = np.unique(starts['epr_id'], return_index=True)
+        end_ids, end_index = np.unique(ends['epr_id'], return_index=True)
+        _, in_starts, in_ends = np.intersect1d(start_ids, end_ids, assume_unique=True, return_indices=True)
+        starts = starts[start_index[in_starts]]
+        ends = ends[end_index[in_ends]]
+        result = np.zeros(len(starts), dtype=[('epr_id', np.int64), ('u', np.int64), ('v', np.int64), ('created', np.int64),
+                                              ('ended', np.int64), ('end_event', np.int8), ('lifetime', np.int64)])
+        result['epr_id'] = starts['epr_id']
+        result['u'] = np.minimum(starts['u'], starts['v'])
+        result['v'] = np.maximum(starts['u'], starts['v'])
+        result['created'] = starts['timeslot']
+        result['ended'] = ends['timeslot']
+        result['end_event'] = ends['event']
+        result['lifetime'] = ends['timeslot'] - starts['timeslot']
+        return result
+
+    def edge_stats(self) -> dict:
+        """
+        Estatísticas por canal: pares criados, falhos, consumidos e expirados, tempo de vida médio, idade
+        média no consumo e taxa de desperdício ((falhos + expirados) / criados).
+
+        Returns:
+            dict : {(u, v): estatísticas}, com u <= v.
+        """
+        events = self.events()
+        u = np.minimum(events['u'], events['v'])
+        v = np.maximum(events['u'], events['v'])
+        edges, inverse = np.unique(np.stack([u, v], axis=1), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        kinds = events['event']
+        created = np.bincount(inverse, weights=np.isin(kinds, self.STARTS), minlength=len(edges))
+        failed = np.bincount(inverse, weights=kinds == self.FAIL, minlength=len(edges))
+        consumed = np.bincount(inverse, weights=kinds == self.CONSUME, minlength=len(edges))
+        expired = np.bincount(inverse, weights=kinds == self.EXPIRE, minlength=len(edges))
+
+        lifetimes = self.lifetimes()
+        stats = {}
+        for i, (a, b) in enumerate(edges):
+            on_edge = lifetimes[(lifetimes['u'] == a) & (lifetimes['v'] == b)]
+            consumed_lifetimes = on_edge['lifetime'][on_edge['end_event'] == self.CONSUME]
+            stats[(int(a), int(b))] = {
+                'created': int(created[i]),
+                'failed': int(failed[i]),
+                'consumed': int(consumed[i]),
+                'expired': int(expired[i]),
+                'mean_lifetime': float(on_edge['lifetime'].mean()) if len(on_edge) else None,
+                'mean_age_at_consumption': float(consumed_lifetimes.mean()) if len(consumed_lifetimes) else None,
+                'waste_rate': float((failed[i] + expired[i]) / created[i]) if created[i] else None,
+            }
+        return stats
+
+    def flush(self):
+        """
+        Grava em disco os eventos pendentes (somente com armazenamento mapeado em memória).
+        """
+        if self.path is not None:
+            self._data.flush()
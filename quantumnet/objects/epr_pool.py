@@ -0,0 +1,563 @@
+import copy
+import math
+import numpy as np
+from .fidelity_store import FidelityStore
+
+class EprPool():
+    """
+    Conjunto de pares EPR de um canal.
+
+    Os ids, as posições no armazenamento de fidelidades e os timeslots de criação dos pares são mantidos em
+    arrays paralelos, que dobram de tamanho quando necessário. A ordem de inserção é mantida por uma lista
+    duplamente encadeada sobre esses arrays, de forma que inserir no fim, remover do início ou do fim e
+    remover um par qualquer (pelo seu handle) custam O(1).
+
+    O pool se comporta como a lista de pares EPR usada anteriormente nos canais: suporta len(), iteração,
+    pool[0], pool[-1], append(), remove() e pop().
+
+    Os pares podem ser marcados como falhos (criados com fidelidade abaixo do limiar, candidatos à
+    purificação, ver mark_failed e failed). A marca fica em um array paralelo e é desfeita quando o par
+    deixa o pool.
+
+    O pool também mantém a soma das fidelidades dos seus pares, atualizada a cada inserção, remoção e
+    alteração de fidelidade e reescalada pela decoerência acumulada do armazenamento, de forma que a
+    fidelidade média do canal é obtida em O(1).
+    """
+    def __init__(self, store: FidelityStore, edge: tuple = None, capacity: int = 16, on_change=None) -> None:
+        """
+        Args:
+            store (FidelityStore): Armazenamento onde ficam as fidelidades dos pares.
+            edge (tuple): Canal (u, v) ao qual o pool pertence.
+            capacity (int): Capacidade inicial dos arrays.
+            on_change (callable): Chamada como on_change(edge, live) quando o pool deixa de estar vazio
+                (live=True) ou fica vazio (live=False).
+        """
+        self._store = store
+        self.edge = edge
+        self._on_change = on_change
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._slots = np.zeros(capacity, dtype=np.int64)
+        self._created = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._failed = np.zeros(capacity, dtype=bool)
+        self._prev = np.full(capacity, -1, dtype=np.int64)
+        self._next = np.full(capacity, -1, dtype=np.int64)
+        self._objects = [None] * capacity
+        self._free = []
+        self._size = 0
+        self._count = 0
+        self._failed_count = 0
+        self._head = -1
+        self._tail = -1
+        # Soma das fidelidades, válida para a decoerência acumulada _sum_log e a geração _sum_generation
+        self._sum = 0.0
+        self._sum_log = store.log_decay()
+        self._sum_generation = store.generation
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        handle = self._head
+        while handle != -1:
+            # O próximo é lido antes de devolver o par, para permitir remoções durante a iteração
+            next_handle = int(self._next[handle])
+            yield self._objects[handle]
+            handle = next_handle
+
+    def __reversed__(self):
+        handle = self._tail
+        while handle != -1:
+            prev_handle = int(self._prev[handle])
+            yield self._objects[handle]
+            handle = prev_handle
+
+    def __contains__(self, epr):
+        return getattr(epr, '_pool', None) is self
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self._objects[self._handle_at(index)]
+
+    def __repr__(self):
+        return f'EprPool({self.edge}, {list(self)})'
+
+    @property
+    def store(self):
+        """
+        Armazenamento de fidelidades dos pares do pool.
+
+        Returns:
+            FidelityStore : Armazenamento de fidelidades.
+        """
+        return self._store
+
+    def _handle_at(self, index: int) -> int:
+        """
+        Converte uma posição na ordem de inserção em um handle. O(1) para o primeiro e o último pares.
+        """
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError('Índice fora do intervalo do pool de pares EPR.')
+        if index <= self._count // 2:
+            handle = self._head
+            for _ in range(index):
+                handle = self._next[handle]
+        else:
+            handle = self._tail
+            for _ in range(self._count - 1 - index):
+                handle = self._prev[handle]
+        return int(handle)
+
+    def following(self, epr=None):
+        """
+        Retorna o par seguinte a um par do pool na ordem de inserção, em O(1).
+
+        Args:
+            epr (Epr): Par EPR do pool. Se None, retorna o primeiro par.
+
+        Returns:
+            Epr : Par seguinte, ou None se o par for o último (ou se o pool estiver vazio).
+        """
+        handle = self._head if epr is None else int(self._next[epr._handle])
+        return self._objects[handle] if handle != -1 else None
+
+    def _grow(self):
+        """
+        Dobra a capacidade dos arrays.
+        """
+        capacity = 2 * len(self._ids)
+        for name, fill in (('_ids', 0), ('_slots', 0), ('_created', 0), ('_alive', False), ('_failed', False), ('_prev', -1),
+                           ('_next', -1)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self._objects.extend([None] * (capacity - len(self._objects)))
+
+    def append(self, epr):
+        """
+        Adiciona um par EPR ao fim do pool.
+
+        Args:
+            epr (Epr): Par EPR.
+
+        Returns:
+            int : Handle do par no pool.
+        """
+        if self._free:
+            handle = self._free.pop()
+        else:
+            if self._size == len(self._ids):
+                self._grow()
+            handle = self._size
+            self._size += 1
+        self._store.attach(epr)
+        self._sum = self.fidelity_sum() + self._store.get(epr._slot)
+        epr_id = epr.epr_id
+        self._ids[handle] = epr_id if isinstance(epr_id, (int, np.integer)) else -1
+        self._slots[handle] = epr._slot
+        self._created[handle] = self._store.now()
+        self._alive[handle] = True
+        self._objects[handle] = epr
+        self._prev[handle] = self._tail
+        self._next[handle] = -1
+        if self._tail != -1:
+            self._next[self._tail] = handle
+        else:
+            self._head = handle
+        self._tail = handle
+        self._count += 1
+        epr._handle = handle
+        epr._pool = self
+        if self._count == 1 and self._on_change is not None:
+            self._on_change(self.edge, True)
+        return handle
+
+    def extend(self, eprs):
+        """
+        Adiciona vários pares EPR ao fim do pool. Os pares recebem handles consecutivos e são anexados ao
+        armazenamento de fidelidades de uma só vez.
+
+        Args:
+            eprs (iterable): Pares EPR.
+        """
+        eprs = list(eprs)
+        if eprs:
+            self.extend_attached(eprs, self._store.attach_many(eprs))
+
+    def extend_attached(self, eprs: list, slots: np.ndarray, epr_ids: np.ndarray = None):
+        """
+        Adiciona ao fim do pool pares EPR que já foram anexados ao armazenamento de fidelidades do pool
+        (por exemplo, com um único FidelityStore.attach_many para os pares de vários canais).
+
+        Args:
+            eprs (list): Pares EPR.
+            slots (np.ndarray): Posições dos pares no armazenamento.
+            epr_ids (np.ndarray): Ids dos pares. Se None, são lidos dos pares.
+        """
+        count = len(eprs)
+        if count == 0:
+            return
+        while self._size + count > len(self._ids):
+            self._grow()
+        start = self._size
+        end = start + count
+        handles = np.arange(start, end, dtype=np.int64)
+        self._sum = self.fidelity_sum() + float(self._store.get_many(slots).sum())
+        if epr_ids is None:
+            epr_ids = [epr_id if isinstance(epr_id, (int, np.integer)) else -1 for epr_id in (epr.epr_id for epr in eprs)]
+        self._ids[start:end] = epr_ids
+        self._slots[start:end] = slots
+        self._created[start:end] = self._store.now()
+        self._alive[start:end] = True
+        self._objects[start:end] = eprs
+        # Encadeia os novos handles entre si e ao fim da lista atual
+        self._prev[start:end] = handles - 1
+        self._prev[start] = self._tail
+        self._next[start:end] = handles + 1
+        self._next[end - 1] = -1
+        if self._tail != -1:
+            self._next[self._tail] = start
+        else:
+            self._head = start
+        self._tail = end - 1
+        self._size = end
+        was_empty = self._count == 0
+        self._count += count
+        for epr, handle in zip(eprs, range(start, end)):
+            epr._handle = handle
+            epr._pool = self
+        if was_empty and self._on_change is not None:
+            self._on_change(self.edge, True)
+
+    @classmethod
+    def from_arrays(cls, store: FidelityStore, edge: tuple, eprs: list, ids: np.ndarray, slots: np.ndarray, created: np.ndarray,
+                    on_change=None, fidelity_sum: float = None, sum_log: float = None, sum_generation: int = None,
+                    failed: np.ndarray = None):
+        """
+        Cria um pool com pares EPR que já estão anexados ao armazenamento de fidelidades, usando os arrays
+        informados (por exemplo, lidos de um snapshot mapeado em memória) sem copiá-los. Os pares recebem os
+        handles 0 a n-1, na ordem informada. O callback on_change não é chamado.
+
+        Args:
+            store (FidelityStore): Armazenamento onde estão as fidelidades dos pares.
+            edge (tuple): Canal (u, v) ao qual o pool pertence.
+            eprs (list): Pares EPR, na ordem de inserção.
+            ids (np.ndarray): Ids dos pares (-1 para ids que não são inteiros).
+            slots (np.ndarray): Posições dos pares no armazenamento.
+            created (np.ndarray): Timeslots em que os pares foram adicionados ao canal.
+            on_change (callable): Ver __init__.
+            fidelity_sum (float): Soma das fidelidades, válida para sum_log e sum_generation. Se None, é
+                calculada a partir do armazenamento.
+            sum_log (float): Decoerência acumulada do armazenamento em que a soma foi calculada.
+            sum_generation (int): Geração do armazenamento em que a soma foi calculada.
+            failed (np.ndarray): Marca de par falho de cada par (ver mark_failed). Se None, nenhum par é falho.
+
+        Returns:
+            EprPool : Pool com os pares.
+        """
+        count = len(eprs)
+        if count == 0:
+            return cls(store, edge, on_change=on_change)
+        pool = cls.__new__(cls)
+        pool._store = store
+        pool.edge = edge
+        pool._on_change = on_change
+        pool._ids = ids
+        pool._slots = slots
+        pool._created = created
+        pool._alive = np.ones(count, dtype=bool)
+        pool._failed = failed if failed is not None else np.zeros(count, dtype=bool)
+        pool._failed_count = int(np.count_nonzero(pool._failed))
+        handles = np.arange(count, dtype=np.int64)
+        pool._prev = handles - 1
+        pool._next = handles + 1
+        pool._next[-1] = -1
+        pool._objects = list(eprs)
+        pool._free = []
+        pool._size = count
+        pool._count = count
+        pool._head = 0
+        pool._tail = count - 1
+        for epr, handle in zip(pool._objects, range(count)):
+            epr._handle = handle
+            epr._pool = pool
+        if fidelity_sum is None:
+            pool._sum = float(store.get_many(slots).sum())
+            pool._sum_log = store.log_decay()
+            pool._sum_generation = store.generation
+        else:
+            pool._sum = fidelity_sum
+            pool._sum_log = sum_log
+            pool._sum_generation = sum_generation
+        return pool
+
+    def clone(self, store: FidelityStore, on_change=None, clones: dict = None) -> 'EprPool':
+        """
+        Cria uma cópia do pool, com cópias dos pares EPR nos mesmos handles e nas mesmas posições do
+        armazenamento informado (uma bifurcação do armazenamento deste pool, ver FidelityStore.fork).
+
+        Args:
+            store (FidelityStore): Armazenamento da cópia.
+            on_change (callable): Ver __init__.
+            clones (dict): Se informado, recebe {par original: cópia} para cada par copiado.
+
+        Returns:
+            EprPool : Cópia do pool.
+        """
+        pool = copy.copy(self)
+        pool._store = store
+        pool._on_change = on_change
+        for name in ('_ids', '_slots', '_created', '_alive', '_failed', '_prev', '_next'):
+            setattr(pool, name, getattr(self, name).copy())
+        pool._free = list(self._free)
+        objects = [None] * len(self._objects)
+        for handle, epr in enumerate(self._objects):
+            if epr is not None:
+                twin = epr.clone(store)
+                twin._pool = pool
+                twin._handle = handle
+                objects[handle] = twin
+                if clones is not None:
+                    clones[epr] = twin
+        pool._objects = objects
+        return pool
+
+    def _unlink(self, handle: int):
+        """
+        Remove o par de um handle do pool e o desanexa do armazenamento de fidelidades.
+        """
+        # A soma é atualizada antes de desencadear o par, que ainda pode ter correções pendentes (ver fidelity_sum)
+        total = self.fidelity_sum() if self._count > 1 else 0.0
+        prev_handle = self._prev[handle]
+        next_handle = self._next[handle]
+        if prev_handle != -1:
+            self._next[prev_handle] = next_handle
+        else:
+            self._head = int(next_handle)
+        if next_handle != -1:
+            self._prev[next_handle] = prev_handle
+        else:
+            self._tail = int(prev_handle)
+        epr = self._objects[handle]
+        self._sum = total - self._store.get(epr._slot) if self._count > 1 else 0.0
+        self._objects[handle] = None
+        self._alive[handle] = False
+        if self._failed[handle]:
+            self._failed[handle] = False
+            self._failed_count -= 1
+        self._free.append(handle)
+        self._count -= 1
+        self._store.detach(epr)
+        epr._handle = None
+        epr._pool = None
+        if self._count == 0 and self._on_change is not None:
+            self._on_change(self.edge, False)
+        return epr
+
+    def remove(self, epr):
+        """
+        Remove um par EPR do pool pelo seu handle, em O(1).
+
+        Args:
+            epr (Epr): Par EPR a ser removido.
+
+        Raises:
+            ValueError: Se o par não estiver no pool.
+        """
+        if epr not in self:
+            raise ValueError('Par EPR não está no pool.')
+        self._unlink(epr._handle)
+
+    def pop(self, index: int = -1):
+        """
+        Remove e retorna um par EPR. O(1) para o primeiro e o último pares.
+
+        Args:
+            index (int): Posição do par na ordem de inserção.
+
+        Returns:
+            Epr : Par EPR removido.
+        """
+        return self._unlink(self._handle_at(index))
+
+    def clear(self):
+        """
+        Remove todos os pares EPR do pool.
+        """
+        while self._count:
+            self._unlink(self._head)
+
+    def ids(self) -> np.ndarray:
+        """
+        Retorna os ids dos pares do pool (-1 para ids que não são inteiros).
+
+        Returns:
+            np.ndarray : Ids dos pares, na ordem dos handles.
+        """
+        return self._ids[:self._size][self._alive[:self._size]]
+
+    def created_timeslots(self) -> np.ndarray:
+        """
+        Retorna os timeslots em que os pares foram adicionados ao canal.
+
+        Returns:
+            np.ndarray : Timeslots de criação, na ordem dos handles.
+        """
+        return self._created[:self._size][self._alive[:self._size]]
+
+    def mark_failed(self, epr):
+        """
+        Marca um par do pool como falho (candidato à purificação).
+
+        Args:
+            epr (Epr): Par EPR.
+
+        Raises:
+            ValueError: Se o par não estiver no pool.
+        """
+        if epr not in self:
+            raise ValueError('Par EPR não está no pool.')
+        if not self._failed[epr._handle]:
+            self._failed[epr._handle] = True
+            self._failed_count += 1
+
+    @property
+    def failed_count(self) -> int:
+        """
+        Número de pares falhos do pool.
+
+        Returns:
+            int : Número de pares marcados por mark_failed.
+        """
+        return self._failed_count
+
+    def failed(self, count: int = None) -> tuple:
+        """
+        Retorna os pares falhos do pool em ordem decrescente de fidelidade atual.
+
+        Args:
+            count (int): Número máximo de pares. Se None, retorna todos.
+
+        Returns:
+            tuple : (pares, fidelidades), com as fidelidades em um array.
+        """
+        if not self._failed_count:
+            return [], np.zeros(0)
+        return self._ranked(np.flatnonzero(self._failed[:self._size]), count)
+
+    def best(self, count: int = None) -> tuple:
+        """
+        Retorna os pares do pool em ordem decrescente de fidelidade atual.
+
+        Args:
+            count (int): Número máximo de pares. Se None, retorna todos.
+
+        Returns:
+            tuple : (pares, fidelidades), com as fidelidades em um array.
+        """
+        return self._ranked(np.flatnonzero(self._alive[:self._size]), count)
+
+    def _ranked(self, handles: np.ndarray, count: int = None) -> tuple:
+        """
+        Ordena os pares dos handles por fidelidade atual, lida do armazenamento de uma só vez. Com count,
+        somente os count melhores são ordenados.
+        """
+        fidelities = self._store.get_many(self._slots[handles])
+        if count is not None and count < len(handles):
+            best = np.argpartition(-fidelities, count - 1)[:count] if count > 0 else np.zeros(0, dtype=np.int64)
+            handles = handles[best]
+            fidelities = fidelities[best]
+        order = np.argsort(-fidelities, kind='stable')
+        objects = self._objects
+        return [objects[handle] for handle in handles[order].tolist()], fidelities[order]
+
+    def fidelities(self) -> np.ndarray:
+        """
+        Retorna as fidelidades atuais dos pares do pool, sem passar pelos objetos Epr.
+
+        Returns:
+            np.ndarray : Fidelidades, na ordem dos handles.
+        """
+        slots = self._slots[:self._size][self._alive[:self._size]]
+        store = self._store
+        fidelities = store._fidelities[slots]
+        if store.lazy:
+            fidelities = fidelities * store.decoherence_factor ** (store.now() - store._updated[slots])
+        return fidelities
+
+    def set_fidelity(self, epr, fidelity: float):
+        """
+        Altera a fidelidade de um par do pool, mantendo a soma das fidelidades atualizada.
+
+        Args:
+            epr (Epr): Par EPR do pool.
+            fidelity (float): Nova fidelidade.
+        """
+        total = self.fidelity_sum() - self._store.get(epr._slot) + fidelity
+        self._store.set(epr._slot, fidelity)
+        self._sum = total
+
+    def _recent_sum(self, timeslot: int, slots: np.ndarray, values: np.ndarray) -> float:
+        """
+        Soma as fidelidades informadas (por posição ordenada do armazenamento) dos pares do pool adicionados a
+        partir de um timeslot. Os pares entram no pool em ordem de timeslot, de forma que basta percorrer o
+        fim da lista.
+        """
+        total = 0.0
+        handle = self._tail
+        while handle != -1 and self._created[handle] >= timeslot:
+            slot = self._slots[handle]
+            index = int(np.searchsorted(slots, slot))
+            if index < len(slots) and slots[index] == slot:
+                total += float(values[index])
+            handle = int(self._prev[handle])
+        return total
+
+    def fidelity_sum(self) -> float:
+        """
+        Retorna a soma das fidelidades atuais dos pares do pool, em O(1).
+
+        Returns:
+            float : Soma das fidelidades.
+        """
+        store = self._store
+        log_decay = store.log_decay()
+        if self._sum_generation != store.generation or math.isinf(log_decay) or math.isinf(self._sum_log):
+            finite = not (math.isinf(log_decay) or math.isinf(self._sum_log))
+            corrections = store.corrections_since(self._sum_generation) if finite else None
+            if corrections is None:
+                # Correções fora do histórico, ou fator de decoerência 0 (sem logaritmo finito para reescalar a
+                # soma): recalcula a soma a partir dos arrays
+                self._sum = float(self.fidelities().sum())
+            else:
+                # Decoerências que não atingiram todos os pares: reescala a soma a cada passo e devolve aos
+                # pares que ficaram fora da máscara a parte da fidelidade que não decaiu
+                total = self._sum
+                sum_log = self._sum_log
+                for step_log, timeslot, factor, slots, values in corrections:
+                    total = total * math.exp(step_log - sum_log) + (1 - factor) * self._recent_sum(timeslot, slots, values)
+                    sum_log = step_log
+                self._sum = total * math.exp(log_decay - sum_log)
+            self._sum_generation = store.generation
+        elif log_decay != self._sum_log:
+            self._sum *= math.exp(log_decay - self._sum_log)
+        self._sum_log = log_decay
+        return self._sum
+
+    def mean_fidelity(self) -> float:
+        """
+        Retorna a fidelidade média dos pares do pool, em O(1).
+
+        Returns:
+            float : Fidelidade média, ou 0 se o pool estiver vazio.
+        """
+        if not self._count:
+            return 0.0
+        return self.fidelity_sum() / self._count
@@ -0,0 +1,365 @@
+import copy
+import math
+from collections import deque
+import numpy as np
+
+class FidelityStore():
+    """
+    Armazena de forma contígua (arrays NumPy) as fidelidades de um conjunto de qubits ou pares EPR.
+
+    Cada objeto anexado recebe uma posição (slot) no array. Enquanto estiver anexado, os getters e
+    setters do objeto passam a ler e escrever diretamente no array, o que permite aplicar a decoerência
+    em todos os objetos com uma única multiplicação mascarada.
+
+    No modo preguiçoso (lazy), a decoerência não é aplicada a cada timeslot: guarda-se a fidelidade e o
+    timeslot da última atualização, e a fidelidade é calculada na leitura como
+    f0 * fator ** (agora - última atualização).
+
+    Um armazenamento pode ser bifurcado (fork): os dois passam a compartilhar os arrays, e cada um copia os
+    arrays na sua primeira escrita.
+    """
+    # Número de decoerências parciais recentes cujas correções são guardadas (ver corrections_since)
+    CORRECTION_HISTORY = 64
+
+    def __init__(self, clock=None, capacity: int = 16, lazy: bool = False, decoherence_factor: float = 0.9) -> None:
+        """
+        Args:
+            clock (callable): Função que retorna o timeslot atual. Se None, o timeslot é sempre 0.
+            capacity (int): Capacidade inicial dos arrays. Dobra sempre que necessário.
+            lazy (bool): Se True, a decoerência é calculada somente na leitura.
+            decoherence_factor (float): Fator de decoerência por timeslot usado no modo preguiçoso.
+        """
+        self._clock = clock
+        self.lazy = lazy
+        self.decoherence_factor = decoherence_factor
+        self._fidelities = np.zeros(capacity, dtype=np.float64)
+        self._timeslots = np.zeros(capacity, dtype=np.int64)
+        self._updated = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._free = []
+        self._size = 0
+        self._count = 0
+        # Decoerência acumulada aplicada por decay(), em escala logarítmica. Usada pelos agregados
+        # incrementais (ver EprPool) para reescalar somas de fidelidades sem percorrer os arrays.
+        self._log_decay = 0.0
+        # Incrementado sempre que um decay() não atinge todos os objetos. Cada incremento tem uma correção em
+        # _corrections, com as fidelidades dos objetos que ficaram fora da máscara (ver corrections_since)
+        self.generation = 0
+        self._corrections = deque(maxlen=self.CORRECTION_HISTORY)
+        # True enquanto os arrays forem compartilhados com outro armazenamento (ver fork)
+        self._shared = False
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        """
+        Capacidade atual dos arrays.
+
+        Returns:
+            int : Número de posições alocadas.
+        """
+        return len(self._fidelities)
+
+    def now(self) -> int:
+        """
+        Retorna o timeslot atual segundo o relógio do armazenamento.
+
+        Returns:
+            int : Timeslot atual.
+        """
+        return self._clock() if self._clock is not None else 0
+
+    def log_decay(self) -> float:
+        """
+        Retorna o logaritmo do fator de decoerência acumulado desde a criação do armazenamento.
+        A razão exp(log_decay() - valor anterior) é o fator pelo qual todas as fidelidades anexadas
+        foram multiplicadas desde que o valor anterior foi lido (enquanto `generation` não mudar).
+
+        Returns:
+            float : Logaritmo da decoerência acumulada, ou -inf se o modo for preguiçoso, o fator for 0 e o
+                relógio já tiver avançado (as fidelidades anteriores ao timeslot atual foram zeradas).
+        """
+        if self.lazy:
+            now = self.now()
+            if self.decoherence_factor == 0:
+                return -math.inf if now > 0 else self._log_decay
+            return self._log_decay + now * math.log(self.decoherence_factor)
+        return self._log_decay
+
+    def _grow(self):
+        """
+        Dobra a capacidade dos arrays.
+        """
+        capacity = 2 * len(self._fidelities)
+        for name in ('_fidelities', '_timeslots', '_updated', '_alive'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self._shared = False
+
+    def _own(self):
+        """
+        Copia os arrays compartilhados com outro armazenamento antes de uma escrita.
+        """
+        for name in ('_fidelities', '_timeslots', '_updated', '_alive'):
+            setattr(self, name, getattr(self, name).copy())
+        self._shared = False
+
+    def fork(self, clock=None) -> 'FidelityStore':
+        """
+        Cria um armazenamento com as mesmas fidelidades, em O(1): os arrays são compartilhados até que um dos
+        dois armazenamentos escreva neles. Os objetos anexados continuam anexados a este armazenamento; a
+        cópia é usada por cópias desses objetos, que ocupam as mesmas posições.
+
+        Args:
+            clock (callable): Relógio do novo armazenamento. Se None, usa o deste.
+
+        Returns:
+            FidelityStore : Novo armazenamento.
+        """
+        store = copy.copy(self)
+        if clock is not None:
+            store._clock = clock
+        store._free = list(self._free)
+        store._corrections = deque(self._corrections, maxlen=self.CORRECTION_HISTORY)
+        self._shared = store._shared = True
+        return store
+
+    def allocate(self, fidelity: float, timeslot: int = None) -> int:
+        """
+        Reserva uma posição para uma nova fidelidade.
+
+        Args:
+            fidelity (float): Fidelidade inicial.
+            timeslot (int): Timeslot em que a fidelidade foi registrada. Se None, usa o timeslot atual.
+
+        Returns:
+            int : Posição reservada.
+        """
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == len(self._fidelities):
+                self._grow()
+            slot = self._size
+            self._size += 1
+        if self._shared:
+            self._own()
+        now = self.now()
+        self._fidelities[slot] = fidelity
+        self._timeslots[slot] = now if timeslot is None else timeslot
+        self._updated[slot] = now
+        self._alive[slot] = True
+        self._count += 1
+        return slot
+
+    def allocate_many(self, fidelities, timeslot: int = None) -> np.ndarray:
+        """
+        Reserva posições consecutivas, no fim dos arrays, para várias fidelidades de uma vez.
+
+        Args:
+            fidelities (array-like): Fidelidades iniciais.
+            timeslot (int): Timeslot em que as fidelidades foram registradas. Se None, usa o timeslot atual.
+
+        Returns:
+            np.ndarray : Posições reservadas, na ordem das fidelidades.
+        """
+        fidelities = np.asarray(fidelities, dtype=np.float64)
+        count = len(fidelities)
+        while self._size + count > len(self._fidelities):
+            self._grow()
+        if self._shared:
+            self._own()
+        start = self._size
+        end = start + count
+        now = self.now()
+        self._fidelities[start:end] = fidelities
+        self._timeslots[start:end] = now if timeslot is None else timeslot
+        self._updated[start:end] = now
+        self._alive[start:end] = True
+        self._size = end
+        self._count += count
+        return np.arange(start, end, dtype=np.int64)
+
+    def release(self, slot: int) -> float:
+        """
+        Libera uma posição e retorna a última fidelidade armazenada nela.
+
+        Args:
+            slot (int): Posição a ser liberada.
+
+        Returns:
+            float : Fidelidade armazenada na posição.
+        """
+        fidelity = self.get(slot)
+        if self._shared:
+            self._own()
+        self._alive[slot] = False
+        self._free.append(slot)
+        self._count -= 1
+        return fidelity
+
+    def get(self, slot: int) -> float:
+        """
+        Retorna a fidelidade armazenada em uma posição.
+
+        Args:
+            slot (int): Posição.
+
+        Returns:
+            float : Fidelidade.
+        """
+        if self.lazy:
+            elapsed = self.now() - self._updated[slot]
+            return float(self._fidelities[slot] * self.decoherence_factor ** elapsed)
+        return float(self._fidelities[slot])
+
+    def get_many(self, slots: np.ndarray) -> np.ndarray:
+        """
+        Retorna as fidelidades de várias posições.
+
+        Args:
+            slots (np.ndarray): Posições.
+
+        Returns:
+            np.ndarray : Fidelidades, na ordem das posições informadas.
+        """
+        if self.lazy:
+            elapsed = self.now() - self._updated[slots]
+            return self._fidelities[slots] * self.decoherence_factor ** elapsed
+        return self._fidelities[slots]
+
+    def set(self, slot: int, fidelity: float):
+        """
+        Define a fidelidade de uma posição.
+
+        Args:
+            slot (int): Posição.
+            fidelity (float): Nova fidelidade.
+        """
+        if self._shared:
+            self._own()
+        self._fidelities[slot] = fidelity
+        if self.lazy:
+            self._updated[slot] = self.now()
+
+    def attach(self, obj):
+        """
+        Anexa um qubit ou par EPR ao armazenamento. A fidelidade atual do objeto é copiada para o array.
+
+        Args:
+            obj (Qubit | Epr): Objeto a ser anexado.
+        """
+        if obj._store is not None:
+            obj._store.detach(obj)
+        obj._slot = self.allocate(obj._current_fidelity)
+        obj._store = self
+
+    def attach_many(self, objs: list) -> np.ndarray:
+        """
+        Anexa vários qubits ou pares EPR ao armazenamento, reservando as posições de uma só vez.
+
+        Args:
+            objs (list): Objetos a serem anexados.
+
+        Returns:
+            np.ndarray : Posições dos objetos, na mesma ordem.
+        """
+        for obj in objs:
+            if obj._store is not None:
+                obj._store.detach(obj)
+        slots = self.allocate_many([obj._current_fidelity for obj in objs])
+        for obj, slot in zip(objs, slots.tolist()):
+            obj._slot = slot
+            obj._store = self
+        return slots
+
+    def detach(self, obj):
+        """
+        Desanexa um qubit ou par EPR. A fidelidade do array é copiada de volta para o objeto.
+
+        Args:
+            obj (Qubit | Epr): Objeto a ser desanexado.
+        """
+        if obj._store is not self:
+            return
+        obj._current_fidelity = self.release(obj._slot)
+        obj._store = None
+        obj._slot = None
+
+    def decay(self, factor: float, timeslot: int):
+        """
+        Multiplica pelo fator de decoerência todas as fidelidades registradas antes do timeslot informado.
+        No modo preguiçoso, corresponde a um passo de decoerência extra, além do já calculado na leitura.
+
+        Quando algum objeto fica fora da máscara (registrado no próprio timeslot), a decoerência entra em
+        log_decay como se fosse uniforme e `generation` é incrementado, com uma correção que guarda as
+        fidelidades desses objetos (ver corrections_since).
+
+        Args:
+            factor (float): Fator de decoerência.
+            timeslot (int): Timeslot atual.
+        """
+        size = self._size
+        if self._count == 0:
+            return
+        if self._shared:
+            self._own()
+        mask = self._alive[:size] & (self._timeslots[:size] < timeslot)
+        fidelities = self._fidelities[:size]
+        np.multiply(fidelities, factor, out=fidelities, where=mask)
+        complete = np.count_nonzero(mask) == self._count
+        if factor > 0:
+            self._log_decay += math.log(factor)
+            if complete:
+                return
+            skipped = np.flatnonzero(self._alive[:size] & ~mask)
+            correction = (self.log_decay(), timeslot, factor, skipped, self.get_many(skipped))
+        else:
+            # Sem logaritmo finito para o fator 0: os agregados são recalculados
+            correction = None
+        self.generation += 1
+        self._corrections.append((self.generation, correction))
+
+    def corrections_since(self, generation: int):
+        """
+        Retorna as correções das decoerências parciais posteriores a uma geração. Um agregado calculado nessa
+        geração (como a soma das fidelidades de um EprPool) é atualizado, a cada correção, reescalando-o pelo
+        log_decay do passo e devolvendo (1 - fator) * fidelidade aos seus objetos que ficaram fora da máscara.
+
+        Args:
+            generation (int): Geração em que o agregado foi calculado.
+
+        Returns:
+            list : Correções (log_decay depois do passo, timeslot, fator, posições ordenadas dos objetos fora
+                da máscara, fidelidades dessas posições), em ordem; ou None se alguma correção não estiver mais
+                no histórico ou se o fator de algum passo for 0 (o agregado deve ser recalculado).
+        """
+        missing = self.generation - generation
+        if missing <= 0:
+            return []
+        if missing > len(self._corrections):
+            return None
+        entries = list(self._corrections)[-missing:]
+        if entries[0][0] != generation + 1:
+            return None
+        corrections = [correction for _, correction in entries]
+        return None if any(correction is None for correction in corrections) else corrections
+
+    def fidelities(self) -> np.ndarray:
+        """
+        Retorna as fidelidades de todos os objetos anexados.
+
+        Returns:
+            np.ndarray : Array com as fidelidades (ordem das posições, não da inserção).
+        """
+        size = self._size
+        alive = self._alive[:size]
+        if self.lazy:
+            elapsed = self.now() - self._updated[:size][alive]
+            return self._fidelities[:size][alive] * self.decoherence_factor ** elapsed
+        return self._fidelities[:size][alive]
+
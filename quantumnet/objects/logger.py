@@ -1,11 +1,129 @@
 import logging
+import itertools
+from collections import deque, namedtuple
 
 FORMAT = '%(asctime)s: %(message)s'
 logging.basicConfig(format=FORMAT)
 
+# Evento registrado pelo TraceSink: a mensagem é o modelo (sem formatar) e args são os valores tipados
+TraceEvent = namedtuple('TraceEvent', ['seq', 'timeslot', 'level', 'message', 'args'])
+
+class TraceSink():
+    """
+    Destino estruturado para o Logger.
+
+    Guarda as chamadas do logger como eventos (TraceEvent) em um buffer circular de tamanho fixo, sem
+    formatar as mensagens: cada evento guarda o modelo da mensagem e os argumentos originais. Quando o
+    buffer enche, os eventos mais antigos são descartados.
+    """
+    def __init__(self, capacity: int = 10000, clock=None, echo: bool = False) -> None:
+        """
+        Args:
+            capacity (int): Número máximo de eventos guardados.
+            clock (callable): Função que retorna o timeslot atual (por exemplo, Network.get_timeslot).
+            echo (bool): Se True, as mensagens também são enviadas ao logging como texto.
+        """
+        self._events = deque(maxlen=capacity)
+        self._sequence = itertools.count()
+        self.clock = clock
+        self.echo = echo
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(self._events)
+
+    @property
+    def capacity(self):
+        """
+        Capacidade do buffer.
+
+        Returns:
+            int : Número máximo de eventos guardados.
+        """
+        return self._events.maxlen
+
+    @property
+    def dropped(self):
+        """
+        Número de eventos descartados por falta de espaço.
+
+        Returns:
+            int : Eventos descartados.
+        """
+        return self.total - len(self._events)
+
+    @property
+    def total(self):
+        """
+        Número de eventos registrados desde a criação.
+
+        Returns:
+            int : Eventos registrados.
+        """
+        return self._events[-1].seq + 1 if self._events else 0
+
+    def record(self, level: int, message: str, args: tuple = ()):
+        """
+        Registra um evento.
+
+        Args:
+            level (int): Nível do evento (níveis do módulo logging).
+            message (str): Modelo da mensagem, no estilo %.
+            args (tuple | dict): Argumentos da mensagem, ou campos de um evento estruturado.
+        """
+        timeslot = self.clock() if self.clock is not None else None
+        self._events.append(TraceEvent(next(self._sequence), timeslot, level, message, args))
+
+    def events(self, level: int = None, message: str = None) -> list:
+        """
+        Retorna os eventos guardados, opcionalmente filtrados.
+
+        Args:
+            level (int): Nível mínimo dos eventos.
+            message (str): Modelo de mensagem (ou nome de evento) exato.
+
+        Returns:
+            list : Eventos, do mais antigo ao mais recente.
+        """
+        return [event for event in self._events
+                if (level is None or event.level >= level) and (message is None or event.message == message)]
+
+    def messages(self) -> list:
+        """
+        Retorna as mensagens guardadas, já formatadas.
+
+        Returns:
+            list : Mensagens, da mais antiga à mais recente.
+        """
+        messages = []
+        for event in self._events:
+            if isinstance(event.args, dict):
+                messages.append(f'{event.message} {event.args}')
+            else:
+                messages.append(event.message % event.args if event.args else event.message)
+        return messages
+
+    def clear(self):
+        """
+        Remove todos os eventos guardados.
+        """
+        self._events.clear()
+
+
 class Logger(object):
+    """
+    Logger da biblioteca (singleton).
+
+    As mensagens são formatadas somente quando o logger está ativo: os métodos recebem um modelo no estilo
+    % e os argumentos separados, como logger.log('Timeslot %s: par criado', timeslot). Com o logger
+    desativado, cada chamada custa apenas a verificação de Logger.DISABLED. Para evitar também o cálculo
+    dos argumentos, use `if logger.enabled:` em volta da chamada.
+    """
     __instance = None
     DISABLED = True
+    SINK = None
 
     def __init__(self):
             if Logger.__instance is None:
@@ -22,19 +140,62 @@ class Logger(object):
 
     def activate(self):
         Logger.DISABLED = False
-    
-    def warn(self, message):
+
+    def deactivate(self):
+        Logger.DISABLED = True
+
+    @property
+    def enabled(self):
+        """
+        Indica se o logger está ativo.
+
+        Returns:
+            bool : True se as mensagens estão sendo registradas.
+        """
+        return not Logger.DISABLED
+
+    def set_sink(self, sink: TraceSink = None):
+        """
+        Define o destino estruturado das mensagens. Com um destino definido, as mensagens são guardadas nele
+        em vez de enviadas ao logging como texto (a menos que o destino tenha echo=True).
+
+        Args:
+            sink (TraceSink): Destino das mensagens. Se None, volta a usar somente o logging.
+        """
+        Logger.SINK = sink
+
+    def _emit(self, level, message, args):
+        sink = Logger.SINK
+        if sink is not None:
+            sink.record(level, message, args)
+            if not sink.echo:
+                return
+        self.logger.log(level, message, *args)
+
+    def warn(self, message, *args):
         if not Logger.DISABLED:
-            self.logger.warning(message)
+            self._emit(logging.WARNING, message, args)
 
-    def error(self, message):
+    def error(self, message, *args):
         if not Logger.DISABLED:
-            self.logger.error(message)
+            self._emit(logging.ERROR, message, args)
 
-    def log(self, message):
+    def log(self, message, *args):
         if not Logger.DISABLED:
-            self.logger.info(message)
+            self._emit(logging.INFO, message, args)
 
-    def debug(self, message):
+    def debug(self, message, *args):
         if not Logger.DISABLED:
-            self.logger.debug(message)
\ No newline at end of file
+            self._emit(logging.DEBUG, message, args)
+
+    def event(self, name: str, **fields):
+        """
+        Registra um evento estruturado no destino definido por set_sink. Não faz nada se o logger estiver
+        desativado ou se não houver destino.
+
+        Args:
+            name (str): Nome do evento.
+            **fields: Campos do evento.
+        """
+        if not Logger.DISABLED and Logger.SINK is not None:
+            Logger.SINK.record(logging.INFO, name, fields)
@@ -0,0 +1,269 @@
+import math
+
+class P2Quantile():
+    """
+    Estimador de um quantil em fluxo pelo algoritmo P² (Jain e Chlamtac, 1985).
+
+    Mantém apenas cinco marcadores, cujas alturas são ajustadas por interpolação parabólica a cada
+    observação: memória e custo por observação O(1). Com menos de cinco observações o quantil é exato.
+    """
+    def __init__(self, q: float) -> None:
+        """
+        Args:
+            q (float): Quantil desejado, entre 0 e 1.
+        """
+        self.q = q
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self._increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, x: float):
+        """
+        Adiciona uma observação.
+
+        Args:
+            x (float): Valor observado.
+        """
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        # Encontra a célula k do valor e atualiza os extremos
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= heights[k + 1]:
+                k += 1
+
+        positions = self._positions
+        for i in range(k + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Ajusta os marcadores intermediários
+        for i in range(1, 4):
+            d = self._desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        heights = self._heights
+        positions = self._positions
+        return heights[i] + d / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + d) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - d) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+
+    def value(self) -> float:
+        """
+        Retorna a estimativa atual do quantil.
+
+        Returns:
+            float : Quantil estimado, ou None se não houver observações.
+        """
+        heights = self._heights
+        if not heights:
+            return None
+        positions = self._positions if len(heights) == 5 else list(range(1, len(heights) + 1))
+        # Interpola entre os marcadores vizinhos à posição do quantil
+        target = 1 + self.q * (positions[-1] - 1)
+        for i in range(len(heights) - 1):
+            if target <= positions[i + 1]:
+                fraction = (target - positions[i]) / (positions[i + 1] - positions[i])
+                return heights[i] + fraction * (heights[i + 1] - heights[i])
+        return heights[-1]
+
+    def state(self) -> dict:
+        """
+        Retorna o estado do estimador (marcadores), para ser salvo e restaurado com load_state.
+
+        Returns:
+            dict : Alturas, posições e posições desejadas dos marcadores.
+        """
+        return {'heights': list(self._heights), 'positions': list(self._positions), 'desired': list(self._desired)}
+
+    def load_state(self, state: dict):
+        """
+        Restaura um estado retornado por state().
+
+        Args:
+            state (dict): Estado do estimador.
+        """
+        self._heights = list(state['heights'])
+        self._positions = list(state['positions'])
+        self._desired = list(state['desired'])
+
+    def copy(self) -> 'P2Quantile':
+        """
+        Cria uma cópia independente do estimador.
+
+        Returns:
+            P2Quantile : Cópia.
+        """
+        estimator = P2Quantile.__new__(P2Quantile)
+        estimator.q = self.q
+        estimator._heights = list(self._heights)
+        estimator._positions = list(self._positions)
+        estimator._desired = list(self._desired)
+        estimator._increments = self._increments
+        return estimator
+
+
+class StreamingStats():
+    """
+    Estatísticas de um fluxo de valores, atualizadas a cada observação em O(1).
+
+    Mantém contagem, média e variância (algoritmo de Welford), mínimo, máximo e estimativas de quantis
+    (P²), de forma que nenhuma consulta precisa percorrer os valores já observados.
+    """
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, quantiles: tuple = QUANTILES) -> None:
+        """
+        Args:
+            quantiles (tuple): Quantis estimados.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._quantiles = {q: P2Quantile(q) for q in quantiles}
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x: float):
+        """
+        Adiciona uma observação.
+
+        Args:
+            x (float): Valor observado.
+        """
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.total += x
+        if self.min is None or x < self.min:
+            self.min = x
+        if self.max is None or x > self.max:
+            self.max = x
+        for estimator in self._quantiles.values():
+            estimator.add(x)
+
+    def extend(self, values):
+        """
+        Adiciona várias observações.
+
+        Args:
+            values (iterable): Valores observados.
+        """
+        for x in values:
+            self.add(x)
+
+    @property
+    def variance(self) -> float:
+        """
+        Variância amostral das observações.
+
+        Returns:
+            float : Variância (0 com menos de duas observações).
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        """
+        Desvio padrão amostral das observações.
+
+        Returns:
+            float : Desvio padrão.
+        """
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        """
+        Retorna a estimativa de um quantil acompanhado.
+
+        Args:
+            q (float): Quantil (um dos informados na criação).
+
+        Returns:
+            float : Quantil estimado, ou None se não houver observações.
+        """
+        if q not in self._quantiles:
+            raise ValueError(f'O quantil {q} não é acompanhado. Escolha entre {tuple(self._quantiles)}.')
+        return self._quantiles[q].value()
+
+    def summary(self) -> dict:
+        """
+        Retorna todas as estatísticas.
+
+        Returns:
+            dict : Contagem, média, desvio padrão, mínimo, máximo e quantis (chaves 'p50', 'p95', ...).
+        """
+        summary = {'count': self.count, 'mean': self.mean, 'std': self.std, 'min': self.min, 'max': self.max}
+        for q, estimator in self._quantiles.items():
+            summary[f'p{q * 100:g}'] = estimator.value()
+        return summary
+
+    def state(self) -> dict:
+        """
+        Retorna o estado das estatísticas, para ser salvo e restaurado com load_state.
+
+        Returns:
+            dict : Estado (somente tipos serializáveis em JSON).
+        """
+        return {'count': self.count, 'mean': self.mean, 'm2': self._m2, 'total': self.total, 'min': self.min, 'max': self.max,
+                'quantiles': [[q, estimator.state()] for q, estimator in self._quantiles.items()]}
+
+    def load_state(self, state: dict):
+        """
+        Restaura um estado retornado por state().
+
+        Args:
+            state (dict): Estado das estatísticas.
+        """
+        self.count = state['count']
+        self.mean = state['mean']
+        self._m2 = state['m2']
+        self.total = state['total']
+        self.min = state['min']
+        self.max = state['max']
+        self._quantiles = {}
+        for q, estimator_state in state['quantiles']:
+            estimator = P2Quantile(q)
+            estimator.load_state(estimator_state)
+            self._quantiles[q] = estimator
+
+    def copy(self) -> 'StreamingStats':
+        """
+        Cria uma cópia independente das estatísticas.
+
+        Returns:
+            StreamingStats : Cópia.
+        """
+        stats = StreamingStats(())
+        stats.count = self.count
+        stats.mean = self.mean
+        stats._m2 = self._m2
+        stats.total = self.total
+        stats.min = self.min
+        stats.max = self.max
+        stats._quantiles = {q: estimator.copy() for q, estimator in self._quantiles.items()}
+        return stats
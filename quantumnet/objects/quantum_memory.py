@@ -0,0 +1,220 @@
+from collections import deque
+from .fidelity_store import FidelityStore
+
+class QuantumMemory():
+    """
+    Memória quântica de um host.
+
+    Os qubits ficam em uma fila dupla (deque), de forma que inserir e remover em qualquer uma das pontas
+    custa O(1). A memória tem capacidade máxima: qubits que chegam com a memória cheia são descartados e
+    contabilizados em `overflow`.
+
+    Se um FidelityStore for associado à memória, as fidelidades dos qubits passam a ser mantidas nele
+    enquanto eles estiverem na memória.
+    """
+    def __init__(self, capacity: int = None, store: FidelityStore = None) -> None:
+        """
+        Args:
+            capacity (int): Número máximo de qubits. Se None, a memória não tem limite.
+            store (FidelityStore): Armazenamento de fidelidades dos qubits da memória (opcional).
+        """
+        self._qubits = deque()
+        self._capacity = capacity
+        self._store = store
+        self.overflow = 0
+
+    def __len__(self):
+        return len(self._qubits)
+
+    def __bool__(self):
+        return len(self._qubits) > 0
+
+    def __iter__(self):
+        return iter(self._qubits)
+
+    def __reversed__(self):
+        return reversed(self._qubits)
+
+    def __contains__(self, qubit):
+        return qubit in self._qubits
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._qubits)[index]
+        return self._qubits[index]
+
+    def __repr__(self):
+        return repr(list(self._qubits))
+
+    @property
+    def capacity(self):
+        """
+        Capacidade da memória.
+
+        Returns:
+            int : Número máximo de qubits, ou None se a memória não tem limite.
+        """
+        return self._capacity
+
+    @property
+    def store(self):
+        """
+        Armazenamento de fidelidades da memória.
+
+        Returns:
+            FidelityStore : Armazenamento de fidelidades, ou None.
+        """
+        return self._store
+
+    def is_full(self) -> bool:
+        """
+        Verifica se a memória está cheia.
+
+        Returns:
+            bool : True se não cabe mais nenhum qubit.
+        """
+        return self._capacity is not None and len(self._qubits) >= self._capacity
+
+    def bind_store(self, store: FidelityStore):
+        """
+        Passa a manter as fidelidades dos qubits da memória em um armazenamento de fidelidades.
+
+        Args:
+            store (FidelityStore): Armazenamento de fidelidades.
+        """
+        self._store = store
+        for qubit in self._qubits:
+            store.attach(qubit)
+
+    def clone(self, store: FidelityStore = None) -> 'QuantumMemory':
+        """
+        Cria uma cópia da memória, com cópias dos qubits. Se a memória mantiver as fidelidades em um
+        armazenamento, a cópia usa o armazenamento informado (uma bifurcação do original, ver FidelityStore.fork).
+
+        Args:
+            store (FidelityStore): Armazenamento da cópia.
+
+        Returns:
+            QuantumMemory : Cópia da memória.
+        """
+        store = store if self._store is not None else None
+        memory = QuantumMemory(self._capacity, store)
+        memory._qubits.extend(qubit.clone(store) for qubit in self._qubits)
+        memory.overflow = self.overflow
+        return memory
+
+    def _release(self, qubit):
+        if self._store is not None:
+            self._store.detach(qubit)
+        return qubit
+
+    def append(self, qubit) -> bool:
+        """
+        Adiciona um qubit ao fim da memória.
+
+        Args:
+            qubit (Qubit): Qubit a ser adicionado.
+
+        Returns:
+            bool : True se o qubit foi armazenado, False se a memória estava cheia.
+        """
+        if self.is_full():
+            self.overflow += 1
+            return False
+        if self._store is not None:
+            self._store.attach(qubit)
+        self._qubits.append(qubit)
+        return True
+
+    def appendleft(self, qubit) -> bool:
+        """
+        Adiciona um qubit ao início da memória.
+
+        Args:
+            qubit (Qubit): Qubit a ser adicionado.
+
+        Returns:
+            bool : True se o qubit foi armazenado, False se a memória estava cheia.
+        """
+        if self.is_full():
+            self.overflow += 1
+            return False
+        if self._store is not None:
+            self._store.attach(qubit)
+        self._qubits.appendleft(qubit)
+        return True
+
+    def extend(self, qubits) -> int:
+        """
+        Adiciona vários qubits ao fim da memória, anexando-os ao armazenamento de fidelidades de uma só vez.
+        Os qubits que não cabem na memória são descartados e contabilizados em `overflow`.
+
+        Args:
+            qubits (iterable): Qubits a serem adicionados.
+
+        Returns:
+            int : Número de qubits armazenados.
+        """
+        qubits = list(qubits)
+        if self._capacity is not None:
+            free = max(self._capacity - len(self._qubits), 0)
+            self.overflow += max(len(qubits) - free, 0)
+            qubits = qubits[:free]
+        if self._store is not None:
+            self._store.attach_many(qubits)
+        self._qubits.extend(qubits)
+        return len(qubits)
+
+    def extend_attached(self, qubits: list):
+        """
+        Adiciona ao fim da memória qubits que já estão anexados ao armazenamento de fidelidades da memória
+        (por exemplo, restaurados de um snapshot), sem verificar a capacidade.
+
+        Args:
+            qubits (list): Qubits a serem adicionados.
+        """
+        self._qubits.extend(qubits)
+
+    def pop(self, index: int = -1):
+        """
+        Remove e retorna um qubit. O(1) para o primeiro e o último qubits.
+
+        Args:
+            index (int): Posição do qubit.
+
+        Returns:
+            Qubit : Qubit removido.
+        """
+        if index == -1:
+            return self._release(self._qubits.pop())
+        if index == 0:
+            return self._release(self._qubits.popleft())
+        qubit = self._qubits[index]
+        del self._qubits[index]
+        return self._release(qubit)
+
+    def popleft(self):
+        """
+        Remove e retorna o primeiro qubit da memória.
+
+        Returns:
+            Qubit : Qubit removido.
+        """
+        return self._release(self._qubits.popleft())
+
+    def remove(self, qubit):
+        """
+        Remove um qubit da memória.
+
+        Args:
+            qubit (Qubit): Qubit a ser removido.
+        """
+        self._qubits.remove(qubit)
+        self._release(qubit)
+
+    def clear(self):
+        """
+        Remove todos os qubits da memória.
+        """
+        while self._qubits:
+            self._release(self._qubits.pop())
@@ -1,41 +1,76 @@
-import random
 import math
+from .random_source import RandomSource
 
 class Qubit():
-    def __init__(self, qubit_id: int, initial_fidelity: float = None) -> None:
+    __slots__ = ('qubit_id', '_qubit_state', '_initial_fidelity', '_current_fidelity', '_store', '_slot')
+
+    def __init__(self, qubit_id: int, initial_fidelity: float = None, rng: RandomSource = None) -> None:
         self.qubit_id = qubit_id
         self._qubit_state = 0  # Define o estado inicial do qubit como 0
-        self._initial_fidelity = initial_fidelity if initial_fidelity is not None else random.uniform(0, 1)
+        self._initial_fidelity = initial_fidelity if initial_fidelity is not None else (rng or RandomSource.default()).uniform(0, 1)
         self._current_fidelity = self._initial_fidelity
+        # Armazenamento de fidelidades ao qual o qubit está anexado (ver FidelityStore)
+        self._store = None
+        self._slot = None
 
     def __str__(self):
         return f"Qubit {self.qubit_id} with state {self._qubit_state}"
 
-    def update_fidelity(self):
-        self._current_fidelity = random.uniform(0, 1)
+    def clone(self, store=None):
+        """
+        Cria uma cópia do qubit. Se o qubit estiver anexado a um armazenamento de fidelidades, a cópia ocupa
+        a mesma posição no armazenamento informado (uma bifurcação do original).
+
+        Args:
+            store (FidelityStore): Armazenamento da cópia.
+
+        Returns:
+            Qubit : Cópia do qubit.
+        """
+        qubit = Qubit.__new__(Qubit)
+        qubit.qubit_id = self.qubit_id
+        qubit._qubit_state = self._qubit_state
+        qubit._initial_fidelity = self._initial_fidelity
+        qubit._current_fidelity = self._current_fidelity
+        qubit._store = store if self._store is not None else None
+        qubit._slot = self._slot if self._store is not None else None
+        return qubit
+
+    def update_fidelity(self, rng: RandomSource = None):
+        self.set_current_fidelity((rng or RandomSource.default()).uniform(0, 1))
 
     def get_initial_fidelity(self):
         return self._initial_fidelity
 
     def get_current_fidelity(self):
+        if self._store is not None:
+            return self._store.get(self._slot)
         return self._current_fidelity
 
     def set_current_fidelity(self, new_fidelity: float):
             """Define a fidelidade atual do qubit."""
-            self._current_fidelity = new_fidelity
+            if self._store is not None:
+                self._store.set(self._slot, new_fidelity)
+            else:
+                self._current_fidelity = new_fidelity
 
     def apply_x(self):
         """Aplica a porta X (NOT) ao qubit."""
         self._qubit_state = 1 if self._qubit_state == 0 else 0
 
-    def apply_hadamard(self):
-        """Aplica a porta Hadamard (H) ao qubit."""
+    def apply_hadamard(self, rng: RandomSource = None):
+        """Aplica a porta Hadamard (H) ao qubit.
+
+        Args:
+            rng (RandomSource): Fonte de números aleatórios (da rede). Se None, usa a fonte padrão.
+        """
+        rng = rng or RandomSource.default()
         # Hadamard transforma o estado |0> em (|0> + |1>) / sqrt(2)
         # e |1> em (|0> - |1>) / sqrt(2). Para simulação, usa-se probabilidade.
         if self._qubit_state == 0:
-            self._qubit_state = random.choice([0, 1])  # Simula a superposição
+            self._qubit_state = rng.bit()  # Simula a superposição
         else:
-            self._qubit_state = random.choice([0, 1])  # Simula a superposição
+            self._qubit_state = rng.bit()  # Simula a superposição
 
     def measure(self):
         """Realiza a medição do qubit no estado atual."""
@@ -0,0 +1,168 @@
+import numpy as np
+
+class RandomSource():
+    """
+    Fonte de números aleatórios de uma rede.
+
+    Encapsula um np.random.Generator semeado. As amostras unitárias (uniform, bit, randint) são lidas de
+    buffers pré-sorteados em bloco, que são reabastecidos quando se esgotam, em vez de uma chamada ao
+    gerador por amostra. Cada rede tem a sua fonte, de forma que várias redes (réplicas) no mesmo
+    processo são independentes e reprodutíveis.
+    """
+    _default = None
+
+    def __init__(self, seed=None, buffer_size: int = 4096) -> None:
+        """
+        Args:
+            seed (int | np.random.SeedSequence): Semente do gerador. Se None, usa entropia do sistema.
+            buffer_size (int): Número de amostras sorteadas a cada reabastecimento dos buffers.
+        """
+        self.seed = seed
+        self._generator = np.random.default_rng(seed)
+        self._buffer_size = buffer_size
+        self._uniforms = []
+        self._bits = []
+
+    @classmethod
+    def default(cls):
+        """
+        Retorna a fonte usada por objetos criados fora de uma rede.
+
+        Returns:
+            RandomSource : Fonte padrão, sem semente.
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def generator(self):
+        """
+        Gerador NumPy da fonte, para amostragens vetorizadas.
+
+        Returns:
+            np.random.Generator : Gerador.
+        """
+        return self._generator
+
+    def uniform(self, low: float = 0.0, high: float = 1.0) -> float:
+        """
+        Sorteia um número real uniforme em [low, high).
+
+        Args:
+            low (float): Limite inferior.
+            high (float): Limite superior.
+
+        Returns:
+            float : Número sorteado.
+        """
+        if not self._uniforms:
+            # Invertido para que pop() devolva as amostras na ordem em que foram sorteadas
+            self._uniforms = self._generator.random(self._buffer_size)[::-1].tolist()
+        return low + (high - low) * self._uniforms.pop()
+
+    def uniforms(self, size: int, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+        """
+        Sorteia vários números reais uniformes em [low, high) de uma vez. Os valores são os mesmos que
+        `size` chamadas a uniform() retornariam, de forma que as duas formas podem ser misturadas sem
+        alterar a sequência sorteada.
+
+        Args:
+            size (int): Quantidade de números.
+            low (float): Limite inferior.
+            high (float): Limite superior.
+
+        Returns:
+            np.ndarray : Números sorteados.
+        """
+        values = np.empty(size)
+        taken = min(size, len(self._uniforms))
+        if taken:
+            values[:taken] = self._uniforms[:-taken - 1:-1]
+            del self._uniforms[-taken:]
+        missing = size - taken
+        if missing:
+            # Sorteia em buffers inteiros, como uniform(), e guarda o que sobrar
+            blocks = -(-missing // self._buffer_size)
+            fresh = self._generator.random(blocks * self._buffer_size)
+            values[taken:] = fresh[:missing]
+            self._uniforms = fresh[missing:][::-1].tolist()
+        return low + (high - low) * values
+
+    def bit(self) -> int:
+        """
+        Sorteia 0 ou 1 com probabilidades iguais.
+
+        Returns:
+            int : Bit sorteado.
+        """
+        if not self._bits:
+            self._bits = self._generator.integers(0, 2, self._buffer_size, dtype=np.int8)[::-1].tolist()
+        return self._bits.pop()
+
+    def bits(self, size: int) -> list:
+        """
+        Sorteia vários bits de uma vez.
+
+        Args:
+            size (int): Número de bits.
+
+        Returns:
+            list : Bits sorteados.
+        """
+        return self._generator.integers(0, 2, size, dtype=np.int8).tolist()
+
+    def randint(self, low: int, high: int) -> int:
+        """
+        Sorteia um inteiro em [low, high], incluindo os extremos.
+
+        Args:
+            low (int): Menor valor.
+            high (int): Maior valor.
+
+        Returns:
+            int : Inteiro sorteado.
+        """
+        return low + int(self.uniform() * (high - low + 1))
+
+    def choice(self, options):
+        """
+        Sorteia um elemento de uma sequência.
+
+        Args:
+            options (sequence): Sequência não vazia.
+
+        Returns:
+            Elemento sorteado.
+        """
+        return options[int(self.uniform() * len(options))]
+
+    def copy(self) -> 'RandomSource':
+        """
+        Cria uma fonte no mesmo estado desta (gerador e buffers): as duas sorteiam, daí em diante, a mesma
+        sequência de números, de forma independente.
+
+        Returns:
+            RandomSource : Cópia da fonte.
+        """
+        bit_generator = type(self._generator.bit_generator)(0)
+        bit_generator.state = self._generator.bit_generator.state
+        source = RandomSource.__new__(RandomSource)
+        source.seed = self.seed
+        source._generator = np.random.Generator(bit_generator)
+        source._buffer_size = self._buffer_size
+        source._uniforms = list(self._uniforms)
+        source._bits = list(self._bits)
+        return source
+
+    def spawn(self, count: int) -> list:
+        """
+        Cria fontes independentes derivadas desta, por exemplo para réplicas.
+
+        Args:
+            count (int): Número de fontes.
+
+        Returns:
+            list : Fontes derivadas.
+        """
+        return [RandomSource(generator, self._buffer_size) for generator in self._generator.spawn(count)]
@@ -0,0 +1,368 @@
+import copy
+import os
+import shutil
+import tempfile
+import numpy as np
+
+class TransportLog():
+    """
+    Registro colunar das transmissões da camada de transporte.
+
+    Cada campo dos registros fica em um array NumPy tipado (uma coluna por campo). As rotas são internadas:
+    cada rota distinta recebe um id e os registros guardam apenas esse id. Os registros não guardam
+    referências aos objetos Qubit, somente os seus ids.
+
+    A política de retenção define o que é mantido:
+        'all'   : todos os registros, em memória;
+        int N   : apenas os últimos N registros (buffer circular);
+        'spill' : os registros são gravados em blocos em um arquivo binário em disco, e somente o bloco
+                  atual fica em memória. As consultas leem o arquivo por memory map.
+    """
+    # Tipos de registro (qual protocolo gerou o registro)
+    REQUEST = 0
+    TELEPORT = 1
+    TRANSPORT = 2
+
+    DTYPE = np.dtype([
+        ('kind', np.int8),
+        ('alice_id', np.int64),
+        ('bob_id', np.int64),
+        ('route_id', np.int32),
+        ('fidelity_alice', np.float64),
+        ('fidelity_bob', np.float64),
+        ('fidelity_route', np.float64),
+        ('F_final', np.float64),
+        ('timeslot', np.int64),
+        ('qubit_id', np.int64),
+        ('qubit_bob_id', np.int64),
+    ])
+    # Valores usados para campos que o registro não tem
+    MISSING = {'fidelity_alice': np.nan, 'fidelity_bob': np.nan, 'fidelity_route': np.nan, 'F_final': np.nan,
+               'timeslot': -1, 'qubit_id': -1, 'qubit_bob_id': -1}
+
+    def __init__(self, retention='all', spill_path: str = None, chunk_size: int = 4096) -> None:
+        """
+        Args:
+            retention (str | int): 'all', 'spill' ou o número de registros mais recentes mantidos.
+            spill_path (str): Arquivo usado pela retenção 'spill'. Se None, usa um arquivo temporário.
+            chunk_size (int): Capacidade inicial das colunas (e tamanho dos blocos gravados em disco).
+        """
+        if retention not in ('all', 'spill') and not (isinstance(retention, int) and retention > 0):
+            raise ValueError("Retenção inválida. Use 'all', 'spill' ou um número inteiro positivo.")
+        self.retention = retention
+        self._chunk_size = chunk_size
+        capacity = retention if isinstance(retention, int) else chunk_size
+        self._columns = {name: np.empty(capacity, dtype=self.DTYPE[name]) for name in self.DTYPE.names}
+        self._size = 0  # Registros em memória
+        self._start = 0  # Início do buffer circular (retenção 'last N')
+        self.total = 0  # Registros recebidos desde a criação
+        self._route_ids = {}
+        self._routes = []
+        self._spilled = 0
+        # True enquanto as colunas forem compartilhadas com outro registro (ver fork)
+        self._shared = False
+        self.spill_path = None
+        if retention == 'spill':
+            self.spill_path = self._new_spill_file(spill_path)
+
+    @staticmethod
+    def _new_spill_file(spill_path: str = None) -> str:
+        """
+        Cria (ou esvazia) o arquivo da retenção 'spill'. Se nenhum caminho for informado, usa um arquivo temporário.
+        """
+        if spill_path is None:
+            handle, spill_path = tempfile.mkstemp(prefix='transport_log_', suffix='.bin')
+            os.close(handle)
+        else:
+            open(spill_path, 'wb').close()
+        return spill_path
+
+    def __len__(self):
+        return self._spilled + self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        return self.record(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    @property
+    def routes(self):
+        """
+        Rotas internadas, na ordem dos seus ids.
+
+        Returns:
+            list : Rotas (tuplas de nós).
+        """
+        return self._routes
+
+    def route_id(self, route) -> int:
+        """
+        Retorna o id de uma rota, internando-a se for nova.
+
+        Args:
+            route (list): Nós da rota.
+
+        Returns:
+            int : Id da rota.
+        """
+        key = tuple(route)
+        route_id = self._route_ids.get(key)
+        if route_id is None:
+            route_id = len(self._routes)
+            self._route_ids[key] = route_id
+            self._routes.append(key)
+        return route_id
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            new = np.empty(2 * len(column), dtype=column.dtype)
+            new[:len(column)] = column
+            self._columns[name] = new
+        self._shared = False
+
+    def _own(self):
+        """
+        Copia as colunas compartilhadas com outro registro antes de uma escrita.
+        """
+        self._columns = {name: column.copy() for name, column in self._columns.items()}
+        self._shared = False
+
+    def fork(self, spill_path: str = None) -> 'TransportLog':
+        """
+        Cria um registro com os mesmos registros e a mesma retenção. As colunas em memória são compartilhadas
+        até que um dos dois registros escreva nelas; na retenção 'spill', o arquivo é copiado.
+
+        Args:
+            spill_path (str): Arquivo do novo registro, na retenção 'spill'. Se None, usa um arquivo temporário.
+
+        Returns:
+            TransportLog : Novo registro.
+        """
+        log = copy.copy(self)
+        log._columns = dict(self._columns)
+        log._route_ids = dict(self._route_ids)
+        log._routes = list(self._routes)
+        if self.retention == 'spill':
+            log.spill_path = self._new_spill_file(spill_path)
+            shutil.copyfile(self.spill_path, log.spill_path)
+        self._shared = log._shared = True
+        return log
+
+    def _spill(self):
+        """
+        Grava em disco os registros em memória.
+        """
+        chunk = np.empty(self._size, dtype=self.DTYPE)
+        for name, column in self._columns.items():
+            chunk[name] = column[:self._size]
+        with open(self.spill_path, 'ab') as file:
+            chunk.tofile(file)
+        self._spilled += self._size
+        self._size = 0
+
+    def append(self, kind: int, alice_id: int, bob_id: int, route, **fields):
+        """
+        Adiciona um registro.
+
+        Args:
+            kind (int): Tipo do registro (REQUEST, TELEPORT ou TRANSPORT).
+            alice_id (int): Id de Alice.
+            bob_id (int): Id de Bob.
+            route (list): Rota usada.
+            **fields: Demais campos (fidelity_alice, fidelity_bob, fidelity_route, F_final, timeslot,
+                qubit_id, qubit_bob_id). Campos ausentes recebem os valores de MISSING.
+        """
+        capacity = len(self._columns['kind'])
+        if self._size == capacity:
+            if self.retention == 'all':
+                self._grow()
+            elif self.retention == 'spill':
+                self._spill()
+        if self._shared:
+            self._own()
+        if isinstance(self.retention, int):
+            index = (self._start + self._size) % capacity
+            if self._size == capacity:
+                self._start = (self._start + 1) % capacity
+            else:
+                self._size += 1
+        else:
+            index = self._size
+            self._size += 1
+        columns = self._columns
+        columns['kind'][index] = kind
+        columns['alice_id'][index] = alice_id
+        columns['bob_id'][index] = bob_id
+        columns['route_id'][index] = self.route_id(route)
+        for name, missing in self.MISSING.items():
+            value = fields.get(name)
+            columns[name][index] = missing if value is None else value
+        self.total += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Retorna uma coluna com todos os registros mantidos, do mais antigo ao mais recente.
+
+        Args:
+            name (str): Nome do campo.
+
+        Returns:
+            np.ndarray : Valores da coluna.
+        """
+        column = self._columns[name]
+        if isinstance(self.retention, int):
+            order = (self._start + np.arange(self._size)) % len(column)
+            return column[order]
+        in_memory = column[:self._size]
+        if self._spilled:
+            spilled = np.memmap(self.spill_path, dtype=self.DTYPE, mode='r', shape=(self._spilled,))
+            return np.concatenate([spilled[name], in_memory])
+        return in_memory.copy()
+
+    def records(self) -> np.ndarray:
+        """
+        Retorna todos os registros mantidos em um único array estruturado.
+
+        Returns:
+            np.ndarray : Registros (campos de DTYPE), do mais antigo ao mais recente.
+        """
+        records = np.empty(len(self), dtype=self.DTYPE)
+        for name in self.DTYPE.names:
+            records[name] = self.column(name)
+        return records
+
+    def restore(self, records: np.ndarray, routes: list, total: int = None):
+        """
+        Substitui os registros pelos informados (por exemplo, lidos de um snapshot), respeitando a política
+        de retenção.
+
+        Args:
+            records (np.ndarray): Registros (campos de DTYPE), do mais antigo ao mais recente.
+            routes (list): Rotas internadas, na ordem dos seus ids.
+            total (int): Registros recebidos desde a criação. Se None, usa o número de registros.
+        """
+        self.clear()
+        self._routes = [tuple(route) for route in routes]
+        self._route_ids = {route: route_id for route_id, route in enumerate(self._routes)}
+        if isinstance(self.retention, int):
+            records = records[-self.retention:] if len(records) else records
+        if self.retention == 'spill':
+            with open(self.spill_path, 'ab') as file:
+                np.ascontiguousarray(records).tofile(file)
+            self._spilled = len(records)
+        else:
+            while len(self._columns['kind']) < len(records):
+                self._grow()
+            if self._shared:
+                self._own()
+            for name, column in self._columns.items():
+                column[:len(records)] = records[name]
+            self._size = len(records)
+        self.total = len(records) if total is None else total
+
+    def record(self, index: int) -> dict:
+        """
+        Retorna um registro como dicionário, no formato usado anteriormente em `transmitted_qubits`
+        (os qubits são identificados pelos seus ids).
+
+        Args:
+            index (int): Posição do registro, do mais antigo ao mais recente.
+
+        Returns:
+            dict : Registro.
+        """
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError('Índice fora do intervalo do registro de transmissões.')
+        if index < self._spilled:
+            row = np.memmap(self.spill_path, dtype=self.DTYPE, mode='r', shape=(self._spilled,))[index]
+            values = {name: row[name] for name in self.DTYPE.names}
+        else:
+            position = index - self._spilled
+            if isinstance(self.retention, int):
+                position = (self._start + position) % len(self._columns['kind'])
+            values = {name: column[position] for name, column in self._columns.items()}
+        return self._to_dict(values)
+
+    def _to_dict(self, values: dict) -> dict:
+        kind = int(values['kind'])
+        route = list(self._routes[int(values['route_id'])])
+        if kind == self.REQUEST:
+            record = {'route': route, 'alice_id': int(values['alice_id']), 'bob_id': int(values['bob_id'])}
+        else:
+            record = {'alice_id': int(values['alice_id']), 'bob_id': int(values['bob_id']), 'route': route,
+                      'fidelity_alice': float(values['fidelity_alice'])}
+            if kind == self.TELEPORT:
+                record['fidelity_bob'] = float(values['fidelity_bob'])
+            record['fidelity_route'] = float(values['fidelity_route'])
+            record['F_final'] = float(values['F_final'])
+        record['timeslot'] = int(values['timeslot'])
+        if kind == self.TELEPORT:
+            record['qubit_alice_id'] = int(values['qubit_id'])
+            record['qubit_bob_id'] = int(values['qubit_bob_id'])
+            record['success'] = True
+        elif kind == self.TRANSPORT:
+            record['qubit_id'] = int(values['qubit_id'])
+        return record
+
+    def _grouped_stats(self, keys: np.ndarray) -> tuple:
+        """
+        Agrupa os registros com fidelidade final por chave e calcula contagem, média, mínimo e máximo.
+        """
+        fidelities = self.column('F_final')
+        valid = ~np.isnan(fidelities)
+        keys = keys[valid]
+        fidelities = fidelities[valid]
+        if len(fidelities) == 0:
+            return keys[:0], np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.zeros(0)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=fidelities)
+        minimums = np.full(len(unique), np.inf)
+        maximums = np.full(len(unique), -np.inf)
+        np.minimum.at(minimums, inverse, fidelities)
+        np.maximum.at(maximums, inverse, fidelities)
+        return unique, counts, sums / counts, minimums, maximums
+
+    def pair_stats(self) -> dict:
+        """
+        Estatísticas da fidelidade final por par (Alice, Bob).
+
+        Returns:
+            dict : {(alice_id, bob_id): {'count', 'mean_fidelity', 'min_fidelity', 'max_fidelity'}}.
+        """
+        keys = np.stack([self.column('alice_id'), self.column('bob_id')], axis=1)
+        unique, counts, means, minimums, maximums = self._grouped_stats(keys)
+        return {(int(a), int(b)): {'count': int(c), 'mean_fidelity': float(m), 'min_fidelity': float(lo), 'max_fidelity': float(hi)}
+                for (a, b), c, m, lo, hi in zip(unique, counts, means, minimums, maximums)}
+
+    def route_stats(self) -> dict:
+        """
+        Estatísticas da fidelidade final por rota.
+
+        Returns:
+            dict : {rota (tupla): {'count', 'mean_fidelity', 'min_fidelity', 'max_fidelity'}}.
+        """
+        unique, counts, means, minimums, maximums = self._grouped_stats(self.column('route_id'))
+        return {self._routes[int(r)]: {'count': int(c), 'mean_fidelity': float(m), 'min_fidelity': float(lo), 'max_fidelity': float(hi)}
+                for r, c, m, lo, hi in zip(unique, counts, means, minimums, maximums)}
+
+    def clear(self):
+        """
+        Remove todos os registros (inclusive os gravados em disco).
+        """
+        self._size = 0
+        self._start = 0
+        self._spilled = 0
+        if self.spill_path is not None:
+            open(self.spill_path, 'wb').close()
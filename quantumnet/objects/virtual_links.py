@@ -0,0 +1,139 @@
+from .copy_on_write import CopyOnWriteMapping
+from .epr_pool import EprPool
+from .fidelity_store import FidelityStore
+
+class VirtualLinks():
+    """
+    Tabela dos enlaces virtuais, criados pelo entanglement swapping entre hosts que não são vizinhos.
+
+    Os enlaces virtuais ficam fora do grafo da rede, que representa somente os canais físicos. Cada enlace é
+    identificado pelo par de extremos (u, v), com u <= v, e tem o seu próprio EprPool, com as fidelidades no
+    mesmo armazenamento dos canais físicos (e, portanto, sujeitas à mesma decoerência). Um índice
+    {nó: {extremos}} mantém, para cada nó, os enlaces virtuais que têm pelo menos um par EPR.
+    """
+    def __init__(self, store: FidelityStore) -> None:
+        """
+        Args:
+            store (FidelityStore): Armazenamento das fidelidades dos pares.
+        """
+        self._store = store
+        self._pools = {}
+        self._live = {}
+
+    def __len__(self):
+        return len(self._pools)
+
+    def __iter__(self):
+        return iter(self._pools)
+
+    def __contains__(self, edge):
+        return self._key(*edge) in self._pools
+
+    def __repr__(self):
+        return f'VirtualLinks({len(self._pools)} enlaces)'
+
+    @staticmethod
+    def _key(u: int, v: int) -> tuple:
+        return (u, v) if u <= v else (v, u)
+
+    def _set_live(self, edge: tuple, live: bool):
+        """
+        Atualiza o índice de enlaces com pares EPR. Chamado pelos pools quando ficam vazios ou deixam de estar.
+        """
+        u, v = edge
+        if live:
+            self._live.setdefault(u, set()).add(v)
+            self._live.setdefault(v, set()).add(u)
+        else:
+            self._live.get(u, set()).discard(v)
+            self._live.get(v, set()).discard(u)
+
+    def pool(self, u: int, v: int, create: bool = False) -> EprPool:
+        """
+        Retorna o pool de pares EPR do enlace virtual entre dois hosts.
+
+        Args:
+            u (int): ID de um dos extremos.
+            v (int): ID do outro extremo.
+            create (bool): Se True, cria o enlace (com um pool vazio) caso ele ainda não exista.
+
+        Returns:
+            EprPool : Pool do enlace, ou None se o enlace não existir e create for False.
+        """
+        key = self._key(u, v)
+        if key in self._pools:
+            return self._pools[key]
+        if not create:
+            return None
+        pool = self._pools[key] = EprPool(self._store, key, on_change=self._set_live)
+        return pool
+
+    def add(self, epr, u: int, v: int):
+        """
+        Adiciona um par EPR ao enlace virtual entre dois hosts, criando o enlace se necessário.
+
+        Args:
+            epr (Epr): Par EPR.
+            u (int): ID de um dos extremos.
+            v (int): ID do outro extremo.
+        """
+        self.pool(u, v, create=True).append(epr)
+
+    def has_epr(self, u: int, v: int) -> bool:
+        """
+        Verifica, em O(1), se o enlace virtual entre dois hosts tem pelo menos um par EPR.
+
+        Args:
+            u (int): ID de um dos extremos.
+            v (int): ID do outro extremo.
+
+        Returns:
+            bool : True se o enlace existe e tem pares EPR.
+        """
+        return v in self._live.get(u, ())
+
+    def live_partners(self, node: int) -> set:
+        """
+        Retorna os hosts com os quais um host tem enlaces virtuais com pelo menos um par EPR.
+
+        Args:
+            node (int): ID do host.
+
+        Returns:
+            set : IDs dos outros extremos.
+        """
+        return self._live.get(node, set())
+
+    def live_links(self) -> list:
+        """
+        Retorna os enlaces virtuais que têm pelo menos um par EPR.
+
+        Returns:
+            list : Lista de pares (u, v), com u <= v.
+        """
+        return [(u, v) for u, partners in self._live.items() for v in partners if u <= v]
+
+    def fork(self, store: FidelityStore) -> 'VirtualLinks':
+        """
+        Cria uma tabela com os mesmos enlaces, para uma rede bifurcada (ver Network.fork). Os pools passam a ser
+        compartilhados pelas duas tabelas e cada uma copia um pool no primeiro acesso a ele.
+
+        Args:
+            store (FidelityStore): Armazenamento da nova tabela (uma bifurcação do armazenamento desta).
+
+        Returns:
+            VirtualLinks : Nova tabela.
+        """
+        if not isinstance(self._pools, CopyOnWriteMapping):
+            self._pools = CopyOnWriteMapping(self._pools, self._clone_pool)
+            self._live = CopyOnWriteMapping(self._live, set.copy)
+        links = VirtualLinks(store)
+        links._pools = self._pools.fork(links._clone_pool)
+        links._live = self._live.fork()
+        return links
+
+    def _clone_pool(self, pool: EprPool) -> EprPool:
+        """
+        Copia um pool compartilhado com outra tabela (ver fork).
+        """
+        return pool.clone(self._store, self._set_live)